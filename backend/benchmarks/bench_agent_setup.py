@@ -0,0 +1,56 @@
+"""
+Per-turn setup overhead of the agent node: rebuilding the model client, the tools and the bound tool schemas on
+every turn (the previous behaviour of call_model) versus reusing the process-wide AgentRegistry.
+
+No request is sent to Azure OpenAI, only the client objects are built, so placeholder credentials are enough.
+
+Run from the backend directory:
+    python -m benchmarks.bench_agent_setup --turns 200
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault("AZURE_OPENAI_ENDPOINT", "https://example.openai.azure.com/")
+os.environ.setdefault("AZURE_OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("AZURE_OPENAI_MODEL", "gpt-4o")
+os.environ.setdefault("OPENAI_API_VERSION", "2024-08-01-preview")
+os.environ.setdefault("POOL_MANAGEMENT_ENDPOINT", "https://example.dynamicsessions.io/")
+
+from src.registry import build_model, build_tools, get_registry
+
+
+def per_turn_rebuild():
+    model = build_model()
+    return model.bind_tools(tools=build_tools())
+
+def registry_lookup():
+    return get_registry().model_with_tools
+
+def time_turns(fn, turns: int) -> list[float]:
+    timings = []
+    for _ in range(turns):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+def report(name: str, timings: list[float]):
+    timings = sorted(timings)
+    mean = sum(timings) / len(timings)
+    p50 = timings[len(timings) // 2]
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+    print(f"{name:<20} mean={mean * 1000:9.3f}ms  p50={p50 * 1000:9.3f}ms  p99={p99 * 1000:9.3f}ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=200)
+    args = parser.parse_args()
+
+    # Warm up imports and build the registry once, as the API does at startup
+    start = time.perf_counter()
+    get_registry()
+    print(f"registry startup     {(time.perf_counter() - start) * 1000:9.3f}ms (paid once per process)")
+
+    report("per-turn rebuild", time_turns(per_turn_rebuild, args.turns))
+    report("registry", time_turns(registry_lookup, args.turns))
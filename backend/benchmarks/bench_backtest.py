@@ -0,0 +1,85 @@
+"""
+A backtest of "buy when the MACD crosses above its signal with RSI under 50, sell when it crosses back below or after
+20 days" over a universe seeded offline with years of daily bars: the per-ticker loop an agent would write in the
+python shell (the indicators of every ticker, then a Python loop over its bars) versus the vectorized engine on a cold
+universe (read and computed from the store) and a warm one.  Both must produce the same trades.
+
+Run from the backend directory:
+    python -m benchmarks.bench_backtest --tickers 500 --years 10
+"""
+import argparse
+import os
+import tempfile
+import time
+
+# The stores read their configuration at import time
+_root = tempfile.mkdtemp(prefix="bench_backtest-")
+os.environ["PRICE_STORE_DIR"] = os.path.join(_root, "prices")
+os.environ["PRICE_STORE_OFFLINE"] = "true"
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from src.tools.finances.backtest import TRADING_DAYS, backtest  # noqa: E402
+from src.tools.finances.indicators import compute_indicator_frame  # noqa: E402
+from src.tools.finances.price_store import get_price_store  # noqa: E402
+
+from .fixtures import synthetic_history, synthetic_tickers  # noqa: E402
+
+ENTRY = "crossed_above(macd, macd_signal) and rsi < 50"
+EXIT = "crossed_below(macd, macd_signal)"
+HOLDING_DAYS = 20
+
+
+def per_ticker(histories: dict, start: pd.Timestamp) -> list:
+    trades = []
+    for prices in histories.values():
+        frame = compute_indicator_frame(prices.copy())
+        close, macd, signal, rsi = (frame[name].to_numpy() for name in ("close", "macd", "macd_signal", "rsi"))
+        first = int(np.searchsorted(frame.index, start))
+        held, opened, last_signal = False, None, None
+        for i in range(first, len(frame)):
+            entry = macd[i] > signal[i] and macd[i - 1] <= signal[i - 1] and rsi[i] < 50
+            exit = macd[i] < signal[i] and macd[i - 1] >= signal[i - 1]
+            if entry:
+                last_signal = i
+            closing = exit or (last_signal is not None and i - last_signal >= HOLDING_DAYS)
+            if held and closing:
+                trades.append(close[i] / close[opened] - 1)
+                held = False
+            elif not held and entry and not closing:
+                held, opened = True, i
+        if held:
+            trades.append(close[-1] / close[opened] - 1)
+    return trades
+
+def timed(fn) -> tuple:
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tickers", type=int, default=500)
+    parser.add_argument("--years", type=int, default=10)
+    args = parser.parse_args()
+
+    tickers = synthetic_tickers(args.tickers)
+    # A year more than the backtest, for the indicators to be warmed up on its first bar
+    histories = synthetic_history(tickers, days=(args.years + 1) * TRADING_DAYS, end=pd.Timestamp.today().normalize() - pd.Timedelta(days=1))
+    store = get_price_store()
+    for ticker, prices in histories.items():
+        store.seed(ticker, prices)
+
+    cold, result = timed(lambda: backtest(ENTRY, EXIT, HOLDING_DAYS, years=args.years))
+    warm, _ = timed(lambda: backtest(ENTRY, EXIT, HOLDING_DAYS, years=args.years))
+    loop, trades = timed(lambda: per_ticker(histories, pd.Timestamp(result["start"], tz="America/New_York")))
+    stats = result["trades"]
+    assert stats["trades"] == len(trades), f"{stats['trades']} trades, the loop made {len(trades)}"
+    assert abs(stats["average_return"] - np.mean(trades)) < 1e-4, "the trade returns differ"
+
+    print(f"{args.tickers} tickers x {result['bars']} bars ({result['start']} to {result['end']}), {stats['trades']} trades")
+    print(f"  hit rate {stats['hit_rate']}, average trade {stats['average_return']}, portfolio {result['portfolio']}")
+    print(f"  per-ticker python loop  {loop * 1000:10.1f}ms")
+    print(f"  engine, cold            {cold * 1000:10.1f}ms  ({loop / cold:.1f}x)")
+    print(f"  engine, warm            {warm * 1000:10.1f}ms  ({loop / warm:.1f}x)")
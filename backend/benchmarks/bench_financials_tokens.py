@@ -0,0 +1,54 @@
+"""
+Size of get_stock_financials results in LLM tokens: Polygon's raw results (what the tool returned before) versus the
+normalized period x metric table, for a few typical requests over the same filings.
+
+Tokens are counted with tiktoken's o200k_base encoding (the GPT-4o family).  When the encoding cannot be loaded
+(it is downloaded on first use), the count falls back to an estimate of 4 characters per token and says so.
+
+Run from the backend directory:
+    python -m benchmarks.bench_financials_tokens --filings 4 10
+"""
+import argparse
+import asyncio
+import json
+
+from src.tools.finances.financials import normalize_financials
+
+from .fixtures import synthetic_financials
+
+
+def token_counter():
+    try:
+        import tiktoken
+        encoding = tiktoken.get_encoding("o200k_base")
+        return lambda text: len(encoding.encode(text)), "o200k_base"
+    except Exception:
+        return lambda text: len(text) // 4, "estimate: 4 characters per token"
+
+async def stream(filings: list):
+    for filing in filings:
+        yield filing
+
+def normalized(filings: list, **kwargs) -> dict:
+    table = asyncio.run(normalize_financials(stream(filings), **kwargs))
+    return table.to_dict()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--filings", type=int, nargs="+", default=[4, 10])
+    args = parser.parse_args()
+
+    count_tokens, encoding = token_counter()
+    print(f"tokens ({encoding})")
+    for count in args.filings:
+        filings = synthetic_financials(filings=count)
+        raw = count_tokens(json.dumps(filings))
+        cases = {
+            "all line items, 3 statements": {},
+            "income statement only": {"statements": ["income_statement"]},
+            "5 metrics": {"metrics": ["revenues", "gross_profit", "net_income_loss", "diluted_earnings_per_share", "net_cash_flow_from_operating_activities"]},
+        }
+        print(f"  {count} filings, raw results {raw:8d}")
+        for name, kwargs in cases.items():
+            tokens = count_tokens(json.dumps(normalized(filings, **kwargs)))
+            print(f"    {name:32s} {tokens:8d}  ({raw / tokens:.1f}x smaller)")
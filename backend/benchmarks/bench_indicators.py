@@ -0,0 +1,116 @@
+"""
+Technical indicators for 1 and 500 tickers: the previous per-ticker pandas path (pandas_ta MACD, rolling stochastics,
+RSI, ADR, OBV and moving average crosses, then a StockTechnicalIndicatorOutput per row) versus the vectorized engine
+computing the whole (dates, tickers) matrix in one pass.
+
+Run from the backend directory:
+    python -m benchmarks.bench_indicators --tickers 1 500
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.tools.finances.get_stock_technical_indicators import StockTechnicalIndicatorOutput
+from src.tools.finances.indicators import INDICATOR_COLUMNS, compute_indicators
+
+from .fixtures import synthetic_history, synthetic_tickers, to_matrices
+
+K_PERIOD = 14
+D_PERIOD = 3
+
+
+def _ema(series: pd.Series, length: int) -> pd.Series:
+    # pandas_ta's ema: seeded with the simple average of the first `length` values
+    series = series.loc[series.first_valid_index():].copy()
+    seed = series.iloc[:length].sum() / length
+    series.iloc[:length - 1] = np.nan
+    series.iloc[length - 1] = seed
+    return series.ewm(span=length, adjust=False).mean()
+
+def reference_macd(prices):
+    try:
+        import pandas_ta  # noqa: F401
+        prices.ta.macd(close="Close", fast=12, slow=26, signal=9, append=True)
+    except ImportError:
+        macd = _ema(prices["Close"], 12) - _ema(prices["Close"], 26)
+        signal = _ema(macd, 9).reindex(prices.index)
+        prices["MACD_12_26_9"] = macd
+        prices["MACDs_12_26_9"] = signal
+        prices["MACDh_12_26_9"] = macd - signal
+    prices.rename(columns={"MACD_12_26_9": "macd", "MACDs_12_26_9": "macd_signal", "MACDh_12_26_9": "macd_histogram"}, inplace=True)
+
+def reference_indicators(prices: pd.DataFrame) -> list:
+    """The per-ticker implementation the tool used before the engine"""
+    reference_macd(prices)
+    prices["n_high"] = prices["High"].rolling(K_PERIOD).max()
+    prices["n_low"] = prices["Low"].rolling(K_PERIOD).min()
+    prices["K"] = (prices["Close"] - prices["n_low"]) * 100 / (prices["n_high"] - prices["n_low"])
+    prices["D"] = prices['K'].rolling(D_PERIOD).mean()
+    prices["ma_50"] = prices["Close"].rolling(window=50).mean()
+    prices["ma_200"] = prices["Close"].rolling(window=200).mean()
+    prices["death_cross_signal"] = prices['ma_50'] < prices['ma_200']
+    prices["death_cross"] = prices["death_cross_signal"].diff()
+    prices["golden_cross_signal"] = prices['ma_50'] > prices['ma_200']
+    prices['golden_cross'] = prices['golden_cross_signal'].diff()
+    delta = prices["Close"].diff()
+    gain = delta.where(delta > 0, 0)
+    loss = -delta.where(delta < 0, 0)
+    prices["rsi"] = 100 - (100 / (1 + gain.rolling(7).mean() / loss.rolling(7).mean()))
+    prices["dr"] = prices["High"] - prices["Low"]
+    prices["adr"] = prices["dr"].rolling(7).mean()
+    prices["obv"] = (np.sign(prices["Close"].diff()) * prices["Volume"]).fillna(0).cumsum()
+
+    prices.index = prices.index.strftime("%Y-%m-%d")
+    prices.drop(columns=["Dividends", "Stock Splits"], inplace=True)
+    prices.rename(columns={"Open": "open", "High": "high", "Low": "low", "Close": "close", "Volume": "volume"}, inplace=True)
+    prices.rename_axis("date", inplace=True)
+    return [StockTechnicalIndicatorOutput(**item) for item in prices.reset_index().to_dict(orient='records')]
+
+def engine_indicators(matrices: dict, dates: pd.Index) -> dict:
+    indicators = compute_indicators(matrices["Open"], matrices["High"], matrices["Low"], matrices["Close"], matrices["Volume"])
+    # Returning records is part of the cost of the tool, build them for every ticker
+    date_strings = dates.strftime("%Y-%m-%d")
+    return {
+        column: pd.DataFrame({"date": date_strings, **{name: values[:, column] for name, values in indicators.items()}}).to_dict(orient="records")
+        for column in range(matrices["Close"].shape[1])
+    }
+
+def max_difference(histories: dict, matrices: dict) -> float:
+    indicators = compute_indicators(matrices["Open"], matrices["High"], matrices["Low"], matrices["Close"], matrices["Volume"])
+    worst = 0.0
+    for column, (ticker, prices) in enumerate(histories.items()):
+        reference = reference_indicators(prices.copy())
+        for name in INDICATOR_COLUMNS:
+            expected = np.array([getattr(row, name) for row in reference], dtype=np.float64)
+            actual = indicators[name][:, column]
+            both = ~np.isnan(expected) & ~np.isnan(actual)
+            assert (np.isnan(expected) == np.isnan(actual)).all(), f"{ticker} {name}: NaN rows differ"
+            scale = np.maximum(np.abs(expected[both]), 1.0)
+            worst = max(worst, float(np.max(np.abs(expected[both] - actual[both]) / scale, initial=0.0)))
+    return worst
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tickers", type=int, nargs="+", default=[1, 500])
+    parser.add_argument("--days", type=int, default=252)
+    args = parser.parse_args()
+
+    for count in args.tickers:
+        histories = synthetic_history(synthetic_tickers(count), days=args.days)
+        matrices = to_matrices(histories)
+        dates = next(iter(histories.values())).index
+
+        print(f"{count} tickers x {args.days} days, max relative difference {max_difference(dict(list(histories.items())[:20]), {k: v[:, :20] for k, v in matrices.items()}):.2e}")
+        per_ticker = timed(lambda: [reference_indicators(prices.copy()) for prices in histories.values()])
+        engine = timed(lambda: engine_indicators(matrices, dates))
+        engine_only = timed(lambda: compute_indicators(matrices["Open"], matrices["High"], matrices["Low"], matrices["Close"], matrices["Volume"]))
+        print(f"  per-ticker pandas + pydantic  {per_ticker * 1000:10.1f}ms")
+        print(f"  engine + records              {engine * 1000:10.1f}ms  ({per_ticker / engine:.1f}x)")
+        print(f"  engine only                   {engine_only * 1000:10.1f}ms  ({per_ticker / engine_only:.1f}x)")
@@ -0,0 +1,105 @@
+"""
+get_options_chain on a SPY-sized chain: the previous path (one expiration after the other, iterrows and an
+OptionContract per row, a list of lists) versus the engine (concurrent expirations, vectorized masks, columnar
+output).  The provider is replaced by a chain that is either synthetic or recorded with --record, and every
+expiration request sleeps --latency seconds to stand in for the round trip to Yahoo.
+
+Run from the backend directory:
+    python -m benchmarks.bench_options_chain
+    python -m benchmarks.bench_options_chain --record SPY --chain spy_chain.pkl   # needs network
+    python -m benchmarks.bench_options_chain --chain spy_chain.pkl
+"""
+import argparse
+import json
+import pickle
+import time
+from collections import namedtuple
+
+import yfinance as yf
+
+from src.tools.finances import options_chain
+from src.tools.finances.get_options_chain import OptionContract, get_options_chain
+from src.tools.finances.market_data import market_data_cache
+
+from .fixtures import synthetic_option_chain
+
+Options = namedtuple("Options", ["calls", "puts", "underlying"])
+
+
+class RecordedTicker:
+    """Stands in for yf.Ticker, serving a recorded chain with a fixed latency per request"""
+    chain: dict = {}
+    latency: float = 0.0
+
+    def __init__(self, ticker: str, session=None):
+        self.ticker = ticker
+
+    @property
+    def options(self) -> tuple:
+        return tuple(self.chain)
+
+    def option_chain(self, expiration: str) -> Options:
+        time.sleep(self.latency)
+        return Options(self.chain[expiration]["calls"].copy(), self.chain[expiration]["puts"].copy(), self.chain[expiration]["underlying"])
+
+def record(ticker: str, path: str):
+    yf_ticker = yf.Ticker(ticker)
+    chain = {}
+    for expiration in yf_ticker.options:
+        recorded = yf_ticker.option_chain(expiration)
+        chain[expiration] = {"calls": recorded.calls, "puts": recorded.puts, "underlying": recorded.underlying}
+    with open(path, "wb") as file:
+        pickle.dump(chain, file)
+
+def previous_path(ticker: str, max_expirations: int) -> list:
+    """The implementation the tool had before the engine"""
+    ticker = RecordedTicker(ticker)
+    option_contracts = []
+    for option in ticker.options[:max_expirations]:
+        option_chain = ticker.option_chain(option)
+        for df in (option_chain.calls, option_chain.puts):
+            df = df.assign(expiration=option)
+            option_contracts.append([OptionContract(**row) for _, row in df[df['inTheMoney'] == False].iterrows()])
+    return option_contracts
+
+def timed(fn) -> tuple:
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chain", help="Pickled chain recorded with --record, a synthetic SPY-sized chain by default")
+    parser.add_argument("--record", metavar="TICKER", help="Record the live chain of TICKER to --chain and exit")
+    parser.add_argument("--latency", type=float, default=0.15)
+    parser.add_argument("--expirations", type=int, nargs="+", default=[4, 12])
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.record, args.chain)
+        raise SystemExit(0)
+
+    if args.chain:
+        with open(args.chain, "rb") as file:
+            RecordedTicker.chain = pickle.load(file)
+    else:
+        RecordedTicker.chain = synthetic_option_chain()
+    RecordedTicker.latency = args.latency
+    yf.Ticker = options_chain.yf.Ticker = RecordedTicker
+    contracts = sum(len(side["calls"]) + len(side["puts"]) for side in RecordedTicker.chain.values())
+    print(f"{len(RecordedTicker.chain)} expirations, {contracts} contracts, {args.latency * 1000:.0f}ms per expiration request")
+
+    for count in args.expirations:
+        market_data_cache.entries.clear()
+        previous, previous_result = timed(lambda: previous_path("SPY", count))
+        previous_bytes = len(json.dumps([[contract.model_dump(mode="json") for contract in side] for side in previous_result]))
+        engine, engine_result = timed(lambda: get_options_chain.invoke({"ticker": "SPY", "max_expirations": count}))
+        engine_bytes = len(json.dumps(engine_result))
+        cached, _ = timed(lambda: get_options_chain.invoke({"ticker": "SPY", "max_expirations": count}))
+        window, window_result = timed(lambda: get_options_chain.invoke({"ticker": "SPY", "max_expirations": count, "strike_window": 0.05}))
+
+        print(f"  {count} expirations")
+        print(f"    sequential + iterrows        {previous * 1000:9.1f}ms  {previous_bytes / 1024:9.1f}KB")
+        print(f"    engine                       {engine * 1000:9.1f}ms  {engine_bytes / 1024:9.1f}KB  ({previous / engine:.1f}x)")
+        print(f"    engine, cached               {cached * 1000:9.1f}ms")
+        print(f"    engine, +/-5% strike window  {window * 1000:9.1f}ms  {len(json.dumps(window_result)) / 1024:9.1f}KB")
@@ -0,0 +1,78 @@
+"""
+Risk of a 30 holding portfolio seeded offline into the price store: the agent's previous path of one
+get_stock_technical_indicators call per holding (plus one get_stock_quote call each, not timed here since quotes need
+the provider) with the covariance worked out from the returned rows, versus one get_portfolio_risk call, cold and
+warm.  The portfolio volatility and beta are checked against pandas.
+
+Run from the backend directory:
+    python -m benchmarks.bench_portfolio_risk --holdings 30
+"""
+import argparse
+import os
+import tempfile
+import time
+
+# The stores read their configuration at import time
+_root = tempfile.mkdtemp(prefix="bench_portfolio_risk-")
+os.environ["PRICE_STORE_DIR"] = os.path.join(_root, "prices")
+os.environ["INDICATOR_STATE_DIR"] = os.path.join(_root, "indicator_state")
+os.environ["PRICE_STORE_OFFLINE"] = "true"
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from src.tools.finances.get_portfolio_risk import get_portfolio_risk  # noqa: E402
+from src.tools.finances.get_stock_technical_indicators import get_stock_technical_indicators  # noqa: E402
+from src.tools.finances.price_store import get_price_store  # noqa: E402
+from src.tools.finances.universe import universe_cache  # noqa: E402
+
+from .fixtures import synthetic_history, synthetic_tickers  # noqa: E402
+
+BENCHMARK = "^GSPC"
+
+
+def per_holding(tickers: list, shares: np.ndarray) -> float:
+    closes = pd.DataFrame({
+        ticker: pd.Series({row["date"]: row["close"] for row in get_stock_technical_indicators.invoke({"ticker": ticker})})
+        for ticker in tickers
+    })
+    returns = closes.pct_change().dropna()
+    values = shares * closes.iloc[-1].to_numpy()
+    weights = values / values.sum()
+    return float(np.sqrt(weights @ returns.cov().to_numpy() @ weights * 252))
+
+def timed(fn) -> tuple:
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--holdings", type=int, default=30)
+    args = parser.parse_args()
+
+    tickers = synthetic_tickers(args.holdings)
+    histories = synthetic_history(tickers + [BENCHMARK], days=400, end=pd.Timestamp.today().normalize() - pd.Timedelta(days=1))
+    store = get_price_store()
+    for ticker, prices in histories.items():
+        store.seed(ticker, prices)
+    shares = np.arange(1, args.holdings + 1, dtype=np.float64)
+    request = {"tickers": tickers, "shares": list(shares), "investment_profile_total_score": 14}
+
+    loop, _ = timed(lambda: per_holding(tickers, shares))
+    cold, result = timed(lambda: get_portfolio_risk.invoke(request))
+    warm, _ = timed(lambda: get_portfolio_risk.invoke(request))
+
+    closes = pd.DataFrame({ticker: prices["Close"] for ticker, prices in histories.items()}).iloc[-253:]
+    returns = closes.pct_change().dropna()
+    values = shares * closes[tickers].iloc[-1].to_numpy()
+    weights = values / values.sum()
+    volatility = np.sqrt(weights @ returns[tickers].cov().to_numpy() @ weights * 252)
+    beta = weights @ (returns[tickers].apply(lambda column: column.cov(returns[BENCHMARK])) / returns[BENCHMARK].var()).to_numpy()
+    assert abs(result["portfolio"]["volatility"] - volatility) < 1e-4 and abs(result["portfolio"]["beta"] - beta) < 1e-4
+
+    print(f"{args.holdings} holdings, volatility {result['portfolio']['volatility']}, beta {result['portfolio']['beta']}, VaR {result['value_at_risk']}")
+    print(f"  {args.holdings} indicator calls (+{args.holdings} quote calls)  {loop * 1000:10.1f}ms")
+    print(f"  get_portfolio_risk, cold              {cold * 1000:10.1f}ms  ({loop / cold:.1f}x)")
+    print(f"  get_portfolio_risk, warm              {warm * 1000:10.1f}ms  ({loop / warm:.1f}x)")
+    print(f"  universe cache                        {universe_cache.stats()}")
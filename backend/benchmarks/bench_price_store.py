@@ -0,0 +1,80 @@
+"""
+get_stock_technical_indicators served from the local price store, seeded from fixtures and running offline:
+a cold request (the store has the prices but no indicator state exists yet) and a warm one (the state is up to date),
+against the previous path of fetching a year of history from the provider and computing everything on every request.
+Every provider call is counted, the store paths must make none.
+
+Run from the backend directory:
+    python -m benchmarks.bench_price_store --tickers 50
+"""
+import argparse
+import os
+import tempfile
+import time
+
+# The stores read their configuration at import time
+_root = tempfile.mkdtemp(prefix="bench_price_store-")
+os.environ["PRICE_STORE_DIR"] = os.path.join(_root, "prices")
+os.environ["INDICATOR_STATE_DIR"] = os.path.join(_root, "indicator_state")
+os.environ["PRICE_STORE_OFFLINE"] = "true"
+
+import pandas as pd  # noqa: E402
+import yfinance as yf  # noqa: E402
+
+from src.tools.finances.get_stock_technical_indicators import get_stock_technical_indicators  # noqa: E402
+from src.tools.finances.indicators import compute_indicator_frame  # noqa: E402
+from src.tools.finances.price_store import get_price_store  # noqa: E402
+
+from .fixtures import synthetic_history, synthetic_tickers  # noqa: E402
+
+provider_calls = 0
+
+
+class CountingTicker:
+    """Stands in for yf.Ticker and counts the requests that would have gone to the provider"""
+    histories: dict = {}
+
+    def __init__(self, ticker: str, session=None):
+        self.ticker = ticker
+
+    def history(self, **kwargs):
+        global provider_calls
+        provider_calls += 1
+        return self.histories[self.ticker].copy()
+
+def per_request_fetch(ticker: str):
+    # The previous path: a year of history from the provider and a full computation
+    return compute_indicator_frame(yf.Ticker(ticker).history(period="1y"))
+
+def run(fn, tickers: list) -> tuple:
+    global provider_calls
+    provider_calls = 0
+    start = time.perf_counter()
+    for ticker in tickers:
+        fn(ticker)
+    return (time.perf_counter() - start) / len(tickers), provider_calls
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tickers", type=int, default=50)
+    parser.add_argument("--days", type=int, default=252)
+    args = parser.parse_args()
+
+    tickers = synthetic_tickers(args.tickers)
+    # End yesterday so every bar is settled and the indicator state is persisted
+    histories = synthetic_history(tickers, days=args.days, end=pd.Timestamp.today().normalize() - pd.Timedelta(days=1))
+    CountingTicker.histories = histories
+    yf.Ticker = CountingTicker
+
+    store = get_price_store()
+    for ticker, prices in histories.items():
+        store.seed(ticker, prices)
+
+    fetch, fetch_calls = run(per_request_fetch, tickers)
+    cold, cold_calls = run(lambda ticker: get_stock_technical_indicators.invoke({"ticker": ticker}), tickers)
+    warm, warm_calls = run(lambda ticker: get_stock_technical_indicators.invoke({"ticker": ticker}), tickers)
+
+    print(f"{args.tickers} tickers x {args.days} days, per request (provider latency excluded)")
+    print(f"  fetch 1y + full compute   {fetch * 1000:8.2f}ms  {fetch_calls:5d} provider calls")
+    print(f"  store, cold state         {cold * 1000:8.2f}ms  {cold_calls:5d} provider calls")
+    print(f"  store, warm state         {warm * 1000:8.2f}ms  {warm_calls:5d} provider calls")
@@ -0,0 +1,89 @@
+"""
+The risk profile onboarding through the compiled graph: the user asks for a profile, answers the nine questions
+(one of them with a question of their own first) and gets their recommendations.  The model is a stand-in that
+takes --model-latency seconds per call and counts the calls and the characters it is sent.  The previous flow, where
+the model asked every question and scored the answers itself with the question bank in its system prompt, is
+replayed with the same stand-in for comparison.
+
+No request is sent to Azure OpenAI, only the client objects are built, so placeholder credentials are enough.
+
+Run from the backend directory:
+    python -m benchmarks.bench_questionnaire --model-latency 1.5
+"""
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("AZURE_OPENAI_ENDPOINT", "https://example.openai.azure.com/")
+os.environ.setdefault("AZURE_OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("AZURE_OPENAI_MODEL", "gpt-4o")
+os.environ.setdefault("OPENAI_API_VERSION", "2024-08-01-preview")
+os.environ.setdefault("POOL_MANAGEMENT_ENDPOINT", "https://example.dynamicsessions.io/")
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage  # noqa: E402
+
+from src.graph import create_graph  # noqa: E402
+from src.questionnaire import QUESTIONNAIRE_TOOL, QUESTIONS, format_question  # noqa: E402
+from src.registry import get_registry  # noqa: E402
+
+ANSWERS = ["B", "c", "What counts as a large swing?", "B", "A) less than 20%", "Yes, but it’s limited.", "B", "c", "(C)", "C"]
+
+
+class StandInModel:
+    """Answers like the model would at each point of the conversation"""
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+        self.characters = 0
+
+    async def ainvoke(self, messages: list, config=None) -> AIMessage:
+        self.calls += 1
+        self.characters += sum(len(str(message.content)) for message in messages)
+        await asyncio.sleep(self.latency)
+        last = messages[-1]
+        if isinstance(last, HumanMessage) and "risk profile" in last.content:
+            return AIMessage(content="", tool_calls=[{"name": QUESTIONNAIRE_TOOL, "args": {}, "id": f"call_{self.calls}", "type": "tool_call"}])
+        if any(isinstance(message, SystemMessage) and "did not answer A, B or C" in message.content for message in messages):
+            return AIMessage(content="A large swing is a fall of 20% or more in a few weeks.  Please answer A, B or C.")
+        return AIMessage(content="Here are the recommendations for your risk profile.")
+
+async def new_flow(model: StandInModel) -> dict:
+    get_registry().model_with_tools = model
+    graph = create_graph()
+    config = {"configurable": {"thread_id": "bench-questionnaire"}}
+    await graph.ainvoke({"messages": [HumanMessage(content="Can you build my risk profile?")]}, config)
+    for answer in ANSWERS:
+        state = await graph.ainvoke({"messages": [HumanMessage(content=answer)]}, config)
+    return state
+
+async def previous_flow(model: StandInModel):
+    # The question bank and the scoring instructions were part of the system prompt sent on every call
+    system = SystemMessage(content=get_registry().system_prompt.content + "\n".join(format_question(index) for index in range(len(QUESTIONS))))
+    history = [HumanMessage(content="Can you build my risk profile?")]
+    for answer in ANSWERS + [None]:
+        history.append(await model.ainvoke([system] + history))
+        if answer is not None:
+            history.append(HumanMessage(content=answer))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model-latency", type=float, default=1.5)
+    args = parser.parse_args()
+
+    previous = StandInModel(args.model_latency)
+    start = time.perf_counter()
+    asyncio.run(previous_flow(previous))
+    previous_seconds = time.perf_counter() - start
+
+    model = StandInModel(args.model_latency)
+    start = time.perf_counter()
+    state = asyncio.run(new_flow(model))
+    seconds = time.perf_counter() - start
+    profile = state["investment_profile"]
+    assert profile["investment_profile_total_score"] == 21, profile
+    assert [answer["answer"] for answer in profile["investment_profile_answers"]] == ["B", "C", "B", "A", "B", "B", "C", "C", "C"]
+
+    print(f"onboarding, {len(QUESTIONS)} questions, {args.model_latency}s per model call, score {profile['investment_profile_total_score']}")
+    print(f"  model asks and scores     {previous.calls:3d} model calls  {previous.characters:8d} characters sent  {previous_seconds:6.2f}s")
+    print(f"  questionnaire state       {model.calls:3d} model calls  {model.characters:8d} characters sent  {seconds:6.2f}s")
@@ -0,0 +1,95 @@
+"""
+get_stock_quote for a portfolio of tickers: the previous path (one `.info` scrape per ticker, one after the other)
+versus one batched request to the v7 quote endpoint, trimmed and full.  Yahoo is replaced by synthetic records and
+every request sleeps --latency seconds to stand in for the round trip, `.info` makes two requests per ticker
+(quoteSummary and quote).  --live runs both paths against Yahoo instead (needs network).
+
+Run from the backend directory:
+    python -m benchmarks.bench_quotes --tickers 1 5 20
+    python -m benchmarks.bench_quotes --live AAPL MSFT NVDA AMZN GOOGL
+"""
+import argparse
+import json
+import time
+
+import yfinance as yf
+
+from src.tools.finances import quotes
+from src.tools.finances.get_stock_quote import get_stock_quote
+from src.tools.finances.market_data import market_data_cache
+
+from .fixtures import synthetic_info, synthetic_quote, synthetic_tickers
+
+requests_made = 0
+
+
+class RecordedTicker:
+    """Stands in for yf.Ticker, `.info` costs two requests"""
+    latency: float = 0.0
+
+    def __init__(self, ticker: str, session=None):
+        self.ticker = ticker
+
+    @property
+    def info(self) -> dict:
+        global requests_made
+        requests_made += 2
+        time.sleep(2 * self.latency)
+        return synthetic_info(self.ticker)
+
+class RecordedYfData:
+    """Stands in for yfinance's YfData, one request per call whatever the number of symbols"""
+    latency: float = 0.0
+    user_agent_headers: dict = {}
+
+    def __init__(self, session=None):
+        pass
+
+    def get_raw_json(self, url, user_agent_headers=None, params=None, **kwargs) -> dict:
+        global requests_made
+        requests_made += 1
+        time.sleep(self.latency)
+        return {"quoteResponse": {"result": [synthetic_quote(symbol) for symbol in params["symbols"].split(",")], "error": None}}
+
+def previous_path(tickers: list) -> list:
+    """The implementation the tool had before: one tool call per ticker"""
+    return [{"information": yf.Ticker(ticker).info} for ticker in tickers]
+
+def timed(fn) -> tuple:
+    global requests_made
+    requests_made = 0
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, requests_made, len(json.dumps(result, default=str))
+
+def report(tickers: list):
+    market_data_cache.entries.clear()
+    rows = [
+        ("sequential .info", timed(lambda: previous_path(tickers))),
+        ("batched, trimmed", timed(lambda: get_stock_quote.invoke({"tickers": tickers}))),
+        ("batched, cached", timed(lambda: get_stock_quote.invoke({"tickers": tickers}))),
+    ]
+    market_data_cache.entries.clear()
+    rows.append(("batched, full", timed(lambda: get_stock_quote.invoke({"tickers": tickers, "full": True}))))
+    print(f"  {len(tickers)} tickers")
+    for name, (elapsed, made, size) in rows:
+        print(f"    {name:18s} {elapsed * 1000:9.1f}ms  {made:4d} requests  {size / 1024:8.1f}KB")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tickers", type=int, nargs="+", default=[1, 5, 20])
+    parser.add_argument("--latency", type=float, default=0.12)
+    parser.add_argument("--live", nargs="+", metavar="TICKER", help="Measure against Yahoo with these tickers")
+    args = parser.parse_args()
+
+    if args.live:
+        print("live, Yahoo Finance")
+        report(args.live)
+        raise SystemExit(0)
+
+    RecordedTicker.latency = RecordedYfData.latency = args.latency
+    yf.Ticker = RecordedTicker
+    quotes.YfData = RecordedYfData
+    print(f"{args.latency * 1000:.0f}ms per request")
+    for count in args.tickers:
+        report(synthetic_tickers(count))
@@ -0,0 +1,68 @@
+"""
+A screen over a universe of tickers seeded offline into the price store ("golden cross within 10 days and RSI under
+60", sorted by RSI): the agent's previous path of calling get_stock_technical_indicators for every ticker and
+filtering the last rows, versus the screener on a cold universe (read and computed from the store) and a warm one
+(cached until a ticker gets new bars).
+
+Run from the backend directory:
+    python -m benchmarks.bench_screener --tickers 500
+"""
+import argparse
+import os
+import tempfile
+import time
+
+# The stores read their configuration at import time
+_root = tempfile.mkdtemp(prefix="bench_screener-")
+os.environ["PRICE_STORE_DIR"] = os.path.join(_root, "prices")
+os.environ["INDICATOR_STATE_DIR"] = os.path.join(_root, "indicator_state")
+os.environ["PRICE_STORE_OFFLINE"] = "true"
+
+import pandas as pd  # noqa: E402
+
+from src.tools.finances.get_stock_technical_indicators import get_stock_technical_indicators  # noqa: E402
+from src.tools.finances.price_store import get_price_store  # noqa: E402
+from src.tools.finances.screener import screen  # noqa: E402
+from src.tools.finances.universe import universe_cache  # noqa: E402
+
+from .fixtures import synthetic_history, synthetic_tickers  # noqa: E402
+
+EXPRESSION = "within(golden_cross == 1, 10) and rsi < 60"
+
+
+def per_ticker(tickers: list) -> list:
+    matches = []
+    for ticker in tickers:
+        rows = get_stock_technical_indicators.invoke({"ticker": ticker})
+        last = rows[-1]
+        if any(row["golden_cross"] == 1 for row in rows[-10:]) and last["rsi"] is not None and last["rsi"] < 60:
+            matches.append((last["rsi"], ticker))
+    return [ticker for _, ticker in sorted(matches, reverse=True)]
+
+def timed(fn) -> tuple:
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tickers", type=int, default=500)
+    parser.add_argument("--days", type=int, default=400)
+    args = parser.parse_args()
+
+    tickers = synthetic_tickers(args.tickers)
+    histories = synthetic_history(tickers, days=args.days, end=pd.Timestamp.today().normalize() - pd.Timedelta(days=1))
+    store = get_price_store()
+    for ticker, prices in histories.items():
+        store.seed(ticker, prices)
+
+    loop, expected = timed(lambda: per_ticker(tickers))
+    cold, result = timed(lambda: screen(EXPRESSION, sort_by="rsi", limit=len(tickers)))
+    warm, _ = timed(lambda: screen(EXPRESSION, sort_by="rsi", limit=len(tickers)))
+    assert result["columns"]["ticker"] == expected, "the screener and the per-ticker loop disagree"
+
+    print(f"{args.tickers} tickers x {args.days} days, {result['count']} matches for {EXPRESSION!r}")
+    print(f"  per-ticker tool calls   {loop * 1000:10.1f}ms")
+    print(f"  screener, cold          {cold * 1000:10.1f}ms  ({loop / cold:.1f}x)")
+    print(f"  screener, warm          {warm * 1000:10.1f}ms  ({loop / warm:.1f}x)")
+    print(f"  universe cache          {universe_cache.stats()}")
@@ -0,0 +1,108 @@
+"""
+Weather questions as they come in, mostly the same few cities in different spellings, against a local server that
+stands in for OpenWeather (geocoding, current conditions and daily forecast, --latency seconds per request).
+Compares the previous path (requests.get by free-text location for every call) with the weather service, and counts
+the requests the server received.
+
+Run from the backend directory:
+    python -m benchmarks.bench_weather --questions 200
+"""
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+CITIES = {
+    "seattle,wa,us": ("Seattle", "Washington", "US", 47.6062, -122.3321),
+    "new york,ny,us": ("New York", "New York", "US", 40.7128, -74.006),
+    "chicago,il,us": ("Chicago", "Illinois", "US", 41.8781, -87.6298),
+    "austin,tx,us": ("Austin", "Texas", "US", 30.2672, -97.7431),
+    "miami,fl,us": ("Miami", "Florida", "US", 25.7617, -80.1918),
+}
+
+
+class OpenWeatherHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+    lock = threading.Lock()
+    requests_by_path: dict = {}
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        with self.lock:
+            self.requests_by_path[url.path] = self.requests_by_path.get(url.path, 0) + 1
+        time.sleep(self.latency)
+        if url.path == "/geo/1.0/direct":
+            city = CITIES.get(",".join(part.strip() for part in query["q"].lower().split(",")))
+            body = [{"name": city[0], "state": city[1], "country": city[2], "lat": city[3], "lon": city[4]}] if city else []
+        else:
+            body = {"coord": {"lat": query.get("lat"), "lon": query.get("lon")}, "q": query.get("q"), "main": {"temp": 61.2}, "list": [{"temp": {"day": 60}}] * int(query.get("cnt", 1))}
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+def questions(count: int, seed: int = 7) -> list:
+    """(tool, locations) pairs, the cities spelled the way a model might spell them"""
+    rng = random.Random(seed)
+    spellings = {
+        "seattle,wa,us": ["Seattle, WA, US", "seattle,wa,us", "Seattle,  WA, US"],
+        "new york,ny,us": ["New York, NY, US", "new york, ny, us"],
+        "chicago,il,us": ["Chicago, IL, US"],
+        "austin,tx,us": ["Austin, TX, US", "austin, tx, US"],
+        "miami,fl,us": ["Miami, FL, US"],
+    }
+    result = []
+    for _ in range(count):
+        cities = rng.sample(list(spellings), rng.choice([1, 1, 1, 2, 3]))
+        result.append((rng.choice(["current", "forecast"]), [rng.choice(spellings[city]) for city in cities]))
+    return result
+
+def previous_path(base_url: str, kind: str, location: str) -> dict:
+    """What the tools did before: one uncached request by free-text location, a new connection every time"""
+    path = "data/2.5/weather" if kind == "current" else "data/2.5/forecast/daily"
+    extra = "" if kind == "current" else "&cnt=10"
+    return requests.get(f"{base_url}/{path}?q={location}{extra}&appid=key&units=imperial").json()
+
+def timed(fn) -> tuple:
+    OpenWeatherHandler.requests_by_path = {}
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start, sum(OpenWeatherHandler.requests_by_path.values())
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--questions", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    OpenWeatherHandler.latency = args.latency
+    server = ThreadingHTTPServer(("127.0.0.1", 0), OpenWeatherHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    os.environ["OPENWEATHER_API_ENDPOINT"] = base_url
+    os.environ["OPENWEATHER_API_KEY"] = "key"
+
+    from src.tools.meteorologist.get_weather import get_weather  # noqa: E402
+    from src.tools.meteorologist.get_weather_forecast import get_weather_forecast  # noqa: E402
+
+    workload = questions(args.questions)
+    tools = {"current": get_weather, "forecast": get_weather_forecast}
+    previous, previous_requests = timed(lambda: [previous_path(base_url, kind, location) for kind, locations in workload for location in locations])
+    service, service_requests = timed(lambda: [tools[kind].invoke({"locations": locations}) for kind, locations in workload])
+
+    print(f"{args.questions} questions, {sum(len(locations) for _, locations in workload)} locations, {args.latency * 1000:.0f}ms per request")
+    print(f"  requests.get per location   {previous:7.2f}s  {previous_requests:5d} requests")
+    print(f"  weather service             {service:7.2f}s  {service_requests:5d} requests  {OpenWeatherHandler.requests_by_path}")
+    server.shutdown()
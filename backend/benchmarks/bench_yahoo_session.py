@@ -0,0 +1,87 @@
+"""
+Concurrent tool calls against a provider that throttles: a local server answers 429 to anything above --limit
+requests per second (like Yahoo does), and --threads callers each make --requests requests, through a plain
+requests.Session and through the rate-limited session.  Reports how many calls failed (a 429 reaching the tool,
+then the model), how many 429s the provider sent, and the queue metrics of the rate-limited session.
+
+Run from the backend directory:
+    python -m benchmarks.bench_yahoo_session --threads 16 --requests 10 --limit 20
+"""
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from src.tools.finances.yahoo_session import RateLimitedSession
+
+
+class ThrottlingHandler(BaseHTTPRequestHandler):
+    """Accepts --limit requests per one second window, answers 429 with Retry-After to the rest"""
+    limit = 20
+    lock = threading.Lock()
+    window = 0
+    count = 0
+    throttled = 0
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            window = int(time.monotonic())
+            if window != cls.window:
+                cls.window, cls.count = window, 0
+            cls.count += 1
+            allowed = cls.count <= cls.limit
+            if not allowed:
+                cls.throttled += 1
+        body = b'{"ok": true}' if allowed else b"Too Many Requests"
+        self.send_response(200 if allowed else 429)
+        if not allowed:
+            self.send_header("Retry-After", "1")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def run(session: requests.Session, url: str, threads: int, requests_per_thread: int) -> tuple:
+    ThrottlingHandler.throttled = 0
+
+    def caller(_) -> int:
+        failed = 0
+        for _ in range(requests_per_thread):
+            if session.get(url, timeout=30).status_code != 200:
+                failed += 1
+        return failed
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        failed = sum(pool.map(caller, range(threads)))
+    return time.perf_counter() - start, failed, ThrottlingHandler.throttled
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=10)
+    parser.add_argument("--limit", type=int, default=20, help="Requests per second the provider accepts")
+    args = parser.parse_args()
+
+    ThrottlingHandler.limit = args.limit
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ThrottlingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/v7/finance/quote"
+
+    total = args.threads * args.requests
+    print(f"{args.threads} threads x {args.requests} requests, the provider accepts {args.limit}/s")
+    elapsed, failed, throttled = run(requests.Session(), url, args.threads, args.requests)
+    print(f"  plain session          {elapsed:6.2f}s  {failed:4d}/{total} failed  {throttled:4d} 429s")
+    # Pace slightly under the provider's limit, the burst absorbs the first calls
+    session = RateLimitedSession(rate=args.limit * 0.9, burst=args.limit // 2, max_connections=args.threads)
+    time.sleep(1)
+    elapsed, failed, throttled = run(session, url, args.threads, args.requests)
+    print(f"  rate-limited session   {elapsed:6.2f}s  {failed:4d}/{total} failed  {throttled:4d} 429s")
+    print(f"  {session.stats()}")
+    server.shutdown()
@@ -0,0 +1,194 @@
+"""
+Synthetic market data for the benchmarks, so they run offline and are reproducible.
+"""
+import numpy as np
+import pandas as pd
+
+
+def synthetic_tickers(count: int) -> list:
+    return [f"T{i:04d}" for i in range(count)]
+
+def synthetic_history(tickers: list, days: int = 252, seed: int = 7, end: str = None) -> dict:
+    """Daily bars per ticker in the shape yfinance's Ticker.history returns them"""
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(end=end or pd.Timestamp.today().normalize(), periods=days, tz="America/New_York", name="Date")
+    histories = {}
+    for ticker in tickers:
+        returns = rng.normal(0.0004, 0.018, days)
+        close = 20 + rng.random() * 300 * np.exp(np.cumsum(returns))
+        open_ = close * (1 + rng.normal(0, 0.004, days))
+        high = np.maximum(open_, close) * (1 + rng.random(days) * 0.015)
+        low = np.minimum(open_, close) * (1 - rng.random(days) * 0.015)
+        volume = rng.integers(100_000, 50_000_000, days)
+        histories[ticker] = pd.DataFrame(
+            {"Open": open_, "High": high, "Low": low, "Close": close, "Volume": volume, "Dividends": 0.0, "Stock Splits": 0.0},
+            index=index
+        )
+    return histories
+
+def to_matrices(histories: dict) -> dict:
+    """(dates, tickers) matrices per column, aligned on the union of dates"""
+    panel = pd.concat(histories, axis=1)
+    return {column: panel.xs(column, axis=1, level=1).to_numpy(dtype=np.float64) for column in ("Open", "High", "Low", "Close", "Volume")}
+
+def synthetic_option_chain(ticker: str = "SPY", expirations: int = 30, strikes: int = 200, underlying_price: float = 500.0, seed: int = 7) -> dict:
+    """
+    {expiration: {"calls": DataFrame, "puts": DataFrame, "underlying": dict}} with the columns yfinance's
+    Ticker.option_chain returns, about the size of SPY's listed chain with the defaults
+    """
+    rng = np.random.default_rng(seed)
+    today = pd.Timestamp.today().normalize()
+    dates = [(today + pd.Timedelta(days=7 * i + 1)).strftime("%Y-%m-%d") for i in range(expirations)]
+    strike_values = np.round(underlying_price * np.linspace(0.5, 1.5, strikes))
+    chain = {}
+    for expiration in dates:
+        sides = {}
+        for side, letter in (("calls", "C"), ("puts", "P")):
+            in_the_money = strike_values < underlying_price if side == "calls" else strike_values > underlying_price
+            intrinsic = np.maximum(underlying_price - strike_values, 0) if side == "calls" else np.maximum(strike_values - underlying_price, 0)
+            last_price = np.round(intrinsic + rng.random(strikes) * 5, 2)
+            sides[side] = pd.DataFrame({
+                "contractSymbol": [f"{ticker}{expiration[2:].replace('-', '')}{letter}{int(strike * 1000):08d}" for strike in strike_values],
+                "lastTradeDate": pd.Timestamp.now(tz="UTC").floor("s") - pd.to_timedelta(rng.integers(0, 86_400, strikes), unit="s"),
+                "strike": strike_values,
+                "lastPrice": last_price,
+                "bid": np.round(last_price * 0.98, 2),
+                "ask": np.round(last_price * 1.02, 2),
+                "change": np.round(rng.normal(0, 0.5, strikes), 2),
+                "percentChange": rng.normal(0, 5, strikes),
+                "volume": rng.integers(0, 20_000, strikes).astype(np.float64),
+                "openInterest": rng.integers(0, 100_000, strikes),
+                "impliedVolatility": 0.12 + rng.random(strikes) * 0.4,
+                "inTheMoney": in_the_money,
+                "contractSize": "REGULAR",
+                "currency": "USD",
+            })
+        chain[expiration] = {**sides, "underlying": {"symbol": ticker, "regularMarketPrice": underlying_price}}
+    return chain
+
+POLYGON_LINE_ITEMS = {
+    "income_statement": [
+        "revenues", "cost_of_revenue", "gross_profit", "operating_expenses", "research_and_development",
+        "selling_general_and_administrative_expenses", "costs_and_expenses", "benefits_costs_expenses",
+        "operating_income_loss", "nonoperating_income_loss", "interest_expense_operating",
+        "income_loss_from_continuing_operations_before_tax", "income_tax_expense_benefit",
+        "income_loss_from_continuing_operations_after_tax", "net_income_loss", "net_income_loss_attributable_to_parent",
+        "net_income_loss_attributable_to_noncontrolling_interest", "preferred_stock_dividends_and_other_adjustments",
+        "participating_securities_distributed_and_undistributed_earnings_loss_basic",
+        "net_income_loss_available_to_common_stockholders_basic", "basic_earnings_per_share",
+        "diluted_earnings_per_share", "basic_average_shares", "diluted_average_shares",
+    ],
+    "balance_sheet": [
+        "assets", "current_assets", "noncurrent_assets", "fixed_assets", "other_current_assets", "other_noncurrent_assets",
+        "inventory", "accounts_payable", "wages", "liabilities", "current_liabilities", "noncurrent_liabilities",
+        "other_current_liabilities", "other_noncurrent_liabilities", "long_term_debt", "equity",
+        "equity_attributable_to_parent", "equity_attributable_to_noncontrolling_interest", "liabilities_and_equity",
+    ],
+    "cash_flow_statement": [
+        "net_cash_flow", "net_cash_flow_continuing", "net_cash_flow_from_operating_activities",
+        "net_cash_flow_from_operating_activities_continuing", "net_cash_flow_from_investing_activities",
+        "net_cash_flow_from_investing_activities_continuing", "net_cash_flow_from_financing_activities",
+        "net_cash_flow_from_financing_activities_continuing",
+    ],
+    "comprehensive_income": [
+        "comprehensive_income_loss", "comprehensive_income_loss_attributable_to_parent",
+        "comprehensive_income_loss_attributable_to_noncontrolling_interest", "other_comprehensive_income_loss",
+        "other_comprehensive_income_loss_attributable_to_parent",
+        "other_comprehensive_income_loss_attributable_to_noncontrolling_interest",
+    ],
+}
+
+def synthetic_financials(ticker: str = "AAPL", filings: int = 10, seed: int = 7) -> list:
+    """Filings shaped like the results of Polygon's vX/reference/financials, most recent first"""
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp.today().normalize() - pd.offsets.QuarterEnd()
+    results = []
+    for index in range(filings):
+        period_end = end - pd.offsets.QuarterEnd(index)
+        quarter = (period_end.month - 1) // 3 + 1
+        financials = {}
+        for statement, keys in POLYGON_LINE_ITEMS.items():
+            financials[statement] = {
+                key: {
+                    "value": float(round(rng.random() * 10, 2)) if "per_share" in key else float(rng.integers(1_000_000, 500_000_000_000)),
+                    "unit": "USD / shares" if "per_share" in key else ("shares" if "shares" in key else "USD"),
+                    "label": key.replace("_", " ").title(),
+                    "order": 100 * (order + 1),
+                }
+                for order, key in enumerate(keys)
+            }
+        results.append({
+            "start_date": (period_end - pd.offsets.QuarterBegin(startingMonth=1)).strftime("%Y-%m-%d"),
+            "end_date": period_end.strftime("%Y-%m-%d"),
+            "timeframe": "quarterly",
+            "fiscal_period": f"Q{quarter}",
+            "fiscal_year": str(period_end.year),
+            "cik": "0000320193",
+            "sic": "3571",
+            "tickers": [ticker],
+            "company_name": f"{ticker} Inc.",
+            "filing_date": (period_end + pd.Timedelta(days=35)).strftime("%Y-%m-%d"),
+            "acceptance_datetime": (period_end + pd.Timedelta(days=35)).strftime("%Y-%m-%dT16:30:00Z"),
+            "source_filing_url": f"https://api.polygon.io/v1/reference/sec/filings/0000320193-{index:02d}-000001",
+            "source_filing_file_url": f"https://api.polygon.io/v1/reference/sec/filings/0000320193-{index:02d}-000001/files/{ticker.lower()}-10q.xml",
+            "financials": financials,
+        })
+    return results
+
+def synthetic_quote(ticker: str, seed: int = 7) -> dict:
+    """A record shaped like a result of Yahoo's v7 quote endpoint, about 80 fields"""
+    rng = np.random.default_rng([seed, sum(map(ord, ticker))])
+    price = float(round(20 + rng.random() * 300, 2))
+    quote = {
+        "language": "en-US", "region": "US", "quoteType": "EQUITY", "typeDisp": "Equity", "quoteSourceName": "Nasdaq Real Time Price",
+        "triggerable": True, "customPriceAlertConfidence": "HIGH", "currency": "USD", "exchange": "NMS", "fullExchangeName": "NasdaqGS",
+        "exchangeTimezoneName": "America/New_York", "exchangeTimezoneShortName": "EDT", "gmtOffSetMilliseconds": -14400000,
+        "market": "us_market", "esgPopulated": False, "marketState": "REGULAR", "tradeable": False, "cryptoTradeable": False,
+        "shortName": f"{ticker} Inc.", "longName": f"{ticker} Incorporated", "messageBoardId": f"finmb_{ticker.lower()}",
+        "financialCurrency": "USD", "priceHint": 2, "sourceInterval": 15, "exchangeDataDelayedBy": 0, "hasPrePostMarketData": True,
+        "firstTradeDateMilliseconds": 345479400000, "displayName": ticker, "symbol": ticker,
+    }
+    for field in (
+        "regularMarketPrice", "regularMarketOpen", "regularMarketDayHigh", "regularMarketDayLow", "regularMarketPreviousClose",
+        "preMarketPrice", "postMarketPrice", "bid", "ask", "fiftyTwoWeekLow", "fiftyTwoWeekHigh", "fiftyDayAverage",
+        "twoHundredDayAverage", "targetPriceHigh", "targetPriceLow", "targetPriceMean", "bookValue", "priceToBook",
+    ):
+        quote[field] = float(round(price * (1 + rng.normal(0, 0.05)), 2))
+    for field in (
+        "regularMarketChange", "regularMarketChangePercent", "preMarketChange", "preMarketChangePercent", "postMarketChange",
+        "postMarketChangePercent", "fiftyDayAverageChange", "fiftyDayAverageChangePercent", "twoHundredDayAverageChange",
+        "twoHundredDayAverageChangePercent", "fiftyTwoWeekLowChange", "fiftyTwoWeekLowChangePercent", "fiftyTwoWeekHighChange",
+        "fiftyTwoWeekHighChangePercent", "trailingAnnualDividendRate", "trailingAnnualDividendYield", "dividendRate", "dividendYield",
+        "epsTrailingTwelveMonths", "epsForward", "epsCurrentYear", "priceEpsCurrentYear", "trailingPE", "forwardPE",
+    ):
+        quote[field] = float(round(rng.normal(0, 5), 4))
+    for field in (
+        "regularMarketVolume", "averageDailyVolume3Month", "averageDailyVolume10Day", "bidSize", "askSize", "sharesOutstanding",
+        "marketCap", "regularMarketTime", "preMarketTime", "postMarketTime", "earningsTimestamp", "earningsTimestampStart",
+        "earningsTimestampEnd", "dividendDate",
+    ):
+        quote[field] = int(rng.integers(1_000, 3_000_000_000_000))
+    quote["fiftyTwoWeekRange"] = f"{quote['fiftyTwoWeekLow']} - {quote['fiftyTwoWeekHigh']}"
+    quote["regularMarketDayRange"] = f"{quote['regularMarketDayLow']} - {quote['regularMarketDayHigh']}"
+    return quote
+
+def synthetic_info(ticker: str, seed: int = 7) -> dict:
+    """A record shaped like yfinance's Ticker.info: the quote plus the quoteSummary modules, about 160 fields"""
+    rng = np.random.default_rng([seed, sum(map(ord, ticker)), 1])
+    info = {
+        "address1": "1 Main Street", "city": "Cupertino", "state": "CA", "zip": "95014", "country": "United States",
+        "phone": "(408) 996-1010", "website": f"https://www.{ticker.lower()}.com", "industry": "Consumer Electronics",
+        "industryKey": "consumer-electronics", "industryDisp": "Consumer Electronics", "sector": "Technology",
+        "sectorKey": "technology", "sectorDisp": "Technology", "fullTimeEmployees": int(rng.integers(100, 200_000)),
+        "longBusinessSummary": " ".join([f"{ticker} designs, manufactures and markets products and services worldwide."] * 12),
+        "companyOfficers": [
+            {"maxAge": 1, "name": f"Officer {index}", "age": 50 + index, "title": "Officer", "yearBorn": 1970 + index,
+             "fiscalYear": 2024, "totalPay": int(rng.integers(1_000_000, 20_000_000)), "exercisedValue": 0, "unexercisedValue": 0}
+            for index in range(10)
+        ],
+        "irWebsite": f"https://investor.{ticker.lower()}.com", "maxAge": 86400, "uuid": f"{ticker.lower()}-uuid",
+    }
+    for index in range(90):
+        info[f"summaryField{index}"] = float(round(rng.normal(0, 100), 4))
+    info.update(synthetic_quote(ticker, seed))
+    return info
@@ -0,0 +1,88 @@
+"""
+Content-addressed store for the binary artifacts of tool calls (charts).
+
+Images leave the ToolMessage as soon as the tool returns: the bytes are written once under their SHA-256 and the
+message keeps a reference with the URL the API serves them at.  Conversation state, checkpoints and invoke responses
+then carry a few hundred bytes per chart instead of the base64 image, and since an address never changes its
+content, clients can cache a fetched artifact forever.
+"""
+import base64
+import hashlib
+import os
+import re
+import tempfile
+from typing import Optional, Tuple
+
+ARTIFACT_STORE_DIR = os.getenv("ARTIFACT_STORE_DIR", os.path.join(tempfile.gettempdir(), "artifacts"))
+ARTIFACT_URL_PREFIX = "/v2/artifacts"
+MEDIA_TYPES = {"png": "image/png", "jpeg": "image/jpeg", "gif": "image/gif", "svg": "image/svg+xml"}
+
+# <sha256>.<format>, nothing else can reach the file system
+_name_pattern = re.compile(r"^([0-9a-f]{64})\.(" + "|".join(MEDIA_TYPES) + r")$")
+
+
+class ArtifactStore:
+    def __init__(self, directory: str = ARTIFACT_STORE_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, name: str) -> str:
+        # Fanned out by the first two hex digits so no directory grows too large
+        return os.path.join(self.directory, name[:2], name)
+
+    def put(self, data: bytes, format: str) -> str:
+        """Stores the bytes (once, whatever the number of calls) and returns the artifact's name"""
+        if format not in MEDIA_TYPES:
+            raise ValueError(f"Unsupported artifact format {format}")
+        name = f"{hashlib.sha256(data).hexdigest()}.{format}"
+        path = self.path(name)
+        if os.path.exists(path):
+            return name
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return name
+
+    def exists(self, name: str) -> bool:
+        return _name_pattern.match(name) is not None and os.path.exists(self.path(name))
+
+    def get(self, name: str) -> Optional[Tuple[bytes, str]]:
+        """The bytes and media type of an artifact, None when the name is invalid or unknown"""
+        match = _name_pattern.match(name)
+        if match is None:
+            return None
+        try:
+            with open(self.path(name), "rb") as file:
+                return file.read(), MEDIA_TYPES[match.group(2)]
+        except FileNotFoundError:
+            return None
+
+    def externalize(self, artifact: object) -> object:
+        """
+        Replaces the base64 image of a tool artifact ({"result": {"type": "image", "format", "base64_data"}}, the
+        shape of the python shell's results) with a reference to the stored bytes.  Anything else is returned as is.
+        """
+        if not isinstance(artifact, dict) or not isinstance(artifact.get("result"), dict):
+            return artifact
+        result = artifact["result"]
+        if result.get("type") != "image" or "base64_data" not in result:
+            return artifact
+        data = base64.b64decode(result["base64_data"])
+        name = self.put(data, result.get("format", "png"))
+        reference = {key: value for key, value in result.items() if key != "base64_data"}
+        reference.update(url=f"{ARTIFACT_URL_PREFIX}/{name}", digest=name.split(".")[0], size=len(data))
+        return {**artifact, "result": reference}
+
+_store: Optional[ArtifactStore] = None
+
+def get_artifact_store() -> ArtifactStore:
+    global _store
+    if _store is None:
+        _store = ArtifactStore()
+    return _store
@@ -0,0 +1,60 @@
+import os
+
+from langgraph.checkpoint.base import BaseCheckpointSaver
+
+from .bounded import BoundedMemorySaver, SqliteSpillStore
+from .delta import CheckpointStorage, DeltaCheckpointSaver
+from .sql import SqliteCheckpointStorage
+
+
+def _int_env(name: str, default=None):
+    value = os.getenv(name)
+    return int(value) if value else default
+
+def _float_env(name: str, default=None):
+    value = os.getenv(name)
+    return float(value) if value else default
+
+def create_checkpoint_storage(backend: str) -> CheckpointStorage:
+    if backend == "sqlite":
+        return SqliteCheckpointStorage(os.getenv("CHECKPOINT_SQLITE_PATH", "checkpoints.db"))
+    if backend == "postgres":
+        from .postgres import PostgresCheckpointStorage
+        return PostgresCheckpointStorage(
+            os.getenv("CHECKPOINT_POSTGRES_URL"),
+            max_size=_int_env("CHECKPOINT_POSTGRES_POOL_SIZE", 10)
+        )
+    raise ValueError(f"Invalid CHECKPOINT_BACKEND: {backend}.  The options are 'memory', 'sqlite' or 'postgres'")
+
+def create_checkpointer() -> BaseCheckpointSaver:
+    """
+    Create the checkpointer that stores the state of every conversation thread.
+
+    Environment variables:
+        CHECKPOINT_BACKEND: 'memory' (default) keeps threads in the process, which only works with a single worker.
+            'sqlite' and 'postgres' store threads where every worker and replica can read them
+        CHECKPOINT_SQLITE_PATH: SQLite file for the 'sqlite' backend, it must be on a volume shared by the workers
+        CHECKPOINT_POSTGRES_URL: Connection string for the 'postgres' backend
+        CHECKPOINT_SNAPSHOT_INTERVAL: For the shared backends, a full copy of a channel is written every N versions (default 20)
+
+        CHECKPOINT_MAX_THREADS: Maximum number of threads kept in memory
+        CHECKPOINT_MAX_BYTES: Maximum serialized size of all threads kept in memory (default 256MB)
+        CHECKPOINT_TTL_SECONDS: Threads idle for longer than this are evicted from memory (default 1 hour)
+        CHECKPOINT_MAX_CHECKPOINTS_PER_THREAD: Number of checkpoints retained per thread (default 10)
+        CHECKPOINT_SPILL_PATH: SQLite file evicted threads are spilled to, if not set evicted threads are dropped
+    """
+    backend = os.getenv("CHECKPOINT_BACKEND", "memory").lower()
+    if backend != "memory":
+        return DeltaCheckpointSaver(
+            create_checkpoint_storage(backend),
+            snapshot_interval=_int_env("CHECKPOINT_SNAPSHOT_INTERVAL", 20)
+        )
+
+    spill_path = os.getenv("CHECKPOINT_SPILL_PATH")
+    return BoundedMemorySaver(
+        max_threads=_int_env("CHECKPOINT_MAX_THREADS"),
+        max_bytes=_int_env("CHECKPOINT_MAX_BYTES", 256 * 1024 * 1024),
+        ttl_seconds=_float_env("CHECKPOINT_TTL_SECONDS", 60 * 60),
+        max_checkpoints_per_thread=_int_env("CHECKPOINT_MAX_CHECKPOINTS_PER_THREAD", 10),
+        spill_store=SqliteSpillStore(spill_path) if spill_path else None
+    )
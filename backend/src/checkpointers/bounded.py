@@ -0,0 +1,427 @@
+import pickle
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    SerializerProtocol,
+    get_checkpoint_id,
+)
+
+
+class ThreadState:
+    """
+    Everything that is stored for a single conversation thread.  Values are kept in their serialized form so the
+    size of a thread is known exactly and the whole thread can be spilled to disk without re-serializing.
+    """
+    __slots__ = ("checkpoints", "writes", "blobs", "nbytes")
+
+    def __init__(self):
+        # checkpoint NS -> checkpoint ID -> (checkpoint, metadata, parent checkpoint ID, channel versions)
+        self.checkpoints: Dict[str, Dict[str, tuple]] = defaultdict(dict)
+        # (checkpoint NS, checkpoint ID) -> (task ID, write idx) -> (task ID, channel, value, task path)
+        self.writes: Dict[Tuple[str, str], Dict[Tuple[str, int], tuple]] = defaultdict(dict)
+        # (checkpoint NS, channel, version) -> value
+        self.blobs: Dict[Tuple[str, str, Any], Tuple[str, bytes]] = {}
+        self.nbytes = 0
+
+    def dumps(self) -> bytes:
+        return pickle.dumps((dict(self.checkpoints), dict(self.writes), self.blobs, self.nbytes), protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def loads(cls, payload: bytes) -> "ThreadState":
+        state = cls()
+        checkpoints, writes, state.blobs, state.nbytes = pickle.loads(payload)
+        state.checkpoints.update(checkpoints)
+        state.writes.update(writes)
+        return state
+
+
+class SqliteSpillStore:
+    """
+    Local on-disk store for threads that have been evicted from memory.  SQLite runs in WAL mode so spilling a thread
+    does not block readers that are resuming another one.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS spilled_threads ("
+            "thread_id TEXT PRIMARY KEY, payload BLOB NOT NULL, nbytes INTEGER NOT NULL, spilled_at REAL NOT NULL)"
+        )
+
+    def save(self, thread_id: str, state: ThreadState):
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO spilled_threads (thread_id, payload, nbytes, spilled_at) VALUES (?, ?, ?, ?)",
+                (thread_id, state.dumps(), state.nbytes, time.time())
+            )
+
+    def load(self, thread_id: str) -> Optional[ThreadState]:
+        with self.lock:
+            row = self.conn.execute("SELECT payload FROM spilled_threads WHERE thread_id = ?", (thread_id,)).fetchone()
+        return ThreadState.loads(row[0]) if row else None
+
+    def delete(self, thread_id: str):
+        with self.lock:
+            self.conn.execute("DELETE FROM spilled_threads WHERE thread_id = ?", (thread_id,))
+
+    def thread_ids(self) -> list:
+        with self.lock:
+            return [row[0] for row in self.conn.execute("SELECT thread_id FROM spilled_threads")]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class BoundedMemorySaver(BaseCheckpointSaver[str]):
+    """
+    An in-memory checkpoint saver with a bounded footprint.
+
+    Threads are kept in LRU order.  A thread is evicted from memory when it has been idle for longer than
+    `ttl_seconds`, or when the number of threads or the total serialized size goes over `max_threads` / `max_bytes`.
+    Evicted threads are spilled to `spill_store` (when one is configured) and transparently loaded back the next time
+    the thread is used, so idle conversations stop costing memory but can still be resumed.
+
+    Only the latest `max_checkpoints_per_thread` checkpoints of each thread are retained; older checkpoints are only
+    needed for time travel, which the API does not expose.
+    """
+    def __init__(
+        self,
+        *,
+        max_threads: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        max_checkpoints_per_thread: Optional[int] = None,
+        spill_store: Optional[SqliteSpillStore] = None,
+        serde: Optional[SerializerProtocol] = None,
+    ):
+        super().__init__(serde=serde)
+        self.max_threads = max_threads
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.max_checkpoints_per_thread = max_checkpoints_per_thread
+        self.spill_store = spill_store
+        self.threads: "OrderedDict[str, ThreadState]" = OrderedDict()
+        self.last_access: Dict[str, float] = {}
+        self.total_bytes = 0
+        self.evictions = 0
+        self.lock = threading.RLock()
+
+    # Thread bookkeeping
+
+    def _get_thread(self, thread_id: str, create: bool = False) -> Optional[ThreadState]:
+        state = self.threads.get(thread_id)
+        if state is None and self.spill_store is not None:
+            state = self.spill_store.load(thread_id)
+            if state is not None:
+                self.spill_store.delete(thread_id)
+                self.threads[thread_id] = state
+                self.total_bytes += state.nbytes
+        if state is None and create:
+            state = ThreadState()
+            self.threads[thread_id] = state
+        if state is not None:
+            self.threads.move_to_end(thread_id)
+            self.last_access[thread_id] = time.monotonic()
+        return state
+
+    def _peek_thread(self, thread_id: str) -> Optional[ThreadState]:
+        # Used when listing every thread, so spilled threads are read without being pulled back into memory
+        state = self.threads.get(thread_id)
+        if state is None and self.spill_store is not None:
+            state = self.spill_store.load(thread_id)
+        return state
+
+    def _evict(self, thread_id: str):
+        state = self.threads.pop(thread_id)
+        self.last_access.pop(thread_id, None)
+        self.total_bytes -= state.nbytes
+        self.evictions += 1
+        if self.spill_store is not None:
+            self.spill_store.save(thread_id, state)
+
+    def _enforce_limits(self, current_thread_id: str):
+        if self.ttl_seconds is not None:
+            deadline = time.monotonic() - self.ttl_seconds
+            for thread_id in list(self.threads.keys()):
+                if self.last_access.get(thread_id, 0) >= deadline:
+                    # Threads are kept in access order, so the rest are fresher
+                    break
+                if thread_id != current_thread_id:
+                    self._evict(thread_id)
+
+        def over_budget() -> bool:
+            return (
+                (self.max_threads is not None and len(self.threads) > self.max_threads)
+                or (self.max_bytes is not None and self.total_bytes > self.max_bytes)
+            )
+
+        for thread_id in list(self.threads.keys()):
+            if not over_budget():
+                break
+            if thread_id != current_thread_id:
+                self._evict(thread_id)
+
+    def _add(self, state: ThreadState, value: Tuple[str, bytes]) -> Tuple[str, bytes]:
+        state.nbytes += len(value[1])
+        self.total_bytes += len(value[1])
+        return value
+
+    def _remove(self, state: ThreadState, value: Tuple[str, bytes]):
+        state.nbytes -= len(value[1])
+        self.total_bytes -= len(value[1])
+
+    def _prune_checkpoints(self, state: ThreadState, checkpoint_ns: str):
+        checkpoints = state.checkpoints[checkpoint_ns]
+        if self.max_checkpoints_per_thread is None or len(checkpoints) <= self.max_checkpoints_per_thread:
+            return
+        for checkpoint_id in sorted(checkpoints.keys())[:-self.max_checkpoints_per_thread]:
+            checkpoint, metadata, _, _ = checkpoints.pop(checkpoint_id)
+            self._remove(state, checkpoint)
+            self._remove(state, metadata)
+            for _, _, value, _ in state.writes.pop((checkpoint_ns, checkpoint_id), {}).values():
+                self._remove(state, value)
+        # Drop channel values that no retained checkpoint points at anymore
+        referenced = {
+            (checkpoint_ns, channel, version)
+            for _, _, _, versions in checkpoints.values()
+            for channel, version in versions.items()
+        }
+        for key in [key for key in state.blobs if key[0] == checkpoint_ns and key not in referenced]:
+            self._remove(state, state.blobs.pop(key))
+
+    # Reads
+
+    def _load_blobs(self, state: ThreadState, checkpoint_ns: str, versions: ChannelVersions) -> Dict[str, Any]:
+        channel_values: Dict[str, Any] = {}
+        for channel, version in versions.items():
+            value = state.blobs.get((checkpoint_ns, channel, version))
+            if value is not None and value[0] != "empty":
+                channel_values[channel] = self.serde.loads_typed(value)
+        return channel_values
+
+    def _make_tuple(self, state: ThreadState, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> CheckpointTuple:
+        checkpoint, metadata, parent_checkpoint_id, versions = state.checkpoints[checkpoint_ns][checkpoint_id]
+        writes = state.writes.get((checkpoint_ns, checkpoint_id), {}).values()
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint={
+                **self.serde.loads_typed(checkpoint),
+                "channel_values": self._load_blobs(state, checkpoint_ns, versions),
+            },
+            metadata=self.serde.loads_typed(metadata),
+            pending_writes=[(task_id, channel, self.serde.loads_typed(value)) for task_id, channel, value, _ in writes],
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_checkpoint_id,
+                    }
+                }
+                if parent_checkpoint_id
+                else None
+            ),
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id: str = config["configurable"]["thread_id"]
+        checkpoint_ns: str = config["configurable"].get("checkpoint_ns", "")
+        with self.lock:
+            state = self._get_thread(thread_id)
+            if state is None or not state.checkpoints.get(checkpoint_ns):
+                return None
+            checkpoints = state.checkpoints[checkpoint_ns]
+            checkpoint_id = get_checkpoint_id(config) or max(checkpoints.keys())
+            if checkpoint_id not in checkpoints:
+                return None
+            return self._make_tuple(state, thread_id, checkpoint_ns, checkpoint_id)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        with self.lock:
+            if config:
+                thread_ids = [config["configurable"]["thread_id"]]
+            else:
+                thread_ids = list(self.threads.keys())
+                if self.spill_store is not None:
+                    thread_ids += [thread_id for thread_id in self.spill_store.thread_ids() if thread_id not in self.threads]
+            config_checkpoint_ns = config["configurable"].get("checkpoint_ns") if config else None
+            config_checkpoint_id = get_checkpoint_id(config) if config else None
+            before_checkpoint_id = get_checkpoint_id(before) if before else None
+
+            results = []
+            for thread_id in thread_ids:
+                state = self._get_thread(thread_id) if config else self._peek_thread(thread_id)
+                if state is None:
+                    continue
+                for checkpoint_ns, checkpoints in state.checkpoints.items():
+                    if config_checkpoint_ns is not None and checkpoint_ns != config_checkpoint_ns:
+                        continue
+                    for checkpoint_id in sorted(checkpoints.keys(), reverse=True):
+                        if config_checkpoint_id and checkpoint_id != config_checkpoint_id:
+                            continue
+                        if before_checkpoint_id and checkpoint_id >= before_checkpoint_id:
+                            continue
+                        if filter:
+                            metadata = self.serde.loads_typed(checkpoints[checkpoint_id][1])
+                            if not all(metadata.get(key) == value for key, value in filter.items()):
+                                continue
+                        if limit is not None and len(results) >= limit:
+                            break
+                        results.append(self._make_tuple(state, thread_id, checkpoint_ns, checkpoint_id))
+        yield from results
+
+    # Writes
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        c = checkpoint.copy()
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        values: Dict[str, Any] = c.pop("channel_values")
+        with self.lock:
+            state = self._get_thread(thread_id, create=True)
+            for channel, version in new_versions.items():
+                key = (checkpoint_ns, channel, version)
+                if key in state.blobs:
+                    self._remove(state, state.blobs[key])
+                state.blobs[key] = self._add(
+                    state, self.serde.dumps_typed(values[channel]) if channel in values else ("empty", b"")
+                )
+            if previous := state.checkpoints[checkpoint_ns].get(checkpoint["id"]):
+                self._remove(state, previous[0])
+                self._remove(state, previous[1])
+            state.checkpoints[checkpoint_ns][checkpoint["id"]] = (
+                self._add(state, self.serde.dumps_typed(c)),
+                self._add(state, self.serde.dumps_typed(metadata)),
+                config["configurable"].get("checkpoint_id"),  # parent
+                dict(checkpoint["channel_versions"]),
+            )
+            self._prune_checkpoints(state, checkpoint_ns)
+            self._enforce_limits(thread_id)
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        with self.lock:
+            state = self._get_thread(thread_id, create=True)
+            outer_writes = state.writes[(checkpoint_ns, checkpoint_id)]
+            for idx, (channel, value) in enumerate(writes):
+                inner_key = (task_id, WRITES_IDX_MAP.get(channel, idx))
+                if inner_key in outer_writes:
+                    if inner_key[1] >= 0:
+                        continue
+                    self._remove(state, outer_writes[inner_key][2])
+                outer_writes[inner_key] = (task_id, channel, self._add(state, self.serde.dumps_typed(value)), task_path)
+            self._enforce_limits(thread_id)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self.lock:
+            if thread_id in self.threads:
+                self.total_bytes -= self.threads.pop(thread_id).nbytes
+                self.last_access.pop(thread_id, None)
+            if self.spill_store is not None:
+                self.spill_store.delete(thread_id)
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            return {
+                "threads_in_memory": len(self.threads),
+                "bytes_in_memory": self.total_bytes,
+                "evictions": self.evictions,
+            }
+
+    # Async versions, the in-memory operations never wait on anything but the local spill file
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return self.get_tuple(config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        for item in self.list(config, filter=filter, before=before, limit=limit):
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return self.put(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        return self.put_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        return self.delete_thread(thread_id)
+
+    def get_next_version(self, current: Optional[str], channel: None) -> str:
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        next_v = current_v + 1
+        next_h = random.random()
+        return f"{next_v:032}.{next_h:016}"
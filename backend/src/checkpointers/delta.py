@@ -0,0 +1,333 @@
+import asyncio
+import random
+import threading
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    SerializerProtocol,
+    get_checkpoint_id,
+)
+
+
+def _copy(value: Any) -> Any:
+    # Cached lists are shared with the graph's channels, so never hand out the cached object itself
+    return list(value) if isinstance(value, list) else value
+
+
+class CheckpointStorage:
+    """
+    The storage a DeltaCheckpointSaver writes to.  Implementations only move rows in and out of a shared store, all of
+    the serialization and delta encoding happens in the saver.
+
+    Blob rows are (channel, version, base_version, depth, type, blob).  When base_version is set, the blob only holds
+    the items that were appended to the value stored under base_version.
+    """
+    def put_checkpoint(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str, parent_checkpoint_id: Optional[str],
+                       checkpoint: Tuple[str, bytes], metadata: Tuple[str, bytes], blobs: List[tuple]):
+        raise NotImplementedError
+
+    def put_writes(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str, writes: List[tuple]):
+        """
+        Stores (task_id, idx, channel, type, blob, task_path) rows.  Rows with a negative idx (errors, interrupts)
+        replace an existing row, regular writes are only stored once.
+        """
+        raise NotImplementedError
+
+    def get_checkpoint(self, thread_id: str, checkpoint_ns: str, checkpoint_id: Optional[str]) -> Optional[tuple]:
+        """Returns (checkpoint_id, parent_checkpoint_id, checkpoint, metadata), the latest one if no ID is given"""
+        raise NotImplementedError
+
+    def list_checkpoints(self, thread_id: Optional[str], checkpoint_ns: Optional[str], before: Optional[str]) -> Iterator[tuple]:
+        """Yields (thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, checkpoint, metadata), newest first"""
+        raise NotImplementedError
+
+    def get_blob_chain(self, thread_id: str, checkpoint_ns: str, channel: str, version: str) -> List[tuple]:
+        """Returns the blob rows needed to rebuild a channel value, starting at `version` and walking back to the snapshot"""
+        raise NotImplementedError
+
+    def get_writes(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> List[tuple]:
+        """Returns (task_id, channel, type, blob, task_path) ordered by task and index"""
+        raise NotImplementedError
+
+    def delete_thread(self, thread_id: str):
+        raise NotImplementedError
+
+
+class DeltaCheckpointSaver(BaseCheckpointSaver[str]):
+    """
+    A checkpoint saver that writes to a CheckpointStorage shared by every API worker and replica, so a thread can be
+    continued by whichever worker receives the next request.
+
+    Only channels that changed in a step are written.  When a list channel (the conversation messages) only had items
+    appended since the parent checkpoint, just the appended items are stored along with a reference to the previous
+    version, so the cost of a save does not grow with the length of the conversation.  A full snapshot is written every
+    `snapshot_interval` versions to keep reads short.
+    """
+    def __init__(
+        self,
+        storage: CheckpointStorage,
+        *,
+        snapshot_interval: int = 20,
+        cache_size: int = 256,
+        serde: Optional[SerializerProtocol] = None,
+    ):
+        super().__init__(serde=serde)
+        self.storage = storage
+        self.snapshot_interval = snapshot_interval
+        self.cache_size = cache_size
+        # (thread ID, checkpoint NS, channel, version) -> (value, depth) for values this process has read or written
+        self.values: "OrderedDict[tuple, Tuple[Any, int]]" = OrderedDict()
+        # (thread ID, checkpoint NS, checkpoint ID) -> channel versions of checkpoints this process has read or written
+        self.versions: "OrderedDict[tuple, ChannelVersions]" = OrderedDict()
+        self.lock = threading.Lock()
+
+    # Local caches, so a worker can compute deltas against the state it loaded at the start of a turn
+
+    def _remember(self, cache: OrderedDict, key: tuple, value: Any):
+        with self.lock:
+            cache[key] = value
+            cache.move_to_end(key)
+            while len(cache) > self.cache_size:
+                cache.popitem(last=False)
+
+    def _recall(self, cache: OrderedDict, key: tuple) -> Any:
+        with self.lock:
+            value = cache.get(key)
+            if value is not None:
+                cache.move_to_end(key)
+            return value
+
+    # Encoding
+
+    def _encode_blob(self, thread_id: str, checkpoint_ns: str, channel: str, version: str,
+                     value: Any, base_version: Optional[str]) -> tuple:
+        base = self._recall(self.values, (thread_id, checkpoint_ns, channel, base_version)) if base_version else None
+        if (
+            base is not None
+            and isinstance(value, list)
+            and isinstance(base[0], list)
+            and base[1] + 1 < self.snapshot_interval
+            and len(value) >= len(base[0])
+            and value[:len(base[0])] == base[0]
+        ):
+            depth = base[1] + 1
+            type_, blob = self.serde.dumps_typed(value[len(base[0]):])
+            row = (channel, version, base_version, depth, type_, blob)
+        else:
+            depth = 0
+            type_, blob = self.serde.dumps_typed(value)
+            row = (channel, version, None, depth, type_, blob)
+        self._remember(self.values, (thread_id, checkpoint_ns, channel, version), (_copy(value), depth))
+        return row
+
+    def _load_value(self, thread_id: str, checkpoint_ns: str, channel: str, version: str) -> Any:
+        if cached := self._recall(self.values, (thread_id, checkpoint_ns, channel, version)):
+            return cached[0]
+        chain = self.storage.get_blob_chain(thread_id, checkpoint_ns, channel, version)
+        if not chain:
+            return None
+        # The chain starts at the requested version and ends at the snapshot, so replay it backwards
+        value = None
+        for _, row_version, base_version, depth, type_, blob in reversed(chain):
+            if type_ == "empty":
+                value = None
+                continue
+            part = self.serde.loads_typed((type_, blob))
+            value = value + part if base_version is not None else part
+            self._remember(self.values, (thread_id, checkpoint_ns, channel, row_version), (value, depth))
+        return value
+
+    def _make_tuple(self, thread_id: str, checkpoint_ns: str, row: tuple) -> CheckpointTuple:
+        checkpoint_id, parent_checkpoint_id, checkpoint, metadata = row
+        checkpoint_: Checkpoint = self.serde.loads_typed(checkpoint)
+        channel_values = {}
+        for channel, version in checkpoint_["channel_versions"].items():
+            value = self._load_value(thread_id, checkpoint_ns, channel, version)
+            if value is not None:
+                channel_values[channel] = _copy(value)
+        self._remember(self.versions, (thread_id, checkpoint_ns, checkpoint_id), dict(checkpoint_["channel_versions"]))
+        writes = self.storage.get_writes(thread_id, checkpoint_ns, checkpoint_id)
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint={**checkpoint_, "channel_values": channel_values},
+            metadata=self.serde.loads_typed(metadata),
+            pending_writes=[
+                (task_id, channel, self.serde.loads_typed((type_, blob))) for task_id, channel, type_, blob, _ in writes
+            ],
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_checkpoint_id,
+                    }
+                }
+                if parent_checkpoint_id
+                else None
+            ),
+        )
+
+    # BaseCheckpointSaver
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id: str = config["configurable"]["thread_id"]
+        checkpoint_ns: str = config["configurable"].get("checkpoint_ns", "")
+        row = self.storage.get_checkpoint(thread_id, checkpoint_ns, get_checkpoint_id(config))
+        if row is None:
+            return None
+        return self._make_tuple(thread_id, checkpoint_ns, row)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"] if config else None
+        checkpoint_ns = config["configurable"].get("checkpoint_ns") if config else None
+        config_checkpoint_id = get_checkpoint_id(config) if config else None
+        before_checkpoint_id = get_checkpoint_id(before) if before else None
+        count = 0
+        for row in self.storage.list_checkpoints(thread_id, checkpoint_ns, before_checkpoint_id):
+            row_thread_id, row_checkpoint_ns, checkpoint_id, parent_checkpoint_id, checkpoint, metadata = row
+            if config_checkpoint_id and checkpoint_id != config_checkpoint_id:
+                continue
+            if filter:
+                metadata_ = self.serde.loads_typed(metadata)
+                if not all(metadata_.get(key) == value for key, value in filter.items()):
+                    continue
+            if limit is not None and count >= limit:
+                break
+            count += 1
+            yield self._make_tuple(row_thread_id, row_checkpoint_ns, (checkpoint_id, parent_checkpoint_id, checkpoint, metadata))
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        c = checkpoint.copy()
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        parent_checkpoint_id = config["configurable"].get("checkpoint_id")
+        values: Dict[str, Any] = c.pop("channel_values")
+        parent_versions = (
+            self._recall(self.versions, (thread_id, checkpoint_ns, parent_checkpoint_id)) if parent_checkpoint_id else None
+        ) or {}
+
+        blobs = []
+        for channel, version in new_versions.items():
+            if channel in values:
+                blobs.append(self._encode_blob(
+                    thread_id, checkpoint_ns, channel, version, values[channel], parent_versions.get(channel)
+                ))
+            else:
+                blobs.append((channel, version, None, 0, "empty", b""))
+
+        self.storage.put_checkpoint(
+            thread_id,
+            checkpoint_ns,
+            checkpoint["id"],
+            parent_checkpoint_id,
+            self.serde.dumps_typed(c),
+            self.serde.dumps_typed(metadata),
+            blobs
+        )
+        self._remember(self.versions, (thread_id, checkpoint_ns, checkpoint["id"]), dict(checkpoint["channel_versions"]))
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        rows = []
+        for idx, (channel, value) in enumerate(writes):
+            type_, blob = self.serde.dumps_typed(value)
+            rows.append((task_id, WRITES_IDX_MAP.get(channel, idx), channel, type_, blob, task_path))
+        self.storage.put_writes(thread_id, checkpoint_ns, checkpoint_id, rows)
+
+    def delete_thread(self, thread_id: str) -> None:
+        self.storage.delete_thread(thread_id)
+        with self.lock:
+            for cache in (self.values, self.versions):
+                for key in [key for key in cache if key[0] == thread_id]:
+                    del cache[key]
+
+    # The storage does blocking I/O, so the async versions run it off the event loop
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        items = await asyncio.to_thread(lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+        for item in items:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        return await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        return await asyncio.to_thread(self.delete_thread, thread_id)
+
+    def get_next_version(self, current: Optional[str], channel: None) -> str:
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        next_v = current_v + 1
+        next_h = random.random()
+        return f"{next_v:032}.{next_h:016}"
@@ -0,0 +1,30 @@
+from contextlib import contextmanager
+
+from .sql import SqlCheckpointStorage
+
+
+class PostgresCheckpointStorage(SqlCheckpointStorage):
+    """
+    CheckpointStorage in PostgreSQL, shared by every replica of the API.  Connections come from a psycopg pool so a
+    save does not pay for a new connection.
+    """
+    blob_type = "BYTEA"
+    placeholder = "%s"
+
+    def __init__(self, conninfo: str, min_size: int = 1, max_size: int = 10):
+        try:
+            from psycopg_pool import ConnectionPool
+        except ImportError as e:
+            raise ImportError("The postgres checkpointer requires psycopg, install it with `pip install psycopg[binary,pool]`") from e
+
+        self.pool = ConnectionPool(conninfo, min_size=min_size, max_size=max_size, open=True)
+        self.setup()
+
+    @contextmanager
+    def connection(self):
+        # The pool commits when the block exits cleanly and rolls back on error
+        with self.pool.connection() as conn:
+            yield conn
+
+    def close(self):
+        self.pool.close()
@@ -0,0 +1,213 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Tuple
+
+from .delta import CheckpointStorage
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS checkpoints (
+        thread_id TEXT NOT NULL,
+        checkpoint_ns TEXT NOT NULL DEFAULT '',
+        checkpoint_id TEXT NOT NULL,
+        parent_checkpoint_id TEXT,
+        type TEXT NOT NULL,
+        checkpoint {blob} NOT NULL,
+        metadata_type TEXT NOT NULL,
+        metadata {blob} NOT NULL,
+        PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS checkpoint_blobs (
+        thread_id TEXT NOT NULL,
+        checkpoint_ns TEXT NOT NULL DEFAULT '',
+        channel TEXT NOT NULL,
+        version TEXT NOT NULL,
+        base_version TEXT,
+        depth INTEGER NOT NULL,
+        type TEXT NOT NULL,
+        blob {blob},
+        PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS checkpoint_writes (
+        thread_id TEXT NOT NULL,
+        checkpoint_ns TEXT NOT NULL DEFAULT '',
+        checkpoint_id TEXT NOT NULL,
+        task_id TEXT NOT NULL,
+        idx INTEGER NOT NULL,
+        channel TEXT NOT NULL,
+        type TEXT NOT NULL,
+        blob {blob} NOT NULL,
+        task_path TEXT NOT NULL DEFAULT '',
+        PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+    )
+    """,
+]
+
+INSERT_CHECKPOINT = """
+    INSERT INTO checkpoints (thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (thread_id, checkpoint_ns, checkpoint_id) DO UPDATE SET
+        checkpoint = excluded.checkpoint, metadata = excluded.metadata
+"""
+
+INSERT_BLOB = """
+    INSERT INTO checkpoint_blobs (thread_id, checkpoint_ns, channel, version, base_version, depth, type, blob)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (thread_id, checkpoint_ns, channel, version) DO NOTHING
+"""
+
+INSERT_WRITE = """
+    INSERT INTO checkpoint_writes (thread_id, checkpoint_ns, checkpoint_id, task_id, idx, channel, type, blob, task_path)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (thread_id, checkpoint_ns, checkpoint_id, task_id, idx) DO {action}
+"""
+
+UPSERT_WRITE_ACTION = "UPDATE SET channel = excluded.channel, type = excluded.type, blob = excluded.blob"
+
+SELECT_CHECKPOINT_COLUMNS = "checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata"
+
+SELECT_BLOB_CHAIN = """
+    WITH RECURSIVE chain (channel, version, base_version, depth, type, blob) AS (
+        SELECT channel, version, base_version, depth, type, blob FROM checkpoint_blobs
+        WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?
+        UNION ALL
+        SELECT b.channel, b.version, b.base_version, b.depth, b.type, b.blob
+        FROM checkpoint_blobs b JOIN chain c ON b.version = c.base_version
+        WHERE b.thread_id = ? AND b.checkpoint_ns = ? AND b.channel = ?
+    )
+    SELECT channel, version, base_version, depth, type, blob FROM chain ORDER BY depth DESC
+"""
+
+
+class SqlCheckpointStorage(CheckpointStorage):
+    """
+    CheckpointStorage over a SQL database.  Statements are written with `?` placeholders and in the dialect shared
+    by SQLite and PostgreSQL, subclasses only provide a connection and the blob column type.
+    """
+    blob_type = "BLOB"
+    placeholder = "?"
+
+    @contextmanager
+    def connection(self):
+        raise NotImplementedError
+
+    def _sql(self, statement: str) -> str:
+        return statement if self.placeholder == "?" else statement.replace("?", self.placeholder)
+
+    def setup(self):
+        with self.connection() as conn:
+            for statement in SCHEMA:
+                conn.execute(statement.format(blob=self.blob_type))
+
+    def put_checkpoint(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str, parent_checkpoint_id: Optional[str],
+                       checkpoint: Tuple[str, bytes], metadata: Tuple[str, bytes], blobs: List[tuple]):
+        with self.connection() as conn:
+            for channel, version, base_version, depth, type_, blob in blobs:
+                conn.execute(
+                    self._sql(INSERT_BLOB),
+                    (thread_id, checkpoint_ns, channel, version, base_version, depth, type_, blob)
+                )
+            conn.execute(
+                self._sql(INSERT_CHECKPOINT),
+                (thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, checkpoint[0], checkpoint[1], metadata[0], metadata[1])
+            )
+
+    def put_writes(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str, writes: List[tuple]):
+        with self.connection() as conn:
+            for task_id, idx, channel, type_, blob, task_path in writes:
+                statement = INSERT_WRITE.format(action=UPSERT_WRITE_ACTION if idx < 0 else "NOTHING")
+                conn.execute(
+                    self._sql(statement),
+                    (thread_id, checkpoint_ns, checkpoint_id, task_id, idx, channel, type_, blob, task_path)
+                )
+
+    def get_checkpoint(self, thread_id: str, checkpoint_ns: str, checkpoint_id: Optional[str]) -> Optional[tuple]:
+        with self.connection() as conn:
+            if checkpoint_id:
+                row = conn.execute(
+                    self._sql(f"SELECT {SELECT_CHECKPOINT_COLUMNS} FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?"),
+                    (thread_id, checkpoint_ns, checkpoint_id)
+                ).fetchone()
+            else:
+                row = conn.execute(
+                    self._sql(f"SELECT {SELECT_CHECKPOINT_COLUMNS} FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? ORDER BY checkpoint_id DESC LIMIT 1"),
+                    (thread_id, checkpoint_ns)
+                ).fetchone()
+        if row is None:
+            return None
+        checkpoint_id, parent_checkpoint_id, type_, checkpoint, metadata_type, metadata = row
+        return checkpoint_id, parent_checkpoint_id, (type_, bytes(checkpoint)), (metadata_type, bytes(metadata))
+
+    def list_checkpoints(self, thread_id: Optional[str], checkpoint_ns: Optional[str], before: Optional[str]) -> Iterator[tuple]:
+        clauses, params = [], []
+        for column, value, operator in (("thread_id", thread_id, "="), ("checkpoint_ns", checkpoint_ns, "="), ("checkpoint_id", before, "<")):
+            if value is not None:
+                clauses.append(f"{column} {operator} ?")
+                params.append(value)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self.connection() as conn:
+            rows = conn.execute(
+                self._sql(f"SELECT thread_id, checkpoint_ns, {SELECT_CHECKPOINT_COLUMNS} FROM checkpoints {where} ORDER BY checkpoint_id DESC"),
+                params
+            ).fetchall()
+        for thread_id_, checkpoint_ns_, checkpoint_id, parent_checkpoint_id, type_, checkpoint, metadata_type, metadata in rows:
+            yield thread_id_, checkpoint_ns_, checkpoint_id, parent_checkpoint_id, (type_, bytes(checkpoint)), (metadata_type, bytes(metadata))
+
+    def get_blob_chain(self, thread_id: str, checkpoint_ns: str, channel: str, version: str) -> List[tuple]:
+        with self.connection() as conn:
+            rows = conn.execute(
+                self._sql(SELECT_BLOB_CHAIN),
+                (thread_id, checkpoint_ns, channel, version, thread_id, checkpoint_ns, channel)
+            ).fetchall()
+        return [
+            (channel_, version_, base_version, depth, type_, bytes(blob) if blob is not None else b"")
+            for channel_, version_, base_version, depth, type_, blob in rows
+        ]
+
+    def get_writes(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> List[tuple]:
+        with self.connection() as conn:
+            rows = conn.execute(
+                self._sql("SELECT task_id, channel, type, blob, task_path FROM checkpoint_writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_id, idx"),
+                (thread_id, checkpoint_ns, checkpoint_id)
+            ).fetchall()
+        return [(task_id, channel, type_, bytes(blob), task_path) for task_id, channel, type_, blob, task_path in rows]
+
+    def delete_thread(self, thread_id: str):
+        with self.connection() as conn:
+            for table in ("checkpoints", "checkpoint_blobs", "checkpoint_writes"):
+                conn.execute(self._sql(f"DELETE FROM {table} WHERE thread_id = ?"), (thread_id,))
+
+
+class SqliteCheckpointStorage(SqlCheckpointStorage):
+    """
+    CheckpointStorage in a local SQLite file.  WAL mode lets every uvicorn worker on the host (or a shared volume) read
+    and write the same file, and it needs no infrastructure for local development and tests.
+    """
+    def __init__(self, path: str, timeout: float = 30):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=timeout, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.setup()
+
+    @contextmanager
+    def connection(self):
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.conn
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            else:
+                self.conn.execute("COMMIT")
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
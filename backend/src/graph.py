@@ -1,22 +1,13 @@
-import os
-from .tools.finances.get_stock_quote import get_stock_quote
-from .tools.finances.get_stock_technical_indicators import get_stock_technical_indicators
-from .tools.finances.get_stock_news import get_stock_news
-from .tools.finances.get_stock_financials import get_stock_financials
-from .tools.meteorologist.get_weather import get_weather
-from .tools.meteorologist.get_weather_forecast import get_weather_forecast
-from .tools.finances.get_options_chain import get_options_chain
-from .prompts import SYSTEM_PROMPT, INVESTMENT_RISK_PROFILE_PROMPT
-
-from langchain_azure_dynamic_sessions import SessionsPythonREPLTool
+from .registry import get_registry
+from .checkpointers import create_checkpointer
+from .tool_executor import AgentState
+from .questionnaire import after_reply, in_progress, questionnaire_context, questionnaire_started, questionnaire_step, route_questionnaire
+
 from langchain_core.runnables import RunnableConfig
 from langchain_core.messages import SystemMessage, AIMessage, HumanMessage, RemoveMessage, trim_messages
-from langchain_openai import AzureChatOpenAI
 
-from langgraph.checkpoint.memory import MemorySaver
-from langgraph.graph import MessagesState, StateGraph, START, END
+from langgraph.graph import StateGraph, START, END
 from langgraph.graph.graph import CompiledGraph
-from langgraph.prebuilt import ToolNode
 
 from typing import List, Union
 
@@ -26,66 +17,54 @@ from pydantic import BaseModel
 class ChatInputType(BaseModel):
     messages: List[Union[HumanMessage, AIMessage, SystemMessage]]
 
-def should_continue(state: MessagesState):
+def route_start(state: AgentState):
+    # The answers to the risk questionnaire are validated and scored without the model
+    if in_progress(state):
+        return "questionnaire"
+    return "agent"
+
+def should_continue(state: AgentState):
     last_message = state["messages"][-1]
     if not last_message.tool_calls:
         return END
     return "action"
 
-def get_tools() -> list:
-     # Code Interpreter Tool that will be used to run python code in the context of the conversation
-    repl = SessionsPythonREPLTool(
-        pool_management_endpoint=os.getenv("POOL_MANAGEMENT_ENDPOINT"),
-        description="A python shell that is used for running python code.   It can be used to chart technical statistics that are returned from the get_stock_technical_indicators tool."
-    )
-    # The tools that will be used to answer questions as part of the conversation
-    tools = [
-        get_stock_quote, 
-        get_stock_technical_indicators, 
-        get_stock_news, 
-        get_stock_financials,
-        get_options_chain,
-        get_weather,
-        get_weather_forecast,
-        repl
-    ]
-    return tools
-
-async def call_model(state: MessagesState, config: RunnableConfig):
-    model = AzureChatOpenAI(
-        azure_deployment=os.getenv("AZURE_OPENAI_MODEL"),
-        api_version=os.getenv("OPENAI_API_VERSION"),
-        temperature=0,
-        #streaming=True,
-        max_retries=3
-    )
-    model_with_tools = model.bind_tools(tools=get_tools())
-    system_prompt = SystemMessage(content=SYSTEM_PROMPT)
+def after_action(state: AgentState):
+    if questionnaire_started(state["messages"]):
+        return "questionnaire"
+    return "agent"
+
+async def call_model(state: AgentState, config: RunnableConfig):
+    registry = get_registry()
 
     #messages = trim_messages(state["messages"], strategy="last", token_counter=len, max_tokens=15, start_on="human", end_on=("human", "tool"), include_system=True)
 
-    response = await model_with_tools.ainvoke([system_prompt] + state["messages"], config=config)
+    response = await registry.model_with_tools.ainvoke([registry.system_prompt] + questionnaire_context(state) + state["messages"], config=config)
 
-    return { "messages": response }
+    return { "messages": response, **after_reply(state, response) }
 
 def filter_messages(messages: list):
     return messages[-1:]
 
 def create_graph() -> CompiledGraph:
-    # Initialize the memory save that will be used to save the state of the conversation in memory for a specific thread/user
-    memory = MemorySaver()
-    tool_node = ToolNode(get_tools())
-    workflow = StateGraph(MessagesState)
+    # Initialize the checkpointer that will be used to save the state of the conversation for a specific thread/user.
+    # It is bounded, idle threads are spilled to disk instead of staying in memory forever
+    memory = create_checkpointer()
+    # Runs the tool calls of a turn concurrently, each with its own timeout
+    tool_executor = get_registry().tool_executor
+    workflow = StateGraph(AgentState)
 
     workflow.add_node("agent", call_model)
-    workflow.add_node("action", tool_node)
-    workflow.add_edge(START, "agent")
+    workflow.add_node("action", tool_executor.execute)
+    workflow.add_node("questionnaire", questionnaire_step)
+    workflow.add_conditional_edges(START, route_start, ["questionnaire", "agent"])
     workflow.add_conditional_edges(
         "agent",
         should_continue,
         ["action", END]
     )
-    workflow.add_edge("action", "agent")
+    workflow.add_conditional_edges("action", after_action, ["questionnaire", "agent"])
+    workflow.add_conditional_edges("questionnaire", route_questionnaire, {"agent": "agent", "end": END})
 
     graph = workflow.compile(checkpointer=memory).with_types(input_type=ChatInputType, output_type=dict).with_config({"configurable": {"thread_id": "{thread_id}"}})
     return graph
\ No newline at end of file
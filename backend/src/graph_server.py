@@ -2,12 +2,15 @@ import os
 import uvicorn
 
 from .graph import create_graph
+from .tools.finances.yahoo_session import get_yahoo_session
+from .artifacts import get_artifact_store
+from .tools.finances.screener import DEFAULT_LIMIT, screen
 
 from langserve import APIHandler
 from dotenv import load_dotenv
 from typing import Annotated, AsyncGenerator
 
-from fastapi import FastAPI, Depends, Request, Response, Security
+from fastapi import FastAPI, Depends, HTTPException, Request, Response, Security
 from fastapi.middleware.cors import CORSMiddleware
 from sse_starlette import EventSourceResponse
 
@@ -23,7 +26,8 @@ from azure.monitor.opentelemetry import configure_azure_monitor
 from azure.identity import DefaultAzureCredential
 from logging import getLogger, INFO
 
-from pydantic import AnyHttpUrl
+from pydantic import AnyHttpUrl, BaseModel
+from starlette.concurrency import run_in_threadpool
 from pydantic_settings import BaseSettings
 from fastapi_azure_auth import MultiTenantAzureAuthorizationCodeBearer
 from contextlib import asynccontextmanager
@@ -143,6 +147,43 @@ async def v2_stream(
     return await runnable.stream(request)
 
 
+# Images produced by the tools, the messages only carry their URL.  The name is the SHA-256 of the content, so it
+# never changes and clients can cache it for good
+@app.get("/v2/artifacts/{name}", dependencies=dependencies, include_in_schema=True)
+def v2_artifact(name: str, request: Request) -> Response:
+    store = get_artifact_store()
+    if not store.exists(name):
+        raise HTTPException(status_code=404, detail="Artifact not found")
+    etag = f'"{name.split(".")[0]}"'
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=31536000, immutable"}
+    if request.headers.get("If-None-Match") == etag:
+        return Response(status_code=304, headers=headers)
+    artifact = store.get(name)
+    if artifact is None:
+        raise HTTPException(status_code=404, detail="Artifact not found")
+    content, media_type = artifact
+    return Response(content=content, media_type=media_type, headers=headers)
+
+class ScreenerRequest(BaseModel):
+    expression: str
+    tickers: list[str] | None = None
+    sort_by: str | None = None
+    descending: bool = True
+    limit: int = DEFAULT_LIMIT
+
+# The screener tool without the model, for clients that build their own filters
+@app.post("/v2/screener", dependencies=dependencies, include_in_schema=True)
+async def v2_screener(request: ScreenerRequest) -> dict:
+    try:
+        return await run_in_threadpool(screen, request.expression, request.tickers, request.sort_by, request.descending, request.limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# Queue depth, wait times and throttling of the shared Yahoo Finance session
+@app.get("/v2/providers/yahoo", dependencies=dependencies, include_in_schema=True)
+def v2_yahoo_stats():
+    return get_yahoo_session().stats()
+
 @app.get("/v2/liveness", status_code=200)
 def v2_liveness():
     return { "status": "ok"}
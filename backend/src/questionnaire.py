@@ -0,0 +1,210 @@
+"""
+The investment risk profile questionnaire as a state machine in the graph's state, instead of instructions the model
+follows one round trip per question.
+
+start_risk_questionnaire hands the conversation to the questionnaire node, which asks the questions one at a time,
+validates the A/B/C answers and computes the investment profile total score itself.  While it is in progress every
+turn is routed to it from START, the model is only called when a reply is not an answer (free-text questions about
+a question) and on the turn that completes it, to give the recommendations for the user's risk band.  The completed
+profile is kept in the state in the shape of the user-profile service's InvestmentProfileRequest.
+"""
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, ToolMessage
+
+from .tools.finances.portfolio_risk import risk_band
+
+QUESTIONNAIRE_TOOL = "start_risk_questionnaire"
+
+IN_PROGRESS = "in_progress"
+COMPLETED = "completed"
+# The model gave its recommendations for the completed profile
+RECOMMENDED = "recommended"
+
+POINTS = {"A": 1, "B": 2, "C": 3}
+STOP_WORDS = {"stop", "cancel", "quit", "exit"}
+
+
+@dataclass(frozen=True)
+class Question:
+    category: str
+    text: str
+    options: Dict[str, str]
+
+QUESTIONS = [
+    Question("Emotional Comfort with Risk", "How would you react if your investment lost 20% of its value in a short period?", {
+        "A": "Sell immediately to avoid further loss.",
+        "B": "Wait and see, but feel concerned.",
+        "C": "Stay invested and consider buying more at a lower price.",
+    }),
+    Question("Emotional Comfort with Risk", "Do you prioritize preserving your capital over growing it, even if growth is slow?", {
+        "A": "Strongly agree.",
+        "B": "Neutral.",
+        "C": "Strongly disagree.",
+    }),
+    Question("Emotional Comfort with Risk", "How comfortable are you with the possibility of large swings in your portfolio's value?", {
+        "A": "Not comfortable at all.",
+        "B": "Somewhat comfortable.",
+        "C": "Very comfortable.",
+    }),
+    Question("Financial Capacity for Risk", "What percentage of your total savings are you willing to invest in higher-risk investments?", {
+        "A": "Less than 20%.",
+        "B": "20–50%.",
+        "C": "Over 50%.",
+    }),
+    Question("Financial Capacity for Risk", "Do you have an emergency fund to cover at least 6 months of expenses?", {
+        "A": "No.",
+        "B": "Yes, but it’s limited.",
+        "C": "Yes, and it’s substantial.",
+    }),
+    Question("Financial Capacity for Risk", "Would a significant investment loss affect your ability to meet essential expenses?", {
+        "A": "Yes, significantly.",
+        "B": "Somewhat, but manageable.",
+        "C": "No, I have other resources.",
+    }),
+    Question("Investment Goals and Time Horizon", "What is your investment time horizon?", {
+        "A": "Less than 3 years.",
+        "B": "3–10 years.",
+        "C": "10+ years.",
+    }),
+    Question("Investment Goals and Time Horizon", "Are you saving for a specific goal, like retirement, or for general wealth-building?", {
+        "A": "A near-term goal (e.g., buying a house in 2 years).",
+        "B": "A mid-term goal (e.g., children’s education in 5–10 years).",
+        "C": "A long-term goal (e.g., retirement in 20 years).",
+    }),
+    Question("Investment Goals and Time Horizon", "How important is it to you to grow your investments versus preserving capital?", {
+        "A": "Preservation is more important.",
+        "B": "A balance between growth and preservation.",
+        "C": "Growth is most important.",
+    }),
+]
+
+# "b", "(B)", "B.", "b) wait and see", "option C"
+_letter_pattern = re.compile(r"^\s*(?:option\s+|answer\s+)?\(?([abc])\s*(?:[.):,\-]|$)", re.IGNORECASE)
+
+
+def _normalize(text: str) -> str:
+    return " ".join(re.sub(r"[^\w%+]+", " ", text.lower()).split())
+
+def parse_answer(question: Question, reply: str) -> Optional[str]:
+    """The letter of the option the reply picks, None when it is not one of them"""
+    match = _letter_pattern.match(reply)
+    if match:
+        return match.group(1).upper()
+    reply = _normalize(reply)
+    picked = [letter for letter, option in question.options.items() if reply == _normalize(option) or reply.startswith(_normalize(option) + " ")]
+    return picked[0] if len(picked) == 1 else None
+
+def format_question(index: int) -> str:
+    question = QUESTIONS[index]
+    options = "\n".join(f"{letter}: {option}" for letter, option in question.options.items())
+    return f"Question {index + 1} of {len(QUESTIONS)} ({question.category})\n{question.text}\n{options}\n\nPlease answer A, B or C."
+
+def total_score(answers: List[dict]) -> int:
+    return sum(POINTS[answer["answer"]] for answer in answers)
+
+def _category_scores(answers: List[dict]) -> Dict[str, Tuple[int, int]]:
+    """The points and the maximum points of every category"""
+    scores: Dict[str, Tuple[int, int]] = {}
+    for answer in answers:
+        category = QUESTIONS[answer["question"] - 1].category
+        points, maximum = scores.get(category, (0, 0))
+        scores[category] = (points + POINTS[answer["answer"]], maximum + max(POINTS.values()))
+    return scores
+
+def _last_human_message(messages: List[BaseMessage]) -> Optional[HumanMessage]:
+    return next((message for message in reversed(messages) if isinstance(message, HumanMessage)), None)
+
+def questionnaire_started(messages: List[BaseMessage]) -> bool:
+    """Whether the tool calls that were just run include start_risk_questionnaire"""
+    calls = next((message for message in reversed(messages) if isinstance(message, AIMessage)), None)
+    return calls is not None and any(call["name"] == QUESTIONNAIRE_TOOL for call in calls.tool_calls)
+
+def questionnaire_step(state: dict) -> dict:
+    """
+    Starts the questionnaire right after start_risk_questionnaire ran, otherwise applies the user's reply to the
+    current question: the next question, the result, or a request for clarification by the model.
+    """
+    messages = state["messages"]
+    questionnaire = state.get("risk_questionnaire")
+    if isinstance(messages[-1], ToolMessage) or not questionnaire or questionnaire.get("status") != IN_PROGRESS:
+        intro = f"Let's build your investment risk profile with {len(QUESTIONS)} questions, answer each of them with A, B or C (or stop to end the questionnaire)."
+        return {
+            "risk_questionnaire": {"status": IN_PROGRESS, "question": 0, "answers": [], "clarify": False},
+            "messages": AIMessage(content=f"{intro}\n\n{format_question(0)}"),
+        }
+
+    index = questionnaire["question"]
+    reply = _last_human_message(messages)
+    text = reply.content if reply is not None and isinstance(reply.content, str) else ""
+    if _normalize(text) in STOP_WORDS:
+        return {"risk_questionnaire": None, "messages": AIMessage(content="The risk questionnaire is stopped, you can start it again at any time.")}
+    letter = parse_answer(QUESTIONS[index], text)
+    if letter is None:
+        # A question about the question, the model answers it and asks again
+        return {"risk_questionnaire": {**questionnaire, "clarify": True}}
+
+    answers = questionnaire["answers"] + [{"question": index + 1, "answer": letter}]
+    if index + 1 < len(QUESTIONS):
+        return {
+            "risk_questionnaire": {**questionnaire, "question": index + 1, "answers": answers, "clarify": False},
+            "messages": AIMessage(content=format_question(index + 1)),
+        }
+
+    score = total_score(answers)
+    band = risk_band(score)
+    categories = ", ".join(f"{category} {points} of {maximum}" for category, (points, maximum) in _category_scores(answers).items())
+    return {
+        "risk_questionnaire": {**questionnaire, "status": COMPLETED, "question": len(QUESTIONS), "answers": answers, "clarify": False},
+        "investment_profile": {"investment_profile_answers": answers, "investment_profile_total_score": score},
+        "messages": AIMessage(content=f"Your investment profile total score is {score} of {max(POINTS.values()) * len(QUESTIONS)}, a {band.name.lower()} risk profile ({categories})."),
+    }
+
+def route_questionnaire(state: dict) -> str:
+    """After the questionnaire node: the model clarifies and recommends, questions wait for the user's reply"""
+    questionnaire = state.get("risk_questionnaire")
+    if questionnaire and (questionnaire["clarify"] or questionnaire["status"] == COMPLETED):
+        return "agent"
+    return "end"
+
+def in_progress(state: dict) -> bool:
+    questionnaire = state.get("risk_questionnaire")
+    return bool(questionnaire) and questionnaire.get("status") == IN_PROGRESS
+
+def after_reply(state: dict, response: AIMessage) -> dict:
+    """
+    The state update for the model's reply: once it answered the completion turn (its last call, after the tools
+    it used for the recommendations), the recommendations are not asked for again
+    """
+    questionnaire = state.get("risk_questionnaire")
+    if questionnaire and questionnaire["status"] == COMPLETED and not response.tool_calls:
+        return {"risk_questionnaire": {**questionnaire, "status": RECOMMENDED}}
+    return {}
+
+def questionnaire_context(state: dict) -> List[SystemMessage]:
+    """What the model is told about the questionnaire and the user's profile, after the system prompt"""
+    context = []
+    questionnaire = state.get("risk_questionnaire")
+    if in_progress(state) and questionnaire["clarify"]:
+        context.append(SystemMessage(content=(
+            f"The user is answering the risk questionnaire and did not answer A, B or C to this question:\n"
+            f"{format_question(questionnaire['question'])}\n"
+            "Help them with what they wrote without choosing for them, then ask them to answer A, B or C.  Do not call start_risk_questionnaire."
+        )))
+    profile = state.get("investment_profile")
+    if profile and questionnaire and questionnaire["status"] == COMPLETED:
+        score = profile["investment_profile_total_score"]
+        context.append(SystemMessage(content=(
+            f"The user just completed the risk questionnaire, their investment profile total score is {score}, a "
+            f"{risk_band(score).name.lower()} risk profile (answers {', '.join(answer['answer'] for answer in profile['investment_profile_answers'])}).  "
+            "Follow steps 4 to 6 of the risk profile instructions.  Pass the score to get_portfolio_risk."
+        )))
+    elif profile:
+        score = profile["investment_profile_total_score"]
+        context.append(SystemMessage(content=(
+            f"The user's investment profile total score is {score}, a {risk_band(score).name.lower()} risk profile.  "
+            "Pass the score to get_portfolio_risk."
+        )))
+    return context
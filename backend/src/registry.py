@@ -0,0 +1,95 @@
+import os
+from functools import lru_cache
+
+from .tools.finances.get_stock_quote import get_stock_quote
+from .tools.finances.get_stock_technical_indicators import get_stock_technical_indicators
+from .tools.finances.get_stock_news import get_stock_news
+from .tools.finances.get_stock_financials import get_stock_financials
+from .tools.finances.get_financial_metrics import get_financial_metrics
+from .tools.meteorologist.get_weather import get_weather
+from .tools.meteorologist.get_weather_forecast import get_weather_forecast
+from .tools.finances.get_options_chain import get_options_chain
+from .tools.finances.get_option_analytics import get_option_analytics
+from .tools.finances.get_stock_chart import get_stock_chart
+from .tools.finances.screen_stocks import screen_stocks
+from .tools.finances.backtest_signals import backtest_signals
+from .tools.finances.get_portfolio_risk import get_portfolio_risk
+from .tools.advisor.start_risk_questionnaire import start_risk_questionnaire
+from .prompts import SYSTEM_PROMPT
+from .tool_executor import ConcurrentToolExecutor, ToolPolicy, ON_TIMEOUT_ERROR
+from .artifacts import get_artifact_store
+
+from langchain_azure_dynamic_sessions import SessionsPythonREPLTool
+from langchain_core.messages import SystemMessage
+from langchain_core.tools import BaseTool
+from langchain_openai import AzureChatOpenAI
+
+
+def build_tools() -> list:
+    # Code Interpreter Tool that will be used to run python code in the context of the conversation
+    repl = SessionsPythonREPLTool(
+        pool_management_endpoint=os.getenv("POOL_MANAGEMENT_ENDPOINT"),
+        description="A python shell that is used for running python code.   It can be used for charts get_stock_chart does not draw, using the technical statistics that are returned from the get_stock_technical_indicators tool."
+    )
+    # The tools that will be used to answer questions as part of the conversation
+    tools = [
+        get_stock_quote,
+        get_stock_technical_indicators,
+        get_stock_news,
+        get_stock_financials,
+        get_financial_metrics,
+        get_options_chain,
+        get_option_analytics,
+        get_stock_chart,
+        screen_stocks,
+        backtest_signals,
+        get_portfolio_risk,
+        start_risk_questionnaire,
+        get_weather,
+        get_weather_forecast,
+        repl
+    ]
+    return tools
+
+def build_tool_policies() -> dict[str, ToolPolicy]:
+    # Tools that are known to be slower than the default timeout
+    return {
+        "get_options_chain": ToolPolicy(timeout=60, on_timeout=ON_TIMEOUT_ERROR),
+        "get_option_analytics": ToolPolicy(timeout=60, on_timeout=ON_TIMEOUT_ERROR),
+        # The first chart starts the render processes
+        "get_stock_chart": ToolPolicy(timeout=60, on_timeout=ON_TIMEOUT_ERROR),
+        "screen_stocks": ToolPolicy(timeout=60, on_timeout=ON_TIMEOUT_ERROR),
+        "backtest_signals": ToolPolicy(timeout=60, on_timeout=ON_TIMEOUT_ERROR),
+        "get_portfolio_risk": ToolPolicy(timeout=60, on_timeout=ON_TIMEOUT_ERROR),
+        "Python_REPL": ToolPolicy(timeout=120, on_timeout=ON_TIMEOUT_ERROR),
+    }
+
+def build_model() -> AzureChatOpenAI:
+    return AzureChatOpenAI(
+        azure_deployment=os.getenv("AZURE_OPENAI_MODEL"),
+        api_version=os.getenv("OPENAI_API_VERSION"),
+        temperature=0,
+        #streaming=True,
+        max_retries=3
+    )
+
+class AgentRegistry:
+    """
+    Holds everything the agent needs for a turn that does not depend on the conversation: the model client
+    (and its HTTP connection pool), the tool objects and the tool schemas bound to the model.  It is built once
+    per process and shared by every turn and thread.
+    """
+    def __init__(self):
+        self.tools: list[BaseTool] = build_tools()
+        self.tools_by_name: dict[str, BaseTool] = {tool.name: tool for tool in self.tools}
+        self.model = build_model()
+        # bind_tools converts every tool to its OpenAI schema, so keep the bound runnable around
+        self.model_with_tools = self.model.bind_tools(tools=self.tools)
+        self.tool_schemas: list[dict] = self.model_with_tools.kwargs["tools"]
+        self.system_prompt = SystemMessage(content=SYSTEM_PROMPT)
+        # Shared by every thread, so the number of tool calls running at once is bounded for the whole process
+        self.tool_executor = ConcurrentToolExecutor(self.tools, policies=build_tool_policies(), artifact_store=get_artifact_store())
+
+@lru_cache(maxsize=1)
+def get_registry() -> AgentRegistry:
+    return AgentRegistry()
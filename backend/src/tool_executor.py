@@ -0,0 +1,141 @@
+import asyncio
+import contextvars
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import Dict, List, Optional
+
+from langchain_core.messages import AIMessage, ToolCall, ToolMessage
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import BaseTool
+from langgraph.graph import MessagesState
+
+from .artifacts import ArtifactStore
+
+# What happens to the other tool calls of a turn when one of them times out
+ON_TIMEOUT_ERROR = "error"              # Only the call that timed out fails, the others keep running
+ON_TIMEOUT_CANCEL_TURN = "cancel_turn"  # Every call of the turn that is still running is cancelled
+
+
+class AgentState(MessagesState):
+    # Timings of the tool calls made by the last action step
+    tool_timings: List[dict]
+    # The risk questionnaire in progress (see questionnaire.py) and the investment profile it produced
+    risk_questionnaire: Optional[dict]
+    investment_profile: Optional[dict]
+
+@dataclass(frozen=True)
+class ToolPolicy:
+    timeout: float = float(os.getenv("TOOL_TIMEOUT_SECONDS", 30))
+    on_timeout: str = ON_TIMEOUT_ERROR
+
+class ConcurrentToolExecutor:
+    """
+    Runs the tool calls of a single model turn concurrently.
+
+    Async tools run on the event loop, synchronous tools (requests, yfinance) run on a bounded thread pool shared by
+    every thread of the API.  Each tool has its own timeout and cancellation policy.  A tool call that times out or
+    raises is returned to the model as an error ToolMessage, so the model can still answer with the other results.
+
+    A thread cannot be interrupted, so a synchronous tool that times out keeps its pool slot until it returns, its
+    result is discarded.
+
+    With an artifact store, images returned by the tools are stored there and the messages only keep a reference.
+    """
+    def __init__(
+        self,
+        tools: List[BaseTool],
+        max_workers: int = int(os.getenv("TOOL_EXECUTOR_MAX_WORKERS", 8)),
+        default_policy: ToolPolicy = ToolPolicy(),
+        policies: Optional[Dict[str, ToolPolicy]] = None,
+        artifact_store: Optional[ArtifactStore] = None
+    ):
+        self.tools_by_name = {tool.name: tool for tool in tools}
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool")
+        self.default_policy = default_policy
+        self.policies = policies or {}
+        self.artifact_store = artifact_store
+
+    def policy(self, name: str) -> ToolPolicy:
+        return self.policies.get(name, self.default_policy)
+
+    def _start(self, call: ToolCall, config: RunnableConfig) -> asyncio.Future:
+        tool = self.tools_by_name[call["name"]]
+        call = {**call, "type": "tool_call"}
+        if getattr(tool, "coroutine", None) is not None:
+            return asyncio.ensure_future(tool.ainvoke(call, config))
+        # Copy the context so tracing callbacks still see the parent run
+        context = contextvars.copy_context()
+        return asyncio.get_running_loop().run_in_executor(self.pool, partial(context.run, tool.invoke, call, config))
+
+    async def execute(self, state: AgentState, config: RunnableConfig) -> dict:
+        message: AIMessage = state["messages"][-1]
+        turn_start = time.perf_counter()
+
+        futures: Dict[str, asyncio.Future] = {}
+        results: Dict[str, ToolMessage] = {}
+        timings: Dict[str, dict] = {}
+        for call in message.tool_calls:
+            timings[call["id"]] = {"tool": call["name"], "tool_call_id": call["id"], "status": "success"}
+            if call["name"] not in self.tools_by_name:
+                results[call["id"]] = ToolMessage(
+                    content=f"Error: {call['name']} is not a valid tool, try one of [{', '.join(self.tools_by_name)}].",
+                    name=call["name"],
+                    tool_call_id=call["id"],
+                    status="error"
+                )
+                timings[call["id"]].update(status="error", duration_ms=0.0)
+                continue
+            futures[call["id"]] = self._start(call, config)
+
+        async def wait(call: ToolCall):
+            policy = self.policy(call["name"])
+            try:
+                results[call["id"]] = await asyncio.wait_for(futures[call["id"]], timeout=policy.timeout)
+            except asyncio.TimeoutError:
+                timings[call["id"]]["status"] = "timeout"
+                results[call["id"]] = ToolMessage(
+                    content=f"Error: {call['name']} did not return within {policy.timeout} seconds.",
+                    name=call["name"],
+                    tool_call_id=call["id"],
+                    status="error"
+                )
+                if policy.on_timeout == ON_TIMEOUT_CANCEL_TURN:
+                    for future in futures.values():
+                        future.cancel()
+            except asyncio.CancelledError:
+                # Cancelled by the turn's policy, not because the request itself is going away
+                if asyncio.current_task().cancelling():
+                    raise
+                timings[call["id"]]["status"] = "cancelled"
+                results[call["id"]] = ToolMessage(
+                    content=f"Error: {call['name']} was cancelled because another tool call timed out.",
+                    name=call["name"],
+                    tool_call_id=call["id"],
+                    status="error"
+                )
+            except Exception as e:
+                timings[call["id"]]["status"] = "error"
+                results[call["id"]] = ToolMessage(
+                    content=f"Error: {repr(e)}\n Please fix your mistakes.",
+                    name=call["name"],
+                    tool_call_id=call["id"],
+                    status="error"
+                )
+            # Every call starts with the turn, so this is the call's duration
+            timings[call["id"]]["duration_ms"] = round((time.perf_counter() - turn_start) * 1000, 3)
+
+        await asyncio.gather(*(wait(call) for call in message.tool_calls if call["id"] in futures))
+
+        if self.artifact_store is not None:
+            for result in results.values():
+                if result.artifact is not None:
+                    result.artifact = await asyncio.to_thread(self.artifact_store.externalize, result.artifact)
+
+        return {
+            # Keep the order the model asked for the tools in
+            "messages": [results[call["id"]] for call in message.tool_calls],
+            "tool_timings": [timings[call["id"]] for call in message.tool_calls],
+        }
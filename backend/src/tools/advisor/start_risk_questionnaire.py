@@ -0,0 +1,9 @@
+from langchain_core.tools import tool
+
+@tool("start_risk_questionnaire")
+def start_risk_questionnaire() -> str:
+    """
+    Used for building the user's investment risk profile.  Starts the risk questionnaire, its questions are then
+    asked, validated and scored without you.
+    """
+    return "The risk questionnaire has started, its questions are asked to the user and scored without you."
@@ -0,0 +1,138 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Optional, Union
+
+import pandas as pd
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate number of bytes a cached value holds on to"""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return int(value.memory_usage(deep=True).sum()) if isinstance(value, pd.DataFrame) else int(value.memory_usage(deep=True))
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return 1024
+
+@dataclass
+class _Entry:
+    value: Any
+    expires_at: float
+    size: int
+
+class _Flight:
+    def __init__(self):
+        self.event = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+class TTLCache:
+    """
+    A process-wide, thread-safe cache with per-entry TTLs, an LRU memory cap and single-flight loading: when several
+    threads ask for the same missing key at once, only one of them calls the loader and the others wait for its result.
+
+    Cached values are shared between callers and must not be modified, copy them first.
+    """
+    def __init__(self, name: str, max_bytes: int, sizer: Callable[[Any], int] = estimate_size):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.sizer = sizer
+        self.lock = threading.Lock()
+        self.entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self.flights: Dict[Hashable, _Flight] = {}
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any], ttl: Union[float, Callable[[Any], float]]) -> Any:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry.expires_at > time.monotonic():
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return entry.value
+            flight = self.flights.get(key)
+            leader = flight is None
+            if leader:
+                self.misses += 1
+                flight = self.flights[key] = _Flight()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = loader()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.flights[key]
+                if flight.error is None:
+                    self._store(key, flight.value, ttl(flight.value) if callable(ttl) else ttl)
+            flight.event.set()
+        return flight.value
+
+    def get(self, key: Hashable) -> Any:
+        """The cached value of a key, or None when it is missing or expired"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry.expires_at <= time.monotonic():
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry.value
+
+    def put(self, key: Hashable, value: Any, ttl: float):
+        """For loaders that fetch several keys at once, e.g. one batched request for many tickers"""
+        with self.lock:
+            self._store(key, value, ttl)
+
+    def _store(self, key: Hashable, value: Any, ttl: float):
+        if ttl <= 0:
+            return
+        size = self.sizer(value)
+        if size > self.max_bytes:
+            return
+        if key in self.entries:
+            self.total_bytes -= self.entries.pop(key).size
+        self.entries[key] = _Entry(value=value, expires_at=time.monotonic() + ttl, size=size)
+        self.total_bytes += size
+        now = time.monotonic()
+        # Expired entries go first, then the least recently used ones
+        for stale_key in [k for k, e in self.entries.items() if e.expires_at <= now]:
+            self._evict(stale_key)
+        while self.total_bytes > self.max_bytes:
+            self._evict(next(iter(self.entries)))
+
+    def _evict(self, key: Hashable):
+        self.total_bytes -= self.entries.pop(key).size
+        self.evictions += 1
+
+    def invalidate(self, key: Hashable):
+        with self.lock:
+            if key in self.entries:
+                self.total_bytes -= self.entries.pop(key).size
+
+    def stats(self) -> Dict[str, Union[int, str]]:
+        with self.lock:
+            return {
+                "name": self.name,
+                "entries": len(self.entries),
+                "bytes": self.total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,170 @@
+"""
+Backtests of entry and exit rules, the screener's expressions evaluated on every bar of every ticker of a universe at
+once, over the whole history in the price store (set PRICE_STORE_HISTORY_PERIOD=10y for long backtests).
+
+A position is opened at the close of a bar where the entry expression holds and closed at the close of the first
+later bar where the exit expression holds, or once `holding_days` bars have passed since the last entry signal.
+Positions are long only, one per ticker, without costs.  There is no loop over the bars: the position is the forward
+fill of the opening and closing events, the trades are its transitions and their returns differences of cumulative
+log returns.
+"""
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .expressions import Expression
+from .price_store import get_price_store
+from .screener import DEFAULT_LIMIT, MAX_LIMIT, json_floats
+from .universe import load_universe, universe_tickers
+
+TRADING_DAYS = 252
+DEFAULT_YEARS = 5
+MAX_YEARS = 10
+DEFAULT_HOLDING_DAYS = 20
+
+
+def forward_fill(values: np.ndarray, initial: float = 0.0) -> np.ndarray:
+    """
+    Every NaN replaced by the last value above it in its column, `initial` above the first one.  For events (1 at
+    openings, 0 at closings, NaN elsewhere) it is the position on every bar, flat before the first event
+    """
+    rows = np.arange(len(values))[:, None]
+    last = np.maximum.accumulate(np.where(np.isnan(values), -1, rows), axis=0)
+    filled = np.take_along_axis(values, np.maximum(last, 0), axis=0)
+    return np.where(last >= 0, filled, initial)
+
+def bars_since(mask: np.ndarray) -> np.ndarray:
+    """Bars since the mask last held, inf before it first does"""
+    rows = np.arange(len(mask))[:, None]
+    last = np.maximum.accumulate(np.where(mask, rows, -1), axis=0)
+    return np.where(last >= 0, rows - last, np.inf)
+
+def positions(entry: np.ndarray, exit: Optional[np.ndarray], holding_days: Optional[int]) -> np.ndarray:
+    """1 on the bars a position is held at the close, 0 otherwise.  A bar with both signals stays out"""
+    closing = np.zeros_like(entry) if exit is None else exit.copy()
+    if holding_days:
+        closing |= bars_since(entry) >= holding_days
+    return forward_fill(np.where(closing, 0.0, np.where(entry, 1.0, np.nan)))
+
+def drawdowns(log_equity: np.ndarray) -> np.ndarray:
+    """The maximum drawdown of every column of cumulative log returns, as a negative fraction"""
+    peak = np.maximum.accumulate(np.maximum(log_equity, 0.0), axis=0)
+    return np.expm1(np.min(log_equity - peak, axis=0, initial=0.0))
+
+def performance(returns: np.ndarray) -> dict:
+    """Statistics of a series of daily simple returns"""
+    log_equity = np.cumsum(np.log1p(returns))
+    years = len(returns) / TRADING_DAYS
+    volatility = np.std(returns) * np.sqrt(TRADING_DAYS)
+    total = np.expm1(log_equity[-1]) if len(returns) else 0.0
+    return {
+        "total_return": total,
+        "cagr": (1 + total) ** (1 / years) - 1 if years else np.nan,
+        "volatility": volatility,
+        "sharpe": np.mean(returns) * TRADING_DAYS / volatility if volatility else np.nan,
+        "max_drawdown": float(drawdowns(log_equity[:, None])[0]),
+    }
+
+def rounded(stats: dict) -> dict:
+    return {
+        name: value if isinstance(value, int) else json_floats(np.array([value], dtype=np.float64))[0]
+        for name, value in stats.items()
+    }
+
+def backtest(
+    entry: str,
+    exit: Optional[str] = None,
+    holding_days: Optional[int] = DEFAULT_HOLDING_DAYS,
+    tickers: Optional[Sequence[str]] = None,
+    years: float = DEFAULT_YEARS,
+    limit: int = DEFAULT_LIMIT
+) -> dict:
+    """
+    Trades the entry and exit rules on every ticker over the last `years` of stored history: statistics of the trades,
+    of an equal-weighted portfolio of the tickers' strategies (rebalanced daily, uninvested capital in cash) against
+    buying and holding the same tickers, and the tickers with the best strategy returns.
+    """
+    if not exit and not holding_days:
+        raise ValueError("Give an exit expression, a holding period or both")
+    entry_rule = Expression(entry)
+    exit_rule = Expression(exit) if exit else None
+    store = get_price_store()
+    universe = load_universe(universe_tickers(tickers, store), rows=None, store=store)
+    if len(universe.dates) < 2:
+        raise ValueError("There is not enough price history to backtest")
+
+    start = pd.Timestamp(universe.dates[-1]) - pd.DateOffset(days=round(365.25 * max(0.1, min(years, MAX_YEARS))))
+    # The expressions see the history before the start, so the indicators are warmed up on its first bar
+    first = max(1, int(np.searchsorted(universe.dates, start.value)))
+    shape = (len(universe.dates), len(universe.tickers))
+    close = universe.column("close")
+    listed = ~np.isnan(close[first:])
+    entries = np.broadcast_to(entry_rule.mask(universe.column), shape)[first:] & listed
+    exits = np.broadcast_to(exit_rule.mask(universe.column), shape)[first:] if exit_rule else None
+    held = positions(entries, exits, holding_days)
+
+    # Missing bars carry the last close, so the first bar after a gap earns the move across it.  Before a listing
+    # there is no close to carry and the returns are 0
+    log_returns = np.nan_to_num(np.diff(np.log(forward_fill(close, np.nan)[first - 1:]), axis=0))
+    cumulative = np.cumsum(log_returns, axis=0)
+    # A position held at the previous close earns the bar's return
+    previous = np.vstack([np.zeros((1, shape[1])), held[:-1]])
+    strategy = previous * log_returns
+
+    # Trades, ordered by ticker then date: an opening where the position goes from 0 to 1, its closing where it goes
+    # back, or the last bar for trades that are still open
+    transitions = np.diff(np.vstack([np.zeros((1, shape[1])), held, np.zeros((1, shape[1]))]), axis=0).T
+    ticker_index, opened = np.nonzero(transitions == 1)
+    _, closed = np.nonzero(transitions == -1)
+    still_open = closed == len(held)
+    closed = np.minimum(closed, len(held) - 1)
+    trade_returns = np.expm1(cumulative[closed, ticker_index] - cumulative[opened, ticker_index])
+    wins = trade_returns > 0
+    count = len(trade_returns)
+
+    trades = {
+        "trades": count,
+        "open_trades": int(still_open.sum()),
+        "hit_rate": wins.mean() if count else np.nan,
+        "average_return": trade_returns.mean() if count else np.nan,
+        "median_return": np.median(trade_returns) if count else np.nan,
+        "average_win": trade_returns[wins].mean() if wins.any() else np.nan,
+        "average_loss": trade_returns[~wins].mean() if (~wins).any() else np.nan,
+        "best": trade_returns.max() if count else np.nan,
+        "worst": trade_returns.min() if count else np.nan,
+        "average_bars_held": (closed - opened).mean() if count else np.nan,
+    }
+
+    simple_returns = np.expm1(log_returns)
+    portfolio = np.expm1(strategy).mean(axis=1)
+    listed_count = listed.sum(axis=1)
+    buy_and_hold = np.divide(np.where(listed, simple_returns, 0.0).sum(axis=1), listed_count, out=np.zeros(len(held)), where=listed_count > 0)
+
+    ticker_trades = np.bincount(ticker_index, minlength=shape[1])
+    ticker_wins = np.bincount(ticker_index, weights=wins, minlength=shape[1])
+    ticker_returns = np.expm1(strategy.sum(axis=0))
+    order = np.argsort(-ticker_returns, kind="stable")[:max(1, min(limit, MAX_LIMIT))]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ticker_hit_rates = ticker_wins / ticker_trades
+    dates = pd.DatetimeIndex(universe.dates[[first, -1]], tz="UTC").tz_convert(universe.tz).strftime("%Y-%m-%d")
+    return {
+        "entry": entry,
+        "exit": exit,
+        "holding_days": holding_days,
+        "start": dates[0],
+        "end": dates[1],
+        "bars": len(held),
+        "universe": shape[1],
+        "trades": rounded(trades),
+        "portfolio": rounded({**performance(portfolio), "exposure": held[listed].mean() if listed.any() else np.nan}),
+        "buy_and_hold": rounded(performance(buy_and_hold)),
+        "tickers": {
+            "ticker": [universe.tickers[index] for index in order],
+            "trades": [int(ticker_trades[index]) for index in order],
+            "hit_rate": json_floats(ticker_hit_rates[order]),
+            "total_return": json_floats(ticker_returns[order]),
+            "max_drawdown": json_floats(drawdowns(np.cumsum(strategy[:, order], axis=0))),
+            "buy_and_hold_return": json_floats(np.expm1(cumulative[-1, order])),
+        },
+    }
@@ -0,0 +1,36 @@
+from pydantic import Field, BaseModel
+from langchain_core.tools import tool
+from typing import List, Optional
+from .backtest import DEFAULT_HOLDING_DAYS, DEFAULT_YEARS, MAX_YEARS, backtest
+from .expressions import FUNCTIONS
+from .indicators import FRAME_COLUMNS
+from .screener import DEFAULT_LIMIT
+
+class BacktestSignalsInput(BaseModel):
+    entry: str = Field(description=(
+        "When to buy, a python-like expression evaluated for every stock on every trading day, "
+        "e.g. 'golden_cross == 1' or 'crossed_above(macd, macd_signal) and rsi < 50'.  "
+        f"Names: {', '.join(FRAME_COLUMNS)} (golden_cross and death_cross are 1 on the day of the cross).  "
+        f"Functions: {'; '.join(FUNCTIONS.values())}.  Operators: + - * / < <= > >= == != and or not"
+    ))
+    exit: Optional[str] = Field(None, description="When to sell, an expression like the entry, e.g. 'rsi > 70' or 'crossed_below(macd, macd_signal)'")
+    holding_days: Optional[int] = Field(DEFAULT_HOLDING_DAYS, description="Sell this many trading days after the last entry signal if the exit has not happened, 0 for no limit")
+    tickers: Optional[List[str]] = Field(None, description="The stocks to backtest, the whole stock universe of the screener by default")
+    years: float = Field(DEFAULT_YEARS, description=f"The number of years to backtest, at most {MAX_YEARS} and limited by the stored price history")
+    limit: int = Field(DEFAULT_LIMIT, description="The maximum number of stocks to list with their own results")
+
+@tool("backtest_signals", args_schema=BacktestSignalsInput)
+def backtest_signals(
+    entry: str,
+    exit: Optional[str] = None,
+    holding_days: Optional[int] = DEFAULT_HOLDING_DAYS,
+    tickers: Optional[List[str]] = None,
+    years: float = DEFAULT_YEARS,
+    limit: int = DEFAULT_LIMIT
+) -> dict:
+    """
+    Used for checking how technical signals (cross signals, RSI, stochastics, MACD, moving averages) have performed
+    historically: trades the entry and exit rules on every stock and returns the hit rate, the returns and the
+    drawdowns of the trades, of the strategy and of buying and holding the same stocks.
+    """
+    return backtest(entry, exit, holding_days, tickers, years, limit)
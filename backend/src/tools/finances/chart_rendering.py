@@ -0,0 +1,85 @@
+"""
+Rendering of the standard stock charts to PNG.
+
+This module runs in the chart worker processes, so it only depends on numpy and matplotlib.  It uses the
+object-oriented Figure API with the Agg canvas, not pyplot, so no global figure state is kept between renders.
+"""
+import io
+from typing import Dict
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.dates import AutoDateLocator, ConciseDateFormatter
+from matplotlib.figure import Figure
+
+# The columns every view needs, the close is always drawn in the top panel
+VIEWS = {
+    "price": ["close", "ma_50", "ma_200", "volume"],
+    "macd": ["close", "macd", "macd_signal", "macd_histogram"],
+    "stochastics": ["close", "K", "D"],
+    "rsi": ["close", "rsi"],
+    "obv": ["close", "obv"],
+}
+TITLES = {
+    "price": "Price and moving averages",
+    "macd": "MACD (12, 26, 9)",
+    "stochastics": "Stochastics (14, 3)",
+    "rsi": "RSI (7)",
+    "obv": "On-Balance Volume",
+}
+DPI = 100
+
+
+def _indicator_panel(axes, view: str, dates: np.ndarray, columns: Dict[str, np.ndarray]):
+    if view == "price":
+        axes.bar(dates, columns["volume"], color="#9e9e9e", width=1.0)
+        axes.set_ylabel("Volume")
+    elif view == "macd":
+        histogram = columns["macd_histogram"]
+        axes.bar(dates, histogram, color=np.where(histogram >= 0, "#26a69a", "#ef5350"), width=1.0)
+        axes.plot(dates, columns["macd"], label="MACD", color="#1565c0", linewidth=1.2)
+        axes.plot(dates, columns["macd_signal"], label="Signal", color="#ff8f00", linewidth=1.2)
+        axes.axhline(0, color="#616161", linewidth=0.6)
+    elif view == "stochastics":
+        axes.plot(dates, columns["K"], label="%K", color="#1565c0", linewidth=1.2)
+        axes.plot(dates, columns["D"], label="%D", color="#ff8f00", linewidth=1.2)
+        for level in (80, 20):
+            axes.axhline(level, color="#616161", linewidth=0.6, linestyle="--")
+        axes.set_ylim(0, 100)
+    elif view == "rsi":
+        axes.plot(dates, columns["rsi"], label="RSI", color="#6a1b9a", linewidth=1.2)
+        for level in (70, 30):
+            axes.axhline(level, color="#616161", linewidth=0.6, linestyle="--")
+        axes.set_ylim(0, 100)
+    elif view == "obv":
+        axes.plot(dates, columns["obv"], label="OBV", color="#2e7d32", linewidth=1.2)
+    if view != "price":
+        axes.legend(loc="upper left", fontsize=8)
+
+def render_chart(ticker: str, view: str, dates: np.ndarray, columns: Dict[str, np.ndarray], width: int = 1000, height: int = 600) -> bytes:
+    """
+    PNG of a view: the close (with the moving averages for the price view) on top and the view's indicator below.
+    `dates` are datetime64 values in the market's time zone, `columns` has the VIEWS columns of the view.
+    """
+    figure = Figure(figsize=(width / DPI, height / DPI), dpi=DPI)
+    FigureCanvasAgg(figure)
+    top, bottom = figure.subplots(2, 1, sharex=True, gridspec_kw={"height_ratios": [3, 2] if view != "price" else [4, 1]})
+
+    top.plot(dates, columns["close"], label="Close", color="#212121", linewidth=1.4)
+    if view == "price":
+        top.plot(dates, columns["ma_50"], label="50-day MA", color="#1565c0", linewidth=1.1)
+        top.plot(dates, columns["ma_200"], label="200-day MA", color="#c62828", linewidth=1.1)
+    top.legend(loc="upper left", fontsize=8)
+    top.set_title(f"{ticker}: {TITLES[view]}")
+    top.grid(alpha=0.3)
+
+    _indicator_panel(bottom, view, dates, columns)
+    bottom.grid(alpha=0.3)
+    locator = AutoDateLocator()
+    bottom.xaxis.set_major_locator(locator)
+    bottom.xaxis.set_major_formatter(ConciseDateFormatter(locator))
+    figure.tight_layout()
+
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format="png")
+    return buffer.getvalue()
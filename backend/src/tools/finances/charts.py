@@ -0,0 +1,85 @@
+"""
+Chart engine for the standard views of a ticker.
+
+The data comes from the ticker's indicator state, the rendering happens in a small process pool (matplotlib holds
+the GIL while it draws, so threads would stall the API) and images are cached by ticker, view, months and a version
+of the data, so a chart is only drawn again when a new or changed bar comes in.
+"""
+import hashlib
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+import numpy as np
+
+from ..cache import TTLCache
+from .chart_rendering import VIEWS, render_chart
+from .indicator_state import IndicatorState, refresh_indicator_state
+from .indicators import FRAME_COLUMNS
+from .market_data import MARKET_TZ
+
+CHART_RENDER_WORKERS = int(os.getenv("CHART_RENDER_WORKERS", 2))
+CHART_RENDER_TIMEOUT_SECONDS = float(os.getenv("CHART_RENDER_TIMEOUT_SECONDS", 30))
+# The data version is part of the key, the TTL only bounds how long unused charts stay around
+CHART_CACHE_TTL_SECONDS = float(os.getenv("CHART_CACHE_TTL_SECONDS", 24 * 60 * 60))
+DEFAULT_MONTHS = 6
+
+chart_cache = TTLCache("charts", max_bytes=int(os.getenv("CHART_CACHE_MAX_BYTES", 64 * 1024 * 1024)), sizer=len)
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+@dataclass
+class Chart:
+    ticker: str
+    view: str
+    png: bytes
+    last_date: str
+    # The last values of the view's columns, so the model can talk about the chart without seeing it
+    latest: Dict[str, float]
+
+def get_render_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Spawned rather than forked, the API process has threads and open connections a fork would copy
+            _pool = ProcessPoolExecutor(max_workers=CHART_RENDER_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+def data_version(state: IndicatorState) -> str:
+    """Changes with every new bar and with every update of today's bar"""
+    return hashlib.blake2b(state.dates[-1:].tobytes() + state.values[-1].tobytes(), digest_size=8).hexdigest()
+
+def get_chart(ticker: str, view: str, months: int = DEFAULT_MONTHS) -> Optional[Chart]:
+    """The chart of a view over the last `months`, None for a ticker without prices"""
+    if view not in VIEWS:
+        raise ValueError(f"Unknown view {view}, the views are {list(VIEWS)}")
+    ticker = ticker.upper()
+    state = refresh_indicator_state(ticker)
+    if state is None:
+        return None
+
+    start = np.datetime64((datetime.now(MARKET_TZ) - timedelta(days=months * 30)).replace(tzinfo=None), "ns")
+    dates = state.dates.astype("datetime64[ns]")
+    rows = dates >= start
+    columns = {name: state.values[rows, FRAME_COLUMNS.index(name)] for name in VIEWS[view]}
+
+    def render() -> bytes:
+        # Matplotlib draws naive datetimes, shift the UTC bars to the market's wall clock
+        offset = np.timedelta64(int(state.last_date.utcoffset().total_seconds()), "s")
+        future = get_render_pool().submit(render_chart, ticker, view, dates[rows] + offset, columns)
+        return future.result(timeout=CHART_RENDER_TIMEOUT_SECONDS)
+
+    png = chart_cache.get_or_load((ticker, view, months, data_version(state)), render, ttl=CHART_CACHE_TTL_SECONDS)
+    return Chart(
+        ticker=ticker,
+        view=view,
+        png=png,
+        last_date=state.last_date.strftime("%Y-%m-%d"),
+        latest={name: round(float(values[-1]), 4) for name, values in columns.items() if len(values) and np.isfinite(values[-1])}
+    )
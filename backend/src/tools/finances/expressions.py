@@ -0,0 +1,160 @@
+"""
+Filter and rule expressions over indicator matrices, e.g.
+
+    golden_cross == 1 and rsi < 40
+    crossed_above(macd, macd_signal) and within(K < 20, 5)
+    close > ma_200 * 1.05
+
+An expression is parsed with Python's ast and every node is checked against a whitelist before anything is evaluated:
+only arithmetic, comparisons, and/or/not, numbers, the FRAME_COLUMNS names and the FUNCTIONS below.  It is then
+evaluated with numpy on whole (dates, tickers) matrices, so one expression screens or backtests every ticker at once.
+"""
+import ast
+from typing import Callable, List
+
+import numpy as np
+
+from .indicators import FRAME_COLUMNS, rolling_sum
+
+MAX_EXPRESSION_LENGTH = 500
+MAX_NODES = 200
+FUNCTIONS = {
+    "prev": "prev(x) or prev(x, n): the value 1 or n bars earlier",
+    "crossed_above": "crossed_above(a, b): a moved above b on this bar",
+    "crossed_below": "crossed_below(a, b): a moved below b on this bar",
+    "within": "within(condition, n): the condition held on at least one of the last n bars",
+    "change": "change(x) or change(x, n): the relative change over 1 or n bars",
+    "abs": "abs(x)",
+    "min": "min(a, b)",
+    "max": "max(a, b)",
+}
+# Case-insensitive names, the stochastics are K and D
+NAMES = {name.lower(): name for name in FRAME_COLUMNS}
+
+_BINARY = {ast.Add: np.add, ast.Sub: np.subtract, ast.Mult: np.multiply, ast.Div: np.divide}
+_COMPARE = {ast.Lt: np.less, ast.LtE: np.less_equal, ast.Gt: np.greater, ast.GtE: np.greater_equal, ast.Eq: np.equal, ast.NotEq: np.not_equal}
+_ALLOWED = (
+    ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not, ast.USub, ast.UAdd, ast.BinOp, ast.Compare,
+    ast.Name, ast.Load, ast.Constant, ast.Call, *_BINARY, *_COMPARE,
+)
+
+
+class Expression:
+    def __init__(self, source: str):
+        if len(source) > MAX_EXPRESSION_LENGTH:
+            raise ValueError(f"The expression is longer than {MAX_EXPRESSION_LENGTH} characters")
+        try:
+            self.tree = ast.parse(source.strip(), mode="eval")
+        except SyntaxError as e:
+            raise ValueError(f"Invalid expression {source!r}: {e.msg}")
+        self.source = source
+        self.names: List[str] = []
+        nodes = list(ast.walk(self.tree))
+        if len(nodes) > MAX_NODES:
+            raise ValueError(f"The expression has more than {MAX_NODES} nodes")
+        functions = {id(node.func) for node in nodes if isinstance(node, ast.Call)}
+        for node in nodes:
+            self._check(node, is_function=id(node) in functions)
+
+    def _check(self, node: ast.AST, is_function: bool):
+        if not isinstance(node, _ALLOWED):
+            raise ValueError(f"{type(node).__name__} is not allowed in an expression")
+        # bool is an int, True and False are allowed
+        if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float)):
+            raise ValueError(f"Only numbers are allowed, not {node.value!r}")
+        if isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS or node.keywords:
+                raise ValueError(f"Unknown function, the functions are {list(FUNCTIONS)}")
+        elif isinstance(node, ast.Name) and not is_function:
+            if node.id.lower() not in NAMES:
+                raise ValueError(f"Unknown name {node.id}, the names are {FRAME_COLUMNS}")
+            name = NAMES[node.id.lower()]
+            if name not in self.names:
+                self.names.append(name)
+
+    def evaluate(self, column: Callable[[str], np.ndarray]) -> np.ndarray:
+        """The expression over the whole matrices `column(name)` returns, a matrix or a scalar"""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return _evaluate(self.tree.body, column)
+
+    def mask(self, column: Callable[[str], np.ndarray]) -> np.ndarray:
+        """Where the expression holds, NaN counts as false"""
+        return truthy(self.evaluate(column))
+
+def truthy(values) -> np.ndarray:
+    values = np.asarray(values)
+    if values.dtype == bool:
+        return values
+    return (values != 0) & ~np.isnan(values)
+
+def shift(values: np.ndarray, periods: int) -> np.ndarray:
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full_like(values, np.nan)
+    if periods < len(values):
+        out[periods:] = values[:len(values) - periods]
+    return out
+
+def _integer(node: ast.AST) -> int:
+    if not isinstance(node, ast.Constant) or isinstance(node.value, bool) or not isinstance(node.value, int) or node.value < 1:
+        raise ValueError("The number of bars must be a positive integer")
+    return node.value
+
+def _call(node: ast.Call, column) -> np.ndarray:
+    name, args = node.func.id, node.args
+    if name in ("prev", "change"):
+        if len(args) not in (1, 2):
+            raise ValueError(f"{FUNCTIONS[name]}")
+        values = np.asarray(_evaluate(args[0], column), dtype=np.float64)
+        previous = shift(values, _integer(args[1]) if len(args) == 2 else 1)
+        return previous if name == "prev" else (values - previous) / np.abs(previous)
+    if name in ("crossed_above", "crossed_below"):
+        if len(args) != 2:
+            raise ValueError(f"{FUNCTIONS[name]}")
+        a, b = (np.asarray(_evaluate(arg, column), dtype=np.float64) for arg in args)
+        difference = np.broadcast_to(a - b, np.broadcast_shapes(np.shape(a), np.shape(b)))
+        previous = shift(difference, 1)
+        return (difference > 0) & (previous <= 0) if name == "crossed_above" else (difference < 0) & (previous >= 0)
+    if name == "within":
+        if len(args) != 2:
+            raise ValueError(f"{FUNCTIONS[name]}")
+        condition = truthy(_evaluate(args[0], column)).astype(np.float64)
+        return rolling_sum(condition, _integer(args[1])) > 0
+    if name == "abs":
+        if len(args) != 1:
+            raise ValueError(f"{FUNCTIONS[name]}")
+        return np.abs(_evaluate(args[0], column))
+    if len(args) != 2:
+        raise ValueError(f"{FUNCTIONS[name]}")
+    return (np.fmin if name == "min" else np.fmax)(_evaluate(args[0], column), _evaluate(args[1], column))
+
+def _evaluate(node: ast.AST, column):
+    if isinstance(node, ast.Constant):
+        return node.value
+    if isinstance(node, ast.Name):
+        return column(NAMES[node.id.lower()])
+    if isinstance(node, ast.BoolOp):
+        values = [truthy(_evaluate(value, column)) for value in node.values]
+        combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+        result = values[0]
+        for value in values[1:]:
+            result = combine(result, value)
+        return result
+    if isinstance(node, ast.UnaryOp):
+        operand = _evaluate(node.operand, column)
+        if isinstance(node.op, ast.Not):
+            return ~truthy(operand)
+        return -operand if isinstance(node.op, ast.USub) else operand
+    if isinstance(node, ast.BinOp):
+        return _BINARY[type(node.op)](_evaluate(node.left, column), _evaluate(node.right, column))
+    if isinstance(node, ast.Compare):
+        # a < b < c is a < b and b < c, comparisons with NaN are false
+        left = _evaluate(node.left, column)
+        result = True
+        for op, comparator in zip(node.ops, node.comparators):
+            right = _evaluate(comparator, column)
+            result = np.logical_and(result, _COMPARE[type(op)](left, right))
+            left = right
+        return result
+    if isinstance(node, ast.Call):
+        return _call(node, column)
+    raise ValueError(f"{type(node).__name__} is not allowed in an expression")
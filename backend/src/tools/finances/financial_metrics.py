@@ -0,0 +1,82 @@
+"""
+Metrics over a FinancialsFrame, computed for every period at once.
+
+A metric is a reported line item (revenues) or one of the RATIOS (operating_margin), optionally followed by one
+suffix: _ttm for the trailing twelve months (quarterly only), _qoq for the change over the previous period and _yoy
+for the change over the same period a year earlier.  e.g. revenues_yoy, operating_margin_ttm.
+"""
+from typing import Dict, List
+
+import numpy as np
+
+from .financials_store import FinancialsFrame
+from .indicators import rolling_sum
+
+RATIOS = {
+    "gross_margin": ("gross_profit", "revenues"),
+    "operating_margin": ("operating_income_loss", "revenues"),
+    "net_margin": ("net_income_loss", "revenues"),
+    "operating_cash_flow_margin": ("net_cash_flow_from_operating_activities", "revenues"),
+    "research_and_development_ratio": ("research_and_development", "revenues"),
+    "effective_tax_rate": ("income_tax_expense_benefit", "income_loss_from_continuing_operations_before_tax"),
+    "current_ratio": ("current_assets", "current_liabilities"),
+    "debt_to_equity": ("liabilities", "equity"),
+    "long_term_debt_to_equity": ("long_term_debt", "equity"),
+    "equity_ratio": ("equity", "assets"),
+    "return_on_equity": ("net_income_loss", "equity"),
+    "return_on_assets": ("net_income_loss", "assets"),
+    "asset_turnover": ("revenues", "assets"),
+}
+SUFFIXES = ["_ttm", "_qoq", "_yoy"]
+# Balance sheet items are balances at the end of a period, summing them over four quarters means nothing
+FLOW_STATEMENTS = {"income_statement", "cash_flow_statement", "comprehensive_income"}
+# Consecutive quarters end about 91 days apart and consecutive years about 365, anything longer means a period is missing
+MAX_PERIOD_GAP_DAYS = {"quarterly": 100, "annual": 400}
+
+
+def consecutive_windows(frame: FinancialsFrame, window: int) -> np.ndarray:
+    """Whether the `window` periods ending at each row are consecutive quarters (or years, for annual financials)"""
+    gaps = np.zeros(len(frame.end_dates))
+    gaps[1:] = (np.diff(frame.end_dates).astype(np.int64) > MAX_PERIOD_GAP_DAYS[frame.timeframe]).astype(np.float64)
+    if window == 1:
+        return np.ones(len(gaps), dtype=bool)
+    # A window spans window - 1 gaps, the ones ending at its last window - 1 rows
+    return rolling_sum(gaps, window - 1)[:, 0] == 0
+
+def trailing_twelve_months(frame: FinancialsFrame, metric: str) -> np.ndarray:
+    if frame.timeframe != "quarterly":
+        raise ValueError(f"{metric}_ttm needs quarterly financials")
+    if frame.statement(metric) not in FLOW_STATEMENTS:
+        raise ValueError(f"{metric} is a balance sheet item, it has no trailing twelve months sum")
+    return np.where(consecutive_windows(frame, 4), rolling_sum(frame.column(metric), 4)[:, 0], np.nan)
+
+def change(values: np.ndarray, periods: int) -> np.ndarray:
+    """Relative change over `periods` periods, relative to the absolute previous value so losses shrinking is growth"""
+    out = np.full_like(values, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[periods:] = (values[periods:] - values[:-periods]) / np.abs(values[:-periods])
+    return np.where(np.isfinite(out), out, np.nan)
+
+def compute_metric(frame: FinancialsFrame, name: str) -> np.ndarray:
+    suffix = next((suffix for suffix in SUFFIXES if name.endswith(suffix)), None)
+    base = name[:-len(suffix)] if suffix else name
+
+    if suffix in ("_qoq", "_yoy"):
+        periods = 4 if suffix == "_yoy" and frame.timeframe == "quarterly" else 1
+        values = compute_metric(frame, base)
+        # Year over year compares with the period exactly four quarters earlier, or the previous year for annual financials
+        return np.where(consecutive_windows(frame, periods + 1), change(values, periods), np.nan)
+
+    ttm = suffix == "_ttm"
+    if base in RATIOS:
+        numerator, denominator = RATIOS[base]
+        def flow_or_balance(metric: str) -> np.ndarray:
+            return trailing_twelve_months(frame, metric) if ttm and frame.statement(metric) in FLOW_STATEMENTS else frame.column(metric)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            values = flow_or_balance(numerator) / flow_or_balance(denominator)
+        return np.where(np.isfinite(values), values, np.nan)
+    return trailing_twelve_months(frame, base) if ttm else frame.column(base).copy()
+
+def compute_metrics(frame: FinancialsFrame, names: List[str], periods: int) -> Dict[str, np.ndarray]:
+    """Every metric over the whole history (growth and TTM need the earlier periods), then the last `periods`"""
+    return {name: compute_metric(frame, name)[-periods:] for name in names}
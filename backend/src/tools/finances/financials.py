@@ -0,0 +1,84 @@
+"""
+Normalization of Polygon.io financials: every filing is projected to the requested statements and line items as it
+is streamed from the API, and the filings end up in one compact period x metric table.
+
+A raw filing carries four statements of line items that each have a label, a unit, an order and a value, the table
+keeps the value, and the unit once per metric.
+"""
+from typing import AsyncIterator, Dict, List, Optional, Sequence
+
+STATEMENTS = ["income_statement", "balance_sheet", "cash_flow_statement", "comprehensive_income"]
+DEFAULT_STATEMENTS = ["income_statement", "balance_sheet", "cash_flow_statement"]
+PERIOD_COLUMNS = ["period", "start_date", "end_date", "filing_date"]
+
+
+class FinancialsTable:
+    """Filings added one at a time become rows, line items become columns in the order they are first seen"""
+    def __init__(self, metrics: Optional[Sequence[str]] = None):
+        self.metrics: List[str] = list(metrics) if metrics else []
+        self.units: Dict[str, str] = {}
+        # The statement every metric comes from
+        self.statements: Dict[str, str] = {}
+        self.rows: List[dict] = []
+
+    def add(self, filing: dict, values: Dict[str, float]):
+        fiscal_period, fiscal_year = filing.get("fiscal_period"), filing.get("fiscal_year")
+        row = {
+            "period": f"{fiscal_period} {fiscal_year}" if fiscal_period and fiscal_year else filing.get("end_date"),
+            "start_date": filing.get("start_date"),
+            "end_date": filing.get("end_date"),
+            "filing_date": filing.get("filing_date"),
+        }
+        for metric in values:
+            if metric not in self.metrics:
+                self.metrics.append(metric)
+        row.update(values)
+        self.rows.append(row)
+
+    def to_dict(self) -> dict:
+        columns = PERIOD_COLUMNS + self.metrics
+        return {
+            "units": {metric: self.units[metric] for metric in self.metrics if metric in self.units},
+            "columns": columns,
+            "rows": [[row.get(column) for column in columns] for row in self.rows],
+        }
+
+def project_filing(
+    filing: dict,
+    table: FinancialsTable,
+    statements: Sequence[str] = DEFAULT_STATEMENTS,
+    metrics: Optional[Sequence[str]] = None
+) -> Dict[str, float]:
+    """
+    Values of the requested line items of one filing.  Metric names are Polygon's keys (e.g. revenues, net_income_loss),
+    a key found in two statements is prefixed with its statement the second time.
+    """
+    wanted = set(metrics) if metrics else None
+    values: Dict[str, float] = {}
+    financials = filing.get("financials") or {}
+    for statement in statements:
+        for key, item in (financials.get(statement) or {}).items():
+            name = key if key not in values else f"{statement}.{key}"
+            if wanted is not None and key not in wanted and name not in wanted:
+                continue
+            if not isinstance(item, dict) or item.get("value") is None:
+                continue
+            values[name] = item["value"]
+            table.statements.setdefault(name, statement)
+            if item.get("unit"):
+                table.units.setdefault(name, item["unit"])
+    return values
+
+async def normalize_financials(
+    filings: AsyncIterator[dict],
+    statements: Sequence[str] = DEFAULT_STATEMENTS,
+    metrics: Optional[Sequence[str]] = None
+) -> FinancialsTable:
+    """Consumes a stream of filings, only the projected values of each one are kept"""
+    unknown = [statement for statement in statements if statement not in STATEMENTS]
+    if unknown:
+        raise ValueError(f"Unknown statements {unknown}, the statements are {STATEMENTS}")
+    table = FinancialsTable(metrics)
+    async for filing in filings:
+        table.add(filing, project_filing(filing, table, statements, metrics))
+    return table
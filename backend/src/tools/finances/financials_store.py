@@ -0,0 +1,186 @@
+"""
+Local store of the financials of a ticker: one periods x metrics matrix per ticker and timeframe, ingested from
+Polygon.io through the financials normalization and kept in a .npz file with a column index by metric.  After the
+first ingestion only filings newer than the last one are fetched.
+"""
+import asyncio
+import os
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from ..cache import TTLCache
+from .financials import STATEMENTS, normalize_financials
+from .polygon_client import PolygonClient, polygon_client
+
+FINANCIALS_STORE_DIR = os.getenv("FINANCIALS_STORE_DIR", os.path.join(tempfile.gettempdir(), "financials_store"))
+# Filings come out a few times a year, checking once a day is plenty
+FINANCIALS_SYNC_TTL_SECONDS = float(os.getenv("FINANCIALS_SYNC_TTL_SECONDS", 24 * 60 * 60))
+# Number of periods ingested for a ticker the store has never seen
+FINANCIALS_HISTORY_PERIODS = int(os.getenv("FINANCIALS_HISTORY_PERIODS", 20))
+TIMEFRAMES = ["quarterly", "annual"]
+
+financials_cache = TTLCache("financials", max_bytes=int(os.getenv("FINANCIALS_CACHE_MAX_BYTES", 32 * 1024 * 1024)))
+
+
+@dataclass
+class FinancialsFrame:
+    """Periods in ascending order of end date, one column per metric, NaN where a filing does not report it"""
+    ticker: str
+    timeframe: str
+    periods: np.ndarray       # "Q1 2024", "FY 2023"
+    end_dates: np.ndarray     # datetime64[D]
+    filing_dates: np.ndarray  # datetime64[D]
+    metrics: List[str]
+    statements: List[str]
+    units: List[str]
+    values: np.ndarray        # (periods, metrics)
+    synced_at: float
+    index: Dict[str, int] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.index = {metric: column for column, metric in enumerate(self.metrics)}
+
+    def column(self, metric: str) -> np.ndarray:
+        if metric not in self.index:
+            raise ValueError(f"{self.ticker} does not report {metric}")
+        return self.values[:, self.index[metric]]
+
+    def statement(self, metric: str) -> str:
+        return self.statements[self.index[metric]]
+
+class FinancialsStore:
+    def __init__(self, directory: str = FINANCIALS_STORE_DIR, client: PolygonClient = polygon_client):
+        self.directory = directory
+        self.client = client
+        os.makedirs(directory, exist_ok=True)
+        self._sync_locks: Dict[tuple, asyncio.Lock] = {}
+
+    def path(self, ticker: str, timeframe: str) -> str:
+        return os.path.join(self.directory, f"{ticker.upper()}.{timeframe}.npz")
+
+    def _read(self, ticker: str, timeframe: str) -> Optional[FinancialsFrame]:
+        try:
+            with np.load(self.path(ticker, timeframe), allow_pickle=False) as data:
+                return FinancialsFrame(
+                    ticker=ticker.upper(),
+                    timeframe=timeframe,
+                    periods=data["periods"],
+                    end_dates=data["end_dates"],
+                    filing_dates=data["filing_dates"],
+                    metrics=data["metrics"].tolist(),
+                    statements=data["statements"].tolist(),
+                    units=data["units"].tolist(),
+                    values=data["values"],
+                    synced_at=float(data["synced_at"])
+                )
+        except (FileNotFoundError, KeyError, ValueError, OSError):
+            return None
+
+    def load(self, ticker: str, timeframe: str) -> Optional[FinancialsFrame]:
+        """The frame of a ticker from memory, or from disk once per FINANCIALS_SYNC_TTL_SECONDS"""
+        return financials_cache.get_or_load(
+            (ticker.upper(), timeframe),
+            lambda: self._read(ticker, timeframe),
+            ttl=lambda frame: FINANCIALS_SYNC_TTL_SECONDS if frame is not None else 0
+        )
+
+    def save(self, frame: FinancialsFrame):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                np.savez(
+                    file,
+                    periods=frame.periods,
+                    end_dates=frame.end_dates,
+                    filing_dates=frame.filing_dates,
+                    metrics=np.array(frame.metrics, dtype=str),
+                    statements=np.array(frame.statements, dtype=str),
+                    units=np.array(frame.units, dtype=str),
+                    values=frame.values,
+                    synced_at=frame.synced_at
+                )
+            os.replace(tmp_path, self.path(frame.ticker, frame.timeframe))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        financials_cache.invalidate((frame.ticker, frame.timeframe))
+
+    async def sync(self, ticker: str, timeframe: str = "quarterly", force: bool = False) -> Optional[FinancialsFrame]:
+        """Ingests the filings that are newer than the stored ones, returns None when Polygon has none"""
+        if timeframe not in TIMEFRAMES:
+            raise ValueError(f"Invalid timeframe: {timeframe}, the timeframes are {TIMEFRAMES}")
+        ticker = ticker.upper()
+        lock = self._sync_locks.setdefault((asyncio.get_running_loop(), ticker, timeframe), asyncio.Lock())
+        async with lock:
+            frame = await asyncio.to_thread(self.load, ticker, timeframe)
+            if frame is not None and not force and time.time() - frame.synced_at < FINANCIALS_SYNC_TTL_SECONDS:
+                return frame
+
+            params = {"ticker": ticker, "timeframe": timeframe, "sort": "filing_date", "order": "desc", "limit": 100}
+            if frame is not None and len(frame.filing_dates):
+                params["filing_date.gt"] = str(frame.filing_dates.max())
+            filings = self.client.paginate("vX/reference/financials", params, max_results=None if frame is not None else FINANCIALS_HISTORY_PERIODS)
+            table = await normalize_financials(filings, STATEMENTS)
+            merged = merge(frame, table, ticker, timeframe)
+            if merged is None:
+                return None
+            await asyncio.to_thread(self.save, merged)
+            return merged
+
+def merge(frame: Optional[FinancialsFrame], table, ticker: str, timeframe: str) -> Optional[FinancialsFrame]:
+    """Adds the rows of a FinancialsTable to a frame, a restated period replaces the stored one"""
+    rows: Dict[np.datetime64, dict] = {}
+    metrics = list(frame.metrics) if frame is not None else []
+    statements = list(frame.statements) if frame is not None else []
+    units = list(frame.units) if frame is not None else []
+    if frame is not None:
+        for position, end_date in enumerate(frame.end_dates):
+            rows[end_date] = {
+                "period": frame.periods[position],
+                "filing_date": frame.filing_dates[position],
+                **{metric: frame.values[position, column] for column, metric in enumerate(frame.metrics)},
+            }
+    for metric in table.metrics:
+        if metric not in metrics:
+            metrics.append(metric)
+            statements.append(table.statements.get(metric, ""))
+            units.append(table.units.get(metric, ""))
+    for row in table.rows:
+        if not row.get("end_date"):
+            continue
+        end_date = np.datetime64(row["end_date"], "D")
+        filing_date = np.datetime64(row["filing_date"] or "NaT", "D")
+        # Of two filings for the same period (an amendment), the latest one wins
+        if end_date in rows and rows[end_date]["filing_date"] >= filing_date:
+            continue
+        rows[end_date] = {**row, "filing_date": filing_date}
+    if not rows:
+        return None
+
+    end_dates = np.array(sorted(rows), dtype="datetime64[D]")
+    ordered = [rows[end_date] for end_date in end_dates]
+    values = np.array([[row.get(metric, np.nan) for metric in metrics] for row in ordered], dtype=np.float64).reshape(len(ordered), len(metrics))
+    return FinancialsFrame(
+        ticker=ticker,
+        timeframe=timeframe,
+        periods=np.array([str(row["period"]) for row in ordered], dtype=str),
+        end_dates=end_dates,
+        filing_dates=np.array([row["filing_date"] for row in ordered], dtype="datetime64[D]"),
+        metrics=metrics,
+        statements=statements,
+        units=units,
+        values=values,
+        synced_at=time.time()
+    )
+
+_store: Optional[FinancialsStore] = None
+
+def get_financials_store() -> FinancialsStore:
+    global _store
+    if _store is None:
+        _store = FinancialsStore()
+    return _store
@@ -0,0 +1,41 @@
+from pydantic import Field, BaseModel
+from typing import List
+from langchain_core.tools import tool
+from .financials_store import get_financials_store
+from .financial_metrics import RATIOS, compute_metrics
+import numpy as np
+
+# Ratios and growth rates are rounded to 4 decimals, enough for a percentage with two decimals
+DECIMALS = 4
+
+class FinancialMetricsInput(BaseModel):
+    ticker: str = Field(description="The stock ticker symbol to compute the metrics for")
+    metrics: List[str] = Field(description=(
+        "The metrics to compute: a line item of the 10-K/10-Q (e.g. revenues, net_income_loss, diluted_earnings_per_share, "
+        f"assets) or a ratio ({', '.join(RATIOS)}), optionally followed by _ttm (trailing twelve months), "
+        "_qoq (change over the previous period) or _yoy (change over the same period a year earlier), "
+        "e.g. ['operating_margin', 'revenues_yoy', 'net_income_loss_ttm']"
+    ))
+    timeframe: str = Field("quarterly", description="'quarterly' or 'annual'")
+    periods: int = Field(8, description="The number of most recent periods to return")
+
+@tool("get_financial_metrics", args_schema=FinancialMetricsInput)
+async def get_financial_metrics(ticker: str, metrics: List[str], timeframe: str = "quarterly", periods: int = 8) -> dict:
+    """
+    Used for financial ratios, growth rates and trailing twelve months figures of a stock over several periods,
+    computed from its 10-K and 10-Q filings.  Ratios and growth rates are fractions (0.25 is 25%).
+    """
+    frame = await get_financials_store().sync(ticker, timeframe)
+    if frame is None:
+        raise ValueError(f"No financials found for stock {ticker}")
+    values = compute_metrics(frame, metrics, periods)
+    return {
+        "ticker": frame.ticker,
+        "timeframe": timeframe,
+        "periods": frame.periods[-periods:].tolist(),
+        "end_dates": [str(end_date) for end_date in frame.end_dates[-periods:]],
+        "metrics": {
+            name: [None if np.isnan(value) else value for value in np.round(series, DECIMALS).tolist()]
+            for name, series in values.items()
+        },
+    }
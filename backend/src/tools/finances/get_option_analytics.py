@@ -0,0 +1,34 @@
+from pydantic import BaseModel, Field
+from langchain_core.tools import tool
+from typing import Optional
+from .options_chain import fetch_option_chain, get_option_expirations, select_expirations
+from .option_analytics import RISK_FREE_RATE, analyze_chain
+
+
+class OptionAnalyticsInput(BaseModel):
+    ticker: str = Field(description="The stock ticker symbol to analyze the options of")
+    expiration: Optional[str] = Field(None, description="Only analyze contracts expiring on this date (YYYY-MM-DD)")
+    max_expirations: Optional[int] = Field(None, description="Only analyze this many upcoming expiration dates when no expiration is given, e.g. 4 for a faster answer about the near term.  All of them by default")
+    strike_window: Optional[float] = Field(0.1, description="Only return Greeks and implied volatilities for strikes within this fraction of the current stock price, e.g. 0.1 for +/- 10%")
+    risk_free_rate: float = Field(RISK_FREE_RATE, description="Annual risk free rate used for the Greeks, e.g. 0.045 for 4.5%")
+    dividend_yield: float = Field(0.0, description="Annual dividend yield of the stock used for the Greeks, e.g. 0.015 for 1.5%")
+
+@tool("get_option_analytics", args_schema=OptionAnalyticsInput)
+def get_option_analytics(
+    ticker: str,
+    expiration: Optional[str] = None,
+    max_expirations: Optional[int] = None,
+    strike_window: Optional[float] = 0.1,
+    risk_free_rate: float = RISK_FREE_RATE,
+    dividend_yield: float = 0.0
+) -> dict:
+    """
+    Used for analyzing the options of a stock: Black-Scholes Greeks (delta, gamma, theta per day, vega and rho per 1%)
+    of every contract, the implied volatility surface by strike and expiration, put/call open interest and volume
+    ratios, max pain and at the money implied volatility per expiration.  Every upcoming expiration is analyzed
+    unless an expiration or max_expirations is given.  Use it instead of computing these from the options chain.
+    """
+    expirations = select_expirations(get_option_expirations(ticker), expiration, max_expirations)
+    # The whole chain, in the money contracts included, max pain and the ratios need every contract
+    chain = fetch_option_chain(ticker, expirations)
+    return analyze_chain(chain, strike_window, risk_free_rate, dividend_yield)
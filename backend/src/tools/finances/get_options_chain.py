@@ -1,14 +1,20 @@
-import yfinance as yf
 from pydantic import BaseModel, Field
 from langchain_core.tools import tool
-from typing import List, Optional
+from typing import Optional
 from datetime import datetime
+from .options_chain import (
+    DEFAULT_MAX_EXPIRATIONS, fetch_option_chain, filter_contracts, get_option_expirations, select_expirations, to_columnar
+)
 
 
 class OptionsChainInput(BaseModel):
     ticker: str = Field(description="The stock ticker symbol to return the quote for")
-    strike_price: Optional[float] = Field("The strike price of the Option")
-    contract_type: Optional[str] = Field("The type of option contract to get.  The options are 'call' or 'put'")
+    strike_price: Optional[float] = Field(None, description="Only return contracts with a strike price at or above this one")
+    contract_type: Optional[str] = Field(None, description="The type of option contract to get.  The options are 'call' or 'put'")
+    expiration: Optional[str] = Field(None, description="Only return contracts expiring on this date (YYYY-MM-DD)")
+    max_expirations: int = Field(DEFAULT_MAX_EXPIRATIONS, description="Number of upcoming expiration dates to return when no expiration is given")
+    strike_window: Optional[float] = Field(None, description="Only return strikes within this fraction of the current stock price, e.g. 0.1 for +/- 10%")
+    include_in_the_money: bool = Field(False, description="Whether to also return contracts that are in the money")
 
 class OptionContract(BaseModel):
     contractSymbol: str = Field("The symbol for the option contract in the format: SYMBOLYYMMDDCXXXXX or SYMBOLYYMMDDPXXXXX where C is a Call and P is a put and XXXXX is the strike price ")
@@ -22,6 +28,7 @@ class OptionContract(BaseModel):
     openInterest: int = Field("The open interest of the option contract") 
     impliedVolatility: float = Field("The implied volatility of the option contract")
     inTheMoney: bool = Field("Whether the option contract is in the money")
+    type: str = Field("Whether the option contract is a 'call' or a 'put'")
     expiration: str = Field("The expiration date of the option contract")
     lastTradeDate: datetime = Field("The last trade date of the option contract")
 
@@ -29,36 +36,18 @@ class OptionContract(BaseModel):
 def get_options_chain(
     ticker: str,
     strike_price: Optional[float] = None,
-    contract_type: Optional[str] = None
-) -> List[OptionContract]:
+    contract_type: Optional[str] = None,
+    expiration: Optional[str] = None,
+    max_expirations: int = DEFAULT_MAX_EXPIRATIONS,
+    strike_window: Optional[float] = None,
+    include_in_the_money: bool = False
+) -> dict:
     """
-    Used for getting the options chain/contracts for a specific stock
+    Used for getting the options chain/contracts for a specific stock.  The contracts are returned column by column:
+    result["columns"][field][i] is the field of the i-th contract.
     """
-    ticker = yf.Ticker(ticker)
-    options = ticker.options[:4]
-    option_contracts: List[OptionContract] = []
-
-    for option in options:
-        option_chain = ticker.option_chain(option)
-        calls = option_chain.calls
-        puts = option_chain.puts
-
-        def filter_options(df, contract_type):
-            if strike_price is not None:
-                df = df[df['strike'] >=  strike_price]
-            return [OptionContract(**row) for _, row in df[df['inTheMoney'] == False].iterrows()]
-
-        try:
-            if contract_type is None:
-                option_contracts.append(filter_options(calls, 'call'))
-                option_contracts.append(filter_options(puts, 'put'))
-            elif contract_type == 'call':
-                option_contracts.append(filter_options(calls, 'call'))
-            elif contract_type == 'put':
-                option_contracts.append(filter_options(puts, 'put'))
-            else:
-                raise ValueError(f"Invalid contract_type: {contract_type}")
-        except Exception as e:
-            print(f"Error: {e}")
-
-    return option_contracts
\ No newline at end of file
+    expirations = select_expirations(get_option_expirations(ticker), expiration, max_expirations)
+    chain = fetch_option_chain(ticker, expirations)
+    contracts = filter_contracts(chain, strike_price, contract_type, strike_window, include_in_the_money)
+    # Each contract has the fields of OptionContract
+    return to_columnar(chain, contracts)
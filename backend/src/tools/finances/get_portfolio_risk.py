@@ -0,0 +1,33 @@
+from pydantic import Field, BaseModel
+from langchain_core.tools import tool
+from typing import List, Optional
+from .portfolio_risk import DEFAULT_BENCHMARK, DEFAULT_LOOKBACK_DAYS, RISK_BANDS, portfolio_risk
+
+class PortfolioRiskInput(BaseModel):
+    tickers: List[str] = Field(description="The stock ticker symbols of all of the portfolio's holdings")
+    shares: Optional[List[float]] = Field(None, description="The number of shares of each holding, in the order of the tickers")
+    weights: Optional[List[float]] = Field(None, description="The weight (or value) of each holding when the number of shares is not known, equal weights without either")
+    benchmark: str = Field(DEFAULT_BENCHMARK, description="The index the betas are measured against")
+    lookback_days: int = Field(DEFAULT_LOOKBACK_DAYS, description="The number of trading days of returns the risk is estimated from")
+    horizon_days: int = Field(1, description="The number of trading days the value at risk is for")
+    investment_profile_total_score: Optional[int] = Field(None, description=(
+        "The user's investment profile total score, to check the portfolio against their risk band: "
+        + ", ".join(f"{band.min_score}-{band.max_score} {band.name}" for band in RISK_BANDS)
+    ))
+
+@tool("get_portfolio_risk", args_schema=PortfolioRiskInput)
+def get_portfolio_risk(
+    tickers: List[str],
+    shares: Optional[List[float]] = None,
+    weights: Optional[List[float]] = None,
+    benchmark: str = DEFAULT_BENCHMARK,
+    lookback_days: int = DEFAULT_LOOKBACK_DAYS,
+    horizon_days: int = 1,
+    investment_profile_total_score: Optional[int] = None
+) -> dict:
+    """
+    Used for analyzing the risk of a portfolio of stocks in one call: the volatility, beta and contribution to risk of
+    every holding, the most correlated holdings, the historical and parametric value at risk and expected shortfall,
+    and whether the portfolio fits the user's risk profile.
+    """
+    return portfolio_risk(tickers, shares, weights, benchmark, lookback_days, horizon_days, investment_profile_total_score)
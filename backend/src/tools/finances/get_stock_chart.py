@@ -0,0 +1,25 @@
+import base64
+from typing import Tuple
+from pydantic import Field, BaseModel
+from langchain_core.tools import tool
+from .chart_rendering import VIEWS
+from .charts import DEFAULT_MONTHS, get_chart
+
+class StockChartInput(BaseModel):
+    ticker: str = Field(description="The stock ticker symbol to chart")
+    view: str = Field("price", description=f"The chart to draw, one of {list(VIEWS)}.  price is the close with the 50 and 200 day moving averages and the volume")
+    months: int = Field(DEFAULT_MONTHS, description="The number of months of history to chart, at most 12")
+
+@tool("get_stock_chart", args_schema=StockChartInput, response_format="content_and_artifact")
+def get_stock_chart(ticker: str, view: str = "price", months: int = DEFAULT_MONTHS) -> Tuple[str, dict]:
+    """
+    Used for charting a stock: the price with its moving averages, the MACD, the stochastics, the RSI or the OBV.
+    The chart is shown to the user, the result only has the latest values of the charted data.
+    """
+    chart = get_chart(ticker, view, max(1, min(months, 12)))
+    if chart is None:
+        raise ValueError(f"No price history found for stock {ticker}")
+    content = f"The {view} chart of {chart.ticker} up to {chart.last_date} is displayed to the user.  Latest values: {chart.latest}"
+    # Shaped like the python shell's image results, so the clients display both the same way
+    artifact = {"result": {"type": "image", "format": "png", "base64_data": base64.b64encode(chart.png).decode()}}
+    return content, artifact
@@ -1,35 +1,39 @@
-import os
-import requests
-from typing import Dict, Union
 from pydantic import Field, BaseModel
-from typing import Optional
+from typing import List, Optional
 from langchain_core.tools import tool
-
-POLYGON_BASE_URL = os.getenv("POLYGON_API_ENDPOINT")
+from .polygon_client import polygon_client
+from .financials import DEFAULT_STATEMENTS, normalize_financials
 
 class StockFinancialsInput(BaseModel):
     ticker: str = Field(description="The stock ticker symbol to return the news for")
-    filing_date: Optional[str] = Field(description="The date of the filing in the format YYYY-MM-DD")
+    filing_date: Optional[str] = Field(None, description="The date of the filing in the format YYYY-MM-DD")
+    limit: int = Field(4, description="The maximum number of filings (periods) to return")
+    timeframe: Optional[str] = Field(None, description="The reporting period of the filings: 'quarterly', 'annual' or 'ttm'")
+    statements: List[str] = Field(DEFAULT_STATEMENTS, description="The statements to return: income_statement, balance_sheet, cash_flow_statement and comprehensive_income")
+    metrics: Optional[List[str]] = Field(None, description="Only return these line items, e.g. ['revenues', 'net_income_loss', 'diluted_earnings_per_share']. All line items of the statements when not given")
 
 @tool("get_stock_financials", args_schema=StockFinancialsInput)
-def get_stock_financials(ticker: str, filing_date: Optional[str]) -> str:
+async def get_stock_financials(
+    ticker: str,
+    filing_date: Optional[str] = None,
+    limit: int = 4,
+    timeframe: Optional[str] = None,
+    statements: List[str] = DEFAULT_STATEMENTS,
+    metrics: Optional[List[str]] = None
+) -> dict:
     """
-    Used for getting the stock financials from their 10-K and 10-Q reports
+    Used for getting the stock financials from their 10-K and 10-Q reports.  Returns a table with one row per
+    period (most recent first) and one column per line item, the units of the line items are listed once.
     """
-    api_key = os.getenv("POLYGON_API_KEY")
-
-    if not api_key:
-        raise ValueError("No API key found for Polygon.io")
-    
-    url = f"{POLYGON_BASE_URL}vX/reference/financials?ticker={ticker}&apiKey={api_key}"
-
+    params = {"ticker": ticker, "limit": min(limit, 100)}
     if filing_date:
-        url += f"&filing_date={filing_date}"
-
-    response = requests.get(url).json()
-    status = response.get("status", None)
+        params["filing_date"] = filing_date
+    if timeframe:
+        params["timeframe"] = timeframe
 
-    if status != "OK":
-        raise ValueError(f"Failed to get news for stock {ticker}.  API Error: {response}")
-    
-    return response.get("results", None)
\ No newline at end of file
+    try:
+        filings = polygon_client.paginate("vX/reference/financials", params, max_results=limit)
+        table = await normalize_financials(filings, statements, metrics)
+    except ValueError as e:
+        raise ValueError(f"Failed to get financials for stock {ticker}.  {e}")
+    return {"ticker": ticker.upper(), **table.to_dict()}
@@ -1,35 +1,25 @@
-import os
-import requests
-from typing import Dict, Union
+import asyncio
 from pydantic import Field,BaseModel
 from langchain_core.tools import tool
-
-POLYGON_BASE_URL = os.getenv("POLYGON_API_ENDPOINT")
+from typing import Optional
+from .news_index import get_news_index
 
 class StockNewsInput(BaseModel):
     ticker: str = Field(description="The stock ticker symbol to return the news for")
+    query: Optional[str] = Field(None, description="What the user wants to know, used to pick the most relevant articles, e.g. 'earnings guidance' or 'antitrust lawsuit'. The most recent articles are returned when not given")
+    limit: int = Field(5, description="The maximum number of news articles to return")
 
 
 @tool("get_stock_news", args_schema=StockNewsInput)
-def get_stock_news(ticker: str) -> str:
+async def get_stock_news(ticker: str, query: Optional[str] = None, limit: int = 5) -> list:
     """
-    Used for getting news for a given stock symbol
+    Used for getting news for a given stock symbol.  Returns the articles most relevant to the query with a short
+    snippet of each.
     """
-    api_key = os.getenv("POLYGON_API_KEY")
-
-    if not api_key:
-        raise ValueError("No API key found for Polygon.io")
-    
-    url = f"{POLYGON_BASE_URL}v2/reference/news?ticker={ticker}&apiKey={api_key}"
-
-    response = requests.get(url).json()
-    status = response.get("status", None)
-
-    if status != "OK":
-        raise ValueError(f"Failed to get news for stock {ticker}.  API Error: {response}")
-    
-    return response.get("results", None)
-
-
-
-
+    index = get_news_index()
+    try:
+        # Only articles published since the last sync are fetched, and not more often than every few minutes
+        await index.sync(ticker)
+    except ValueError as e:
+        raise ValueError(f"Failed to get news for stock {ticker}.  {e}")
+    return await asyncio.to_thread(index.search, ticker, query, limit)
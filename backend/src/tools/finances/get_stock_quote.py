@@ -1,18 +1,18 @@
-import yfinance as yf
 from pydantic import BaseModel, Field
 from langchain_core.tools import tool
-from typing import Tuple
+from typing import List
+from .quotes import get_quotes
 
 class StockQuoteInput(BaseModel):
-    ticker: str = Field(description="The stock ticker symbol to return the quote for")
+    tickers: List[str] = Field(description="The stock ticker symbols to return the quotes for, all of them in one call")
+    full: bool = Field(False, description="Return every field Yahoo Finance has for the quotes, only when the usual fields are not enough")
 
 @tool("get_stock_quote", args_schema=StockQuoteInput)
-def get_stock_quote(ticker: str) -> dict:
+def get_stock_quote(tickers: List[str], full: bool = False) -> dict:
     """
-    Used for getting the price and information about the stock for today.
+    Used for getting the price and information about one or more stocks for today.
     """
-    prices = yf.Ticker(ticker)
-
+    quotes = get_quotes(tickers, full)
     return {
-        "information": prices.info   
-    }
\ No newline at end of file
+        "quotes": [quote if quote is not None else {"symbol": ticker.upper(), "error": "Unknown ticker"} for ticker, quote in zip(tickers, quotes)]
+    }
@@ -1,15 +1,13 @@
 import numpy as np 
-import pandas as pd
-import pandas_ta as ta
-import yfinance as yf
+from logging import getLogger
 from pydantic import Field, BaseModel
 from langchain_core.tools import tool
 from typing import List
 from datetime import datetime, timedelta
 import pytz
+from .indicator_state import refresh_indicator_state
 
-K_PERIOD=14
-D_PERIOD=3
+logger = getLogger(__name__)
 
 class StockTechnicalIndicatorInput(BaseModel):
     ticker: str = Field(description="he stock symbol to get technical indicators and historical data for")
@@ -39,77 +37,32 @@ class StockTechnicalIndicatorOutput(BaseModel):
     golden_cross: float = Field(description="The golden cross value")
     obv: float = Field(description="The On-Balance Volume value")
 
-# Helper Functions
-def calculate_macd(prices):
-    prices.ta.macd(close="Close", fast=12, slow=26, signal=9, append=True)
-    prices.rename(columns={"MACD_12_26_9": "macd", "MACDs_12_26_9": "macd_signal", "MACDh_12_26_9": "macd_histogram"}, inplace=True)
-
-def calculate_stochastics(prices):
-    prices["n_high"] = prices["High"].rolling(K_PERIOD).max()
-    prices["n_low"] = prices["Low"].rolling(K_PERIOD).min()
-    prices["K"] = (prices["Close"] - prices["n_low"]) * 100 / (prices["n_high"] - prices["n_low"])
-    prices["D"] = prices['K'].rolling(D_PERIOD).mean()
-
-def calculate_moving_averages(prices):
-    prices["ma_50"] = prices["Close"].rolling(window=50).mean()
-    prices["ma_200"] = prices["Close"].rolling(window=200).mean()
-
-def calculate_cross_signals(prices):
-    prices["death_cross_signal"] = prices['ma_50'] < prices['ma_200']
-    prices["death_cross"] = prices["death_cross_signal"].diff()
-    prices["golden_cross_signal"] = prices['ma_50'] > prices['ma_200']
-    prices['golden_cross'] = prices['golden_cross_signal'].diff()
-
-#Calculate Relative Strength Index
-def calculate_rsi(prices):
-    delta = prices["Close"].diff()
-    gain = delta.where(delta > 0, 0)
-    loss = -delta.where(delta < 0, 0)
-    avg_gain = gain.rolling(7).mean()
-    avg_loss = loss.rolling(7).mean()
-    rs = avg_gain / avg_loss
-    prices["rsi"] = 100 - (100 / (1 + rs))
-
-#Calculate Average Daily Range
-def calculate_adr(prices):
-    prices["dr"] = prices["High"] - prices["Low"]
-    prices["adr"] = prices["dr"].rolling(7).mean()
-
-#Calculate On-Balance Volume
-def calculate_obv(prices):
-    prices["obv"] = (np.sign(prices["Close"].diff()) * prices["Volume"]).fillna(0).cumsum()
-
 def format_prices(prices):
     prices.index = prices.index.strftime("%Y-%m-%d")
-    prices.drop(columns=["Dividends", "Stock Splits"], axis=1, inplace=True)
-    prices.rename(columns={"Date": "date", "Open": "open", "High": "high", "Low": "low", "Close": "close", "Volume": "volume"}, inplace=True)
     prices.rename_axis("date", inplace=True)
 
 @tool("get_stock_technical_indicators", args_schema=StockTechnicalIndicatorInput)
-def get_stock_technical_indicators(ticker: str) -> List[StockTechnicalIndicatorOutput]:
+def get_stock_technical_indicators(ticker: str) -> List[dict]:
     """
     Used for getting the technical indicators and historical data for a stock symbol.
     """
     try:
-        prices = yf.Ticker(ticker).history(period="1y")
-        calculate_macd(prices)
-        calculate_stochastics(prices)
-        calculate_moving_averages(prices)
-        calculate_cross_signals(prices)
-        calculate_rsi(prices)
-        calculate_adr(prices)
-        calculate_obv(prices)
-
-        # Filter for the last 6 months
-        tz = 'America/New_York'
-        six_months_ago = datetime.now(pytz.timezone(tz)) - timedelta(days=6*30)
-        prices = prices[prices.index >= six_months_ago] 
-        format_prices(prices)
+        # Only the bars since the last call are fetched and computed, the rest comes from the persisted state
+        state = refresh_indicator_state(ticker)
+    except Exception as e:
+        # The tool executor hands the error to the model, which can tell the user or try again
+        logger.exception(f"Error fetching stock data for {ticker}")
+        raise ValueError(f"Error fetching stock data for {ticker}: {e}") from e
+    if state is None:
+        raise ValueError(f"No price history found for stock {ticker}")
+    prices = state.to_frame()
+    prices["volume"] = prices["volume"].astype(np.int64)
 
-        stock_technical_indicators = prices.reset_index().to_dict(orient='records')
-        technical_indicators: List[StockTechnicalIndicatorOutput] = [StockTechnicalIndicatorOutput(**item) for item in stock_technical_indicators]
+    # Filter for the last 6 months
+    tz = 'America/New_York'
+    six_months_ago = datetime.now(pytz.timezone(tz)) - timedelta(days=6*30)
+    prices = prices[prices.index >= six_months_ago] 
+    format_prices(prices)
 
-        return technical_indicators
-    except Exception as e:
-        print(f"Error fetching stock data: {e}")
-        return []
\ No newline at end of file
+    # Each record has the fields of StockTechnicalIndicatorOutput
+    return prices.reset_index().to_dict(orient='records')
\ No newline at end of file
@@ -0,0 +1,120 @@
+"""
+Per-ticker indicator state persisted between calls, so a refresh only computes the bars that are new since the last
+one instead of the whole history.  Prices come from the local price store, which only fetches the missing bars.
+"""
+import os
+import tempfile
+import threading
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Optional
+
+import numpy as np
+
+from .indicators import IndicatorState, PRICE_COLUMNS, initialize_indicator_state, update_indicator_state
+from .market_data import MARKET_TZ
+from .price_store import PriceSlice, PriceStore, get_price_store, settled_rows
+
+INDICATOR_STATE_DIR = os.getenv("INDICATOR_STATE_DIR", os.path.join(tempfile.gettempdir(), "indicator_state"))
+# Bump when the layout of IndicatorState changes so old files are rebuilt instead of misread
+STATE_VERSION = 1
+
+
+class IndicatorStateStore:
+    """One .npz file per ticker, written atomically so a crash never leaves a half-written state behind"""
+    def __init__(self, directory: str = INDICATOR_STATE_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, ticker: str) -> str:
+        return os.path.join(self.directory, f"{ticker.upper()}.npz")
+
+    def load(self, ticker: str) -> Optional[IndicatorState]:
+        try:
+            with np.load(self.path(ticker), allow_pickle=False) as data:
+                if int(data["version"]) != STATE_VERSION:
+                    return None
+                return IndicatorState(
+                    dates=data["dates"],
+                    values=data["values"],
+                    ema_fast=float(data["ema_fast"]),
+                    ema_slow=float(data["ema_slow"]),
+                    total_rows=int(data["total_rows"]),
+                    tz=str(data["tz"])
+                )
+        except (FileNotFoundError, KeyError, ValueError, OSError):
+            return None
+
+    def save(self, ticker: str, state: IndicatorState):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                np.savez(
+                    file,
+                    version=STATE_VERSION,
+                    dates=state.dates,
+                    values=state.values,
+                    ema_fast=state.ema_fast,
+                    ema_slow=state.ema_slow,
+                    total_rows=state.total_rows,
+                    tz=state.tz
+                )
+            os.replace(tmp_path, self.path(ticker))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+_store: Optional[IndicatorStateStore] = None
+_locks: Dict[str, threading.Lock] = defaultdict(threading.Lock)
+
+def get_indicator_state_store() -> IndicatorStateStore:
+    global _store
+    if _store is None:
+        _store = IndicatorStateStore()
+    return _store
+
+def _matches(state: IndicatorState, prices: PriceSlice) -> bool:
+    """Whether the bar at state.last_date is unchanged, the store is rewritten when yfinance back-adjusts history"""
+    if len(prices) == 0 or prices.dates[0] != state.dates[-1]:
+        return False
+    return all(column[0] == value for column, value in zip(prices.columns, state.values[-1, :len(PRICE_COLUMNS)]))
+
+def refresh_indicator_state(
+    ticker: str,
+    store: Optional[IndicatorStateStore] = None,
+    price_store: Optional[PriceStore] = None
+) -> Optional[IndicatorState]:
+    """
+    Brings the persisted state of a ticker up to date and returns it, including today's bar when the session is still
+    open.  Returns None for tickers without any price history.
+    """
+    ticker = ticker.upper()
+    store = store or get_indicator_state_store()
+    price_store = price_store or get_price_store()
+    if not price_store.sync(ticker):
+        return None
+    now = datetime.now(MARKET_TZ)
+    with _locks[ticker]:
+        state = store.load(ticker)
+        prices = None
+        if state is not None:
+            # Start at the last bar we have, to check it has not been adjusted since
+            prices = price_store.read(ticker, start=state.last_date)
+            if not _matches(state, prices):
+                state = None
+        if state is None:
+            prices = price_store.read(ticker)
+            settled = settled_rows(prices.dates, now)
+            if settled == 0:
+                # Nothing is settled yet (a listing from today), there is no state worth keeping
+                return initialize_indicator_state(prices.dates, prices.columns, prices.tz)
+            state = initialize_indicator_state(prices.dates[:settled], [column[:settled] for column in prices.columns], prices.tz)
+            store.save(ticker, state)
+        else:
+            settled = settled_rows(prices.dates, now)
+            if settled > 1:
+                state = update_indicator_state(state, prices.dates[:settled], [column[:settled] for column in prices.columns])
+                store.save(ticker, state)
+
+    # The bar of a session in progress is applied on top of the persisted state without being saved
+    return update_indicator_state(state, prices.dates[settled:], [column[settled:] for column in prices.columns])
@@ -0,0 +1,299 @@
+"""
+Vectorized technical indicator engine.
+
+Every function takes 2-D arrays shaped (dates, tickers), so a whole watchlist is computed in one pass, and 1-D arrays
+for a single ticker.  Tickers that started trading later than others are padded with NaN at the top of the matrix.
+
+Rolling windows are summed by adding the shifted slices of the window in a fixed order, instead of a running
+cumulative sum, so a window always produces bit-for-bit the same value no matter where it sits in the matrix.  That
+is what lets indicator state be carried forward incrementally and still match a full recompute exactly.
+"""
+from dataclasses import dataclass
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+K_PERIOD = 14
+D_PERIOD = 3
+MACD_FAST = 12
+MACD_SLOW = 26
+MACD_SIGNAL = 9
+RSI_PERIOD = 7
+ADR_PERIOD = 7
+MA_SHORT = 50
+MA_LONG = 200
+
+PRICE_COLUMNS = ["open", "high", "low", "close", "volume"]
+INDICATOR_COLUMNS = [
+    "macd", "macd_histogram", "macd_signal",
+    "n_high", "n_low", "K", "D",
+    "rsi", "dr", "adr",
+    "ma_50", "ma_200",
+    "death_cross_signal", "death_cross", "golden_cross_signal", "golden_cross",
+    "obv",
+]
+
+
+def _as_matrix(values) -> np.ndarray:
+    values = np.asarray(values, dtype=np.float64)
+    return values[:, np.newaxis] if values.ndim == 1 else values
+
+def _first_valid(values: np.ndarray) -> np.ndarray:
+    """Index of the first non-NaN row of every column, len(values) for columns that are all NaN"""
+    valid = ~np.isnan(values)
+    return np.where(valid.any(axis=0), valid.argmax(axis=0), len(values))
+
+def _diff(values: np.ndarray) -> np.ndarray:
+    out = np.full_like(values, np.nan)
+    out[1:] = values[1:] - values[:-1]
+    return out
+
+def rolling_sum(values: np.ndarray, window: int) -> np.ndarray:
+    values = _as_matrix(values)
+    rows = len(values)
+    out = np.full_like(values, np.nan)
+    if rows < window:
+        return out
+    # A window is NaN when any of its values is, the same as pandas' rolling with min_periods=window
+    total = values[:rows - window + 1].copy()
+    for offset in range(1, window):
+        total += values[offset:rows - window + 1 + offset]
+    out[window - 1:] = total
+    return out
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    return rolling_sum(values, window) / window
+
+def rolling_max(values: np.ndarray, window: int) -> np.ndarray:
+    values = _as_matrix(values)
+    out = np.full_like(values, np.nan)
+    if len(values) >= window:
+        out[window - 1:] = np.lib.stride_tricks.sliding_window_view(values, window, axis=0).max(axis=-1)
+    return out
+
+def rolling_min(values: np.ndarray, window: int) -> np.ndarray:
+    values = _as_matrix(values)
+    out = np.full_like(values, np.nan)
+    if len(values) >= window:
+        out[window - 1:] = np.lib.stride_tricks.sliding_window_view(values, window, axis=0).min(axis=-1)
+    return out
+
+def ema_seed(values: np.ndarray, length: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Row at which the EMA of every column starts and its starting value: the simple average of the first `length`
+    valid values, the same seeding pandas_ta uses.
+    """
+    rows, columns = values.shape
+    start = _first_valid(values)
+    seed_row = start + length - 1
+    seed_value = np.full(columns, np.nan)
+    enough = seed_row < rows
+    if enough.any():
+        window_rows = start[enough] + np.arange(length)[:, np.newaxis]
+        seed_value[enough] = values[window_rows, np.flatnonzero(enough)].sum(axis=0) / length
+    return seed_row, seed_value
+
+def ema_step(previous: np.ndarray, values: np.ndarray, length: int) -> np.ndarray:
+    alpha = 2 / (length + 1)
+    # Missing values carry the previous average forward
+    return np.where(np.isnan(values), previous, alpha * values + (1 - alpha) * previous)
+
+def calculate_ema(values: np.ndarray, length: int) -> np.ndarray:
+    values = _as_matrix(values)
+    seed_row, seed_value = ema_seed(values, length)
+    out = np.full_like(values, np.nan)
+    previous = np.full(values.shape[1], np.nan)
+    # The recursion runs over dates, every step is vectorized over the tickers
+    for row in range(seed_row.min(initial=len(values)), len(values)):
+        previous = np.where(row == seed_row, seed_value, np.where(row > seed_row, ema_step(previous, values[row], length), np.nan))
+        out[row] = previous
+    return out
+
+def calculate_macd(close: np.ndarray) -> Dict[str, np.ndarray]:
+    macd = calculate_ema(close, MACD_FAST) - calculate_ema(close, MACD_SLOW)
+    signal = calculate_ema(macd, MACD_SIGNAL)
+    return {"macd": macd, "macd_signal": signal, "macd_histogram": macd - signal}
+
+def calculate_stochastics(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> Dict[str, np.ndarray]:
+    n_high = rolling_max(high, K_PERIOD)
+    n_low = rolling_min(low, K_PERIOD)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        k = (_as_matrix(close) - n_low) * 100 / (n_high - n_low)
+    return {"n_high": n_high, "n_low": n_low, "K": k, "D": rolling_mean(k, D_PERIOD)}
+
+def calculate_moving_averages(close: np.ndarray) -> Dict[str, np.ndarray]:
+    return {"ma_50": rolling_mean(close, MA_SHORT), "ma_200": rolling_mean(close, MA_LONG)}
+
+def calculate_cross_signals(ma_50: np.ndarray, ma_200: np.ndarray) -> Dict[str, np.ndarray]:
+    def changes(signal: np.ndarray) -> np.ndarray:
+        out = np.full_like(signal, np.nan)
+        out[1:] = (signal[1:] != signal[:-1]).astype(np.float64)
+        return out
+
+    death_cross_signal = (ma_50 < ma_200).astype(np.float64)
+    golden_cross_signal = (ma_50 > ma_200).astype(np.float64)
+    return {
+        "death_cross_signal": death_cross_signal,
+        "death_cross": changes(death_cross_signal),
+        "golden_cross_signal": golden_cross_signal,
+        "golden_cross": changes(golden_cross_signal),
+    }
+
+def rsi_gains_losses(close: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    close = _as_matrix(close)
+    delta = _diff(close)
+    padding = np.isnan(close)
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+    gain[padding] = np.nan
+    loss[padding] = np.nan
+    return gain, loss
+
+def rsi_from_averages(avg_gain: np.ndarray, avg_loss: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return 100 - (100 / (1 + avg_gain / avg_loss))
+
+def calculate_rsi(close: np.ndarray) -> Dict[str, np.ndarray]:
+    gain, loss = rsi_gains_losses(close)
+    return {"rsi": rsi_from_averages(rolling_mean(gain, RSI_PERIOD), rolling_mean(loss, RSI_PERIOD))}
+
+def calculate_adr(high: np.ndarray, low: np.ndarray) -> Dict[str, np.ndarray]:
+    dr = _as_matrix(high) - _as_matrix(low)
+    return {"dr": dr, "adr": rolling_mean(dr, ADR_PERIOD)}
+
+def obv_changes(close: np.ndarray, volume: np.ndarray) -> np.ndarray:
+    return np.nan_to_num(np.sign(_diff(_as_matrix(close))) * _as_matrix(volume), nan=0.0)
+
+def calculate_obv(close: np.ndarray, volume: np.ndarray) -> Dict[str, np.ndarray]:
+    return {"obv": np.cumsum(obv_changes(close, volume), axis=0)}
+
+def compute_indicators(open_: np.ndarray, high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray) -> Dict[str, np.ndarray]:
+    """Computes every indicator for a (dates, tickers) price matrix, rows where a ticker has no price are NaN"""
+    open_, high, low, close, volume = (_as_matrix(values) for values in (open_, high, low, close, volume))
+    indicators: Dict[str, np.ndarray] = {}
+    indicators.update(calculate_macd(close))
+    indicators.update(calculate_stochastics(high, low, close))
+    indicators.update(calculate_rsi(close))
+    indicators.update(calculate_adr(high, low))
+    indicators.update(calculate_moving_averages(close))
+    indicators.update(calculate_cross_signals(indicators["ma_50"], indicators["ma_200"]))
+    indicators.update(calculate_obv(close, volume))
+
+    # A cross needs two consecutive prices, and nothing is defined before a ticker's first price
+    no_price = np.isnan(close)
+    no_previous = np.ones_like(no_price)
+    no_previous[1:] = no_price[:-1]
+    for name in ("death_cross", "golden_cross"):
+        indicators[name][no_previous] = np.nan
+    for name in INDICATOR_COLUMNS:
+        indicators[name][no_price] = np.nan
+    return indicators
+
+def compute_indicator_frame(prices: pd.DataFrame) -> pd.DataFrame:
+    """
+    Indicators for a single ticker's daily bars as returned by yfinance (Open, High, Low, Close, Volume columns).
+    The result is indexed like `prices` and has the PRICE_COLUMNS followed by the INDICATOR_COLUMNS.
+    """
+    columns = {name: prices[name.capitalize()].to_numpy(dtype=np.float64) for name in PRICE_COLUMNS}
+    indicators = compute_indicators(*(columns[name] for name in PRICE_COLUMNS))
+    frame = pd.DataFrame({name: values[:, 0] for name, values in indicators.items()}, index=prices.index)
+    for name in reversed(PRICE_COLUMNS):
+        frame.insert(0, name, prices[name.capitalize()].to_numpy())
+    return frame[PRICE_COLUMNS + INDICATOR_COLUMNS]
+
+# Incremental updates
+
+FRAME_COLUMNS = PRICE_COLUMNS + INDICATOR_COLUMNS
+# Enough rows for the longest window and for the six months of history the tool returns
+STATE_ROWS = 260
+
+@dataclass
+class IndicatorState:
+    """
+    Everything needed to extend a ticker's indicators with new bars without recomputing its history: the last
+    STATE_ROWS rows of prices and indicators (the rolling windows' buffers), the EMA accumulators behind MACD and the
+    number of bars seen so far.  The MACD signal EMA and the cumulative OBV are the last row's macd_signal and obv.
+    """
+    dates: np.ndarray   # int64 nanoseconds since the epoch (UTC)
+    values: np.ndarray  # (rows, FRAME_COLUMNS)
+    ema_fast: float
+    ema_slow: float
+    total_rows: int
+    tz: str = "America/New_York"
+
+    @property
+    def last_date(self) -> pd.Timestamp:
+        return pd.Timestamp(self.dates[-1], tz="UTC").tz_convert(self.tz)
+
+    def to_frame(self) -> pd.DataFrame:
+        index = pd.DatetimeIndex(self.dates, tz="UTC").tz_convert(self.tz).rename("Date")
+        return pd.DataFrame(self.values, index=index, columns=FRAME_COLUMNS)
+
+def initialize_indicator_state(dates: np.ndarray, columns: Sequence[np.ndarray], tz: str) -> IndicatorState:
+    """
+    Full computation over a ticker's daily bars: `dates` are int64 nanoseconds (UTC) and `columns` one array per
+    PRICE_COLUMNS.  Memory-mapped columns are read in place.
+    """
+    indicators = compute_indicators(*columns)
+    close = _as_matrix(columns[PRICE_COLUMNS.index("close")])
+    values = np.column_stack([_as_matrix(column)[-STATE_ROWS:, 0] for column in columns] + [indicators[name][-STATE_ROWS:, 0] for name in INDICATOR_COLUMNS])
+    return IndicatorState(
+        dates=np.array(dates[-STATE_ROWS:], dtype=np.int64),
+        values=values,
+        ema_fast=float(calculate_ema(close, MACD_FAST)[-1, 0]) if len(close) else np.nan,
+        ema_slow=float(calculate_ema(close, MACD_SLOW)[-1, 0]) if len(close) else np.nan,
+        total_rows=len(close),
+        tz=tz
+    )
+
+def update_indicator_state(state: IndicatorState, dates: np.ndarray, columns: Sequence[np.ndarray]) -> IndicatorState:
+    """
+    Applies the bars that come after state.last_date.  The work only depends on the number of new bars, and the
+    result is identical to initialize_indicator_state over the whole history.
+    """
+    after = np.asarray(dates) > state.dates[-1]
+    new = np.column_stack([_as_matrix(column)[after, 0] for column in columns]) if after.any() else np.empty((0, len(PRICE_COLUMNS)))
+    new_dates = np.asarray(dates, dtype=np.int64)[after]
+    count = len(new)
+    if count == 0:
+        return state
+
+    if state.total_rows <= len(state.values):
+        # The state still holds the full history, so recomputing it is both exact and cheap
+        history = np.vstack([state.values[:, :len(PRICE_COLUMNS)], new])
+        return initialize_indicator_state(np.concatenate([state.dates, new_dates]), list(history.T), state.tz)
+    # Rolling windows only look back MA_LONG rows, so the retained tail plus the new bars reproduces them exactly
+    extended = np.vstack([state.values[-MA_LONG:, :len(PRICE_COLUMNS)], new])
+    indicators = {name: values[-count:, 0] for name, values in compute_indicators(*extended.T).items()}
+
+    # EMAs continue from their accumulators, with the same step the full computation uses
+    close = new[:, 3]
+    fast = np.array([state.ema_fast])
+    slow = np.array([state.ema_slow])
+    signal = np.array([state.values[-1, FRAME_COLUMNS.index("macd_signal")]])
+    macd = np.empty(count)
+    macd_signal = np.empty(count)
+    for row in range(count):
+        fast = ema_step(fast, close[row:row + 1], MACD_FAST)
+        slow = ema_step(slow, close[row:row + 1], MACD_SLOW)
+        signal = ema_step(signal, fast - slow, MACD_SIGNAL)
+        macd[row] = (fast - slow)[0]
+        macd_signal[row] = signal[0]
+    indicators["macd"] = macd
+    indicators["macd_signal"] = macd_signal
+    indicators["macd_histogram"] = macd - macd_signal
+
+    # OBV is a running total, carry it on from the last row
+    obv_start = state.values[-1, FRAME_COLUMNS.index("obv")]
+    indicators["obv"] = np.cumsum(np.concatenate([[obv_start], obv_changes(extended[:, 3], extended[:, 4])[-count:, 0]]))[1:]
+
+    values = np.column_stack([new] + [indicators[name] for name in INDICATOR_COLUMNS])
+    return IndicatorState(
+        dates=np.concatenate([state.dates, new_dates])[-STATE_ROWS:],
+        values=np.vstack([state.values, values])[-STATE_ROWS:],
+        ema_fast=float(fast[0]),
+        ema_slow=float(slow[0]),
+        total_rows=state.total_rows + count,
+        tz=state.tz
+    )
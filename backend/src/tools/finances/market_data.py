@@ -0,0 +1,73 @@
+import os
+from datetime import date, datetime, time, timedelta
+
+import pandas as pd
+import pytz
+import yfinance as yf
+
+from ..cache import TTLCache
+from .yahoo_session import get_yahoo_session
+
+MARKET_TZ = pytz.timezone("America/New_York")
+MARKET_OPEN = time(9, 30)
+MARKET_CLOSE = time(16, 0)
+
+# Quotes move during the session, daily bars only change on the last bar
+QUOTE_SESSION_TTL = float(os.getenv("QUOTE_SESSION_TTL_SECONDS", 60))
+HISTORY_SESSION_TTL = float(os.getenv("HISTORY_SESSION_TTL_SECONDS", 300))
+# Cap on how long anything is cached while the market is closed, so corrections still show up eventually
+CLOSED_MAX_TTL = float(os.getenv("MARKET_CLOSED_MAX_TTL_SECONDS", 12 * 60 * 60))
+
+market_data_cache = TTLCache("market_data", max_bytes=int(os.getenv("MARKET_DATA_CACHE_MAX_BYTES", 128 * 1024 * 1024)))
+
+
+def is_market_open(now: datetime = None) -> bool:
+    now = (now or datetime.now(MARKET_TZ)).astimezone(MARKET_TZ)
+    return now.weekday() < 5 and MARKET_OPEN <= now.time() < MARKET_CLOSE
+
+def seconds_until_open(now: datetime = None) -> float:
+    now = (now or datetime.now(MARKET_TZ)).astimezone(MARKET_TZ)
+    next_open = MARKET_TZ.localize(datetime.combine(now.date(), MARKET_OPEN))
+    if now >= next_open:
+        next_open = MARKET_TZ.localize(datetime.combine(now.date() + timedelta(days=1), MARKET_OPEN))
+    while next_open.weekday() >= 5:
+        next_open = MARKET_TZ.localize(datetime.combine(next_open.date() + timedelta(days=1), MARKET_OPEN))
+    return (next_open - now).total_seconds()
+
+def market_ttl(session_ttl: float, now: datetime = None) -> float:
+    """
+    TTL for market data: short while the regular session is open, and until the next open (capped) after the close
+    and over weekends.  Exchange holidays are treated as trading days, which only makes the cache more conservative.
+    """
+    if is_market_open(now):
+        return session_ttl
+    return max(session_ttl, min(seconds_until_open(now), CLOSED_MAX_TTL))
+
+def get_ticker_info(ticker: str) -> dict:
+    ticker = ticker.upper()
+    return market_data_cache.get_or_load(
+        ("info", ticker),
+        lambda: yf.Ticker(ticker, session=get_yahoo_session()).info,
+        ttl=lambda _: market_ttl(QUOTE_SESSION_TTL)
+    )
+
+def get_price_history(ticker: str, period: str = "1y") -> pd.DataFrame:
+    """Daily bars for a ticker, the returned frame is a copy the caller is free to modify"""
+    ticker = ticker.upper()
+    prices = market_data_cache.get_or_load(
+        ("history", ticker, period),
+        lambda: yf.Ticker(ticker, session=get_yahoo_session()).history(period=period),
+        # Unknown tickers come back empty, don't hold on to those
+        ttl=lambda history: market_ttl(HISTORY_SESSION_TTL) if not history.empty else 0
+    )
+    return prices.copy()
+
+def get_price_history_since(ticker: str, start: date) -> pd.DataFrame:
+    """Daily bars from `start` (inclusive) to today, for fetching only the bars that are new since a previous call"""
+    ticker = ticker.upper()
+    prices = market_data_cache.get_or_load(
+        ("history_since", ticker, start.isoformat()),
+        lambda: yf.Ticker(ticker, session=get_yahoo_session()).history(start=start.isoformat()),
+        ttl=lambda history: market_ttl(HISTORY_SESSION_TTL) if not history.empty else 0
+    )
+    return prices.copy()
@@ -0,0 +1,186 @@
+"""
+Local index of Polygon.io news.
+
+Articles are pulled incrementally per ticker with a published_utc cursor, stored once no matter how many tickers
+they mention, and embedded with a hashing vectorizer (no model, no network) so the tool can return the few articles
+that are relevant to a question instead of the whole feed.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .polygon_client import PolygonClient, polygon_client
+
+NEWS_INDEX_PATH = os.getenv("NEWS_INDEX_PATH", os.path.join(tempfile.gettempdir(), "news_index.sqlite"))
+# How long the news of a ticker is considered current before Polygon is asked for newer articles
+NEWS_SYNC_TTL_SECONDS = float(os.getenv("NEWS_SYNC_TTL_SECONDS", 300))
+# Number of articles fetched for a ticker the index has never seen
+NEWS_INITIAL_ARTICLES = int(os.getenv("NEWS_INITIAL_ARTICLES", 100))
+# Only the most recent articles of a ticker are searched
+NEWS_SEARCH_WINDOW = int(os.getenv("NEWS_SEARCH_WINDOW", 500))
+EMBEDDING_DIMENSIONS = 1024
+SNIPPET_CHARACTERS = 300
+
+_token_pattern = re.compile(r"[a-z0-9][a-z0-9.&'-]*")
+
+
+def tokenize(text: str) -> List[str]:
+    words = _token_pattern.findall(text.lower())
+    # Bigrams keep some of the phrase information ("interest rates", "price target")
+    return words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+
+def embed(text: str, dimensions: int = EMBEDDING_DIMENSIONS) -> np.ndarray:
+    """
+    Hashing trick: every token adds +1 or -1 to the bucket its hash selects, the vector is then L2-normalized so a
+    dot product is the cosine similarity.  blake2b is stable across processes, unlike hash().
+    """
+    vector = np.zeros(dimensions, dtype=np.float32)
+    for token in tokenize(text):
+        digest = int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), "little")
+        vector[digest % dimensions] += 1.0 if (digest >> 63) & 1 else -1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+def article_text(article: dict) -> str:
+    return " ".join(filter(None, [article.get("title"), article.get("description"), " ".join(article.get("keywords") or [])]))
+
+class NewsIndex:
+    def __init__(self, path: str = NEWS_INDEX_PATH, client: PolygonClient = polygon_client):
+        self.path = path
+        self.client = client
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(
+            "CREATE TABLE IF NOT EXISTS articles ("
+            "id TEXT PRIMARY KEY, published_utc TEXT NOT NULL, title TEXT, description TEXT, article_url TEXT, "
+            "publisher TEXT, tickers TEXT, embedding BLOB NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS article_tickers ("
+            "ticker TEXT NOT NULL, article_id TEXT NOT NULL, published_utc TEXT NOT NULL, PRIMARY KEY (ticker, article_id));"
+            "CREATE INDEX IF NOT EXISTS article_tickers_recent ON article_tickers (ticker, published_utc DESC);"
+            "CREATE TABLE IF NOT EXISTS cursors (ticker TEXT PRIMARY KEY, published_utc TEXT, synced_at REAL NOT NULL);"
+        )
+        # Concurrent requests for the same ticker wait for a single sync, asyncio locks belong to their loop
+        self._sync_locks: Dict[Tuple[asyncio.AbstractEventLoop, str], asyncio.Lock] = {}
+        self.fetched = 0
+        self.inserted = 0
+
+    def cursor(self, ticker: str) -> Tuple[Optional[str], float]:
+        with self.lock:
+            row = self.conn.execute("SELECT published_utc, synced_at FROM cursors WHERE ticker = ?", (ticker,)).fetchone()
+        return (row[0], row[1]) if row else (None, 0.0)
+
+    def add(self, ticker: str, articles: List[dict]) -> int:
+        """Stores new articles and links them to every ticker they mention, returns how many were new"""
+        inserted = 0
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                for article in articles:
+                    cursor = self.conn.execute(
+                        "INSERT OR IGNORE INTO articles (id, published_utc, title, description, article_url, publisher, tickers, embedding) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (
+                            article["id"],
+                            article["published_utc"],
+                            article.get("title"),
+                            article.get("description"),
+                            article.get("article_url"),
+                            (article.get("publisher") or {}).get("name"),
+                            json.dumps(article.get("tickers") or []),
+                            embed(article_text(article)).tobytes(),
+                        )
+                    )
+                    inserted += cursor.rowcount
+                    for linked in set(article.get("tickers") or []) | {ticker}:
+                        self.conn.execute(
+                            "INSERT OR IGNORE INTO article_tickers (ticker, article_id, published_utc) VALUES (?, ?, ?)",
+                            (linked.upper(), article["id"], article["published_utc"])
+                        )
+                latest = max([article["published_utc"] for article in articles], default=None)
+                self.conn.execute(
+                    "INSERT INTO cursors (ticker, published_utc, synced_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT (ticker) DO UPDATE SET published_utc = MAX(COALESCE(cursors.published_utc, ''), COALESCE(excluded.published_utc, '')), "
+                    "synced_at = excluded.synced_at",
+                    (ticker, latest, time.time())
+                )
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+        self.inserted += inserted
+        return inserted
+
+    async def sync(self, ticker: str, force: bool = False) -> int:
+        """Pulls the articles published after the ticker's cursor, returns how many were new to the index"""
+        ticker = ticker.upper()
+        key = (asyncio.get_running_loop(), ticker)
+        lock = self._sync_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            published_utc, synced_at = await asyncio.to_thread(self.cursor, ticker)
+            if not force and time.time() - synced_at < NEWS_SYNC_TTL_SECONDS:
+                return 0
+            if published_utc:
+                params = {"ticker": ticker, "published_utc.gt": published_utc, "order": "asc", "sort": "published_utc", "limit": 1000}
+                articles = await self.client.list("v2/reference/news", params)
+            else:
+                params = {"ticker": ticker, "order": "desc", "sort": "published_utc", "limit": min(NEWS_INITIAL_ARTICLES, 1000)}
+                articles = await self.client.list("v2/reference/news", params, max_results=NEWS_INITIAL_ARTICLES)
+            self.fetched += len(articles)
+            return await asyncio.to_thread(self.add, ticker, articles)
+
+    def search(self, ticker: str, query: Optional[str] = None, k: int = 5) -> List[dict]:
+        """The k most relevant of the ticker's recent articles, or the k most recent ones without a query"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT a.id, a.published_utc, a.title, a.description, a.article_url, a.publisher, a.tickers, a.embedding "
+                "FROM article_tickers t JOIN articles a ON a.id = t.article_id "
+                "WHERE t.ticker = ? ORDER BY t.published_utc DESC LIMIT ?",
+                (ticker.upper(), NEWS_SEARCH_WINDOW)
+            ).fetchall()
+        if not rows:
+            return []
+        if query:
+            embeddings = np.frombuffer(b"".join(row[7] for row in rows), dtype=np.float32).reshape(len(rows), -1)
+            scores = embeddings @ embed(query)
+            # Stable sort, so ties go to the most recent article
+            order = np.argsort(-scores, kind="stable")[:k]
+        else:
+            scores = np.zeros(len(rows))
+            order = np.arange(min(k, len(rows)))
+        results = []
+        for position in order:
+            _, published_utc, title, description, url, publisher, tickers, _ = rows[position]
+            description = description or ""
+            results.append({
+                "title": title,
+                "published_utc": published_utc,
+                "publisher": publisher,
+                "tickers": json.loads(tickers),
+                "snippet": description if len(description) <= SNIPPET_CHARACTERS else description[:SNIPPET_CHARACTERS].rsplit(" ", 1)[0] + "...",
+                "article_url": url,
+                "relevance": round(float(scores[position]), 3),
+            })
+        return results
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+_index: Optional[NewsIndex] = None
+
+def get_news_index() -> NewsIndex:
+    global _index
+    if _index is None:
+        _index = NewsIndex()
+    return _index
@@ -0,0 +1,190 @@
+"""
+Option analytics over a whole chain as array operations: Black-Scholes Greeks for every contract, the implied
+volatility surface (strike x expiration), put/call open interest and volume ratios and max pain per expiration.
+"""
+import os
+from datetime import datetime
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from .market_data import MARKET_CLOSE, MARKET_TZ
+from .options_chain import OptionChain, json_values
+
+RISK_FREE_RATE = float(os.getenv("RISK_FREE_RATE", 0.045))
+SECONDS_PER_YEAR = 365 * 24 * 60 * 60
+# yfinance reports placeholder volatilities (1e-5) for contracts that have not traded, they are not usable
+MIN_IMPLIED_VOLATILITY = 0.01
+GREEK_COLUMNS = ["contractSymbol", "type", "expiration", "strike", "impliedVolatility", "delta", "gamma", "theta", "vega", "rho"]
+
+
+def erf(x: np.ndarray) -> np.ndarray:
+    """Abramowitz and Stegun 7.1.26, absolute error below 1.5e-7, numpy has no vectorized erf"""
+    sign = np.sign(x)
+    x = np.abs(x)
+    t = 1 / (1 + 0.3275911 * x)
+    polynomial = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    return sign * (1 - polynomial * np.exp(-x * x))
+
+def norm_cdf(x: np.ndarray) -> np.ndarray:
+    return 0.5 * (1 + erf(x / np.sqrt(2)))
+
+def norm_pdf(x: np.ndarray) -> np.ndarray:
+    return np.exp(-0.5 * x * x) / np.sqrt(2 * np.pi)
+
+def years_to_expiration(expirations: np.ndarray, now: Optional[datetime] = None) -> np.ndarray:
+    """Contracts expire at the close of their expiration date, at least an hour is left so nothing divides by 0"""
+    now = pd.Timestamp(now or datetime.now(MARKET_TZ))
+    close = pd.to_datetime(expirations).tz_localize(MARKET_TZ) + pd.Timedelta(hours=MARKET_CLOSE.hour, minutes=MARKET_CLOSE.minute)
+    seconds = (close - now).total_seconds().to_numpy(dtype=np.float64)
+    return np.maximum(seconds, 3600) / SECONDS_PER_YEAR
+
+def black_scholes_greeks(
+    is_call: np.ndarray,
+    spot: float,
+    strike: np.ndarray,
+    years: np.ndarray,
+    volatility: np.ndarray,
+    rate: float = RISK_FREE_RATE,
+    dividend_yield: float = 0.0
+) -> Dict[str, np.ndarray]:
+    """
+    Greeks of European options for arrays of contracts.  Theta is per calendar day, vega and rho per percentage
+    point.  Contracts without a usable volatility get NaN.
+    """
+    volatility = np.where(volatility >= MIN_IMPLIED_VOLATILITY, volatility, np.nan)
+    sqrt_years = np.sqrt(years)
+    d1 = (np.log(spot / strike) + (rate - dividend_yield + 0.5 * volatility ** 2) * years) / (volatility * sqrt_years)
+    d2 = d1 - volatility * sqrt_years
+    sign = np.where(is_call, 1.0, -1.0)
+    dividend_discount = np.exp(-dividend_yield * years)
+    discount = np.exp(-rate * years)
+    pdf_d1 = norm_pdf(d1)
+
+    delta = sign * dividend_discount * norm_cdf(sign * d1)
+    gamma = dividend_discount * pdf_d1 / (spot * volatility * sqrt_years)
+    theta = (
+        -spot * dividend_discount * pdf_d1 * volatility / (2 * sqrt_years)
+        - sign * rate * strike * discount * norm_cdf(sign * d2)
+        + sign * dividend_yield * spot * dividend_discount * norm_cdf(sign * d1)
+    ) / 365
+    vega = spot * dividend_discount * pdf_d1 * sqrt_years / 100
+    rho = sign * strike * years * discount * norm_cdf(sign * d2) / 100
+    return {"delta": delta, "gamma": gamma, "theta": theta, "vega": vega, "rho": rho}
+
+def chain_greeks(chain: OptionChain, rate: float = RISK_FREE_RATE, dividend_yield: float = 0.0, now: Optional[datetime] = None) -> pd.DataFrame:
+    contracts = chain.contracts
+    greeks = black_scholes_greeks(
+        is_call=contracts["type"].to_numpy() == "call",
+        spot=chain.underlying_price,
+        strike=contracts["strike"].to_numpy(dtype=np.float64),
+        years=years_to_expiration(contracts["expiration"].to_numpy(), now),
+        volatility=contracts["impliedVolatility"].to_numpy(dtype=np.float64),
+        rate=rate,
+        dividend_yield=dividend_yield
+    )
+    return contracts.assign(**greeks)
+
+def iv_surface(chain: OptionChain, strike_window: Optional[float] = None) -> pd.DataFrame:
+    """
+    Implied volatility by strike (rows) and expiration (columns), from the out of the money side of every strike
+    (puts below the underlying's price, calls above) which is where the quotes are liquid
+    """
+    contracts = chain.contracts
+    strikes = contracts["strike"].to_numpy(dtype=np.float64)
+    is_call = contracts["type"].to_numpy() == "call"
+    volatility = contracts["impliedVolatility"].to_numpy(dtype=np.float64)
+    mask = np.where(strikes >= chain.underlying_price, is_call, ~is_call) & (volatility >= MIN_IMPLIED_VOLATILITY)
+    if strike_window is not None:
+        mask &= np.abs(strikes - chain.underlying_price) <= strike_window * chain.underlying_price
+    surface = contracts.loc[mask, ["strike", "expiration", "impliedVolatility"]]
+    return surface.pivot_table(index="strike", columns="expiration", values="impliedVolatility", aggfunc="mean").sort_index()
+
+def max_pain(strikes: np.ndarray, is_call: np.ndarray, open_interest: np.ndarray) -> float:
+    """
+    Settlement price (one of the strikes) at which the contracts' holders are paid the least.  The payout of every
+    contract at every candidate price is one (candidates x contracts) matrix.
+    """
+    candidates = np.unique(strikes)
+    if len(candidates) == 0:
+        return np.nan
+    intrinsic = np.where(
+        is_call,
+        np.maximum(candidates[:, np.newaxis] - strikes, 0),
+        np.maximum(strikes - candidates[:, np.newaxis], 0)
+    )
+    return float(candidates[np.argmin(intrinsic @ open_interest)])
+
+def expiration_summary(chain: OptionChain, now: Optional[datetime] = None) -> pd.DataFrame:
+    """Open interest, volume, put/call ratios, max pain and at the money volatility per expiration"""
+    contracts = chain.contracts
+    is_call = contracts["type"].to_numpy() == "call"
+    open_interest = np.nan_to_num(contracts["openInterest"].to_numpy(dtype=np.float64))
+    volume = np.nan_to_num(contracts["volume"].to_numpy(dtype=np.float64))
+    frame = pd.DataFrame({
+        "expiration": contracts["expiration"].to_numpy(),
+        "callOpenInterest": np.where(is_call, open_interest, 0),
+        "putOpenInterest": np.where(is_call, 0, open_interest),
+        "callVolume": np.where(is_call, volume, 0),
+        "putVolume": np.where(is_call, 0, volume),
+    })
+    summary = frame.groupby("expiration", sort=True).sum()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        summary["putCallOpenInterestRatio"] = summary["putOpenInterest"] / summary["callOpenInterest"].replace(0, np.nan)
+        summary["putCallVolumeRatio"] = summary["putVolume"] / summary["callVolume"].replace(0, np.nan)
+    summary["daysToExpiration"] = years_to_expiration(summary.index.to_numpy(), now) * 365
+
+    strikes = contracts["strike"].to_numpy(dtype=np.float64)
+    volatility = contracts["impliedVolatility"].to_numpy(dtype=np.float64)
+    expirations = contracts["expiration"].to_numpy()
+    pains, atm_volatility = [], []
+    for expiration in summary.index:
+        rows = expirations == expiration
+        pains.append(max_pain(strikes[rows], is_call[rows], open_interest[rows]))
+        # The strike closest to the underlying's price, averaging the call and the put
+        usable = rows & (volatility >= MIN_IMPLIED_VOLATILITY)
+        if usable.any():
+            distance = np.abs(strikes[usable] - chain.underlying_price)
+            atm_volatility.append(float(volatility[usable][distance == distance.min()].mean()))
+        else:
+            atm_volatility.append(np.nan)
+    summary["maxPain"] = pains
+    summary["atmImpliedVolatility"] = atm_volatility
+    return summary.reset_index()
+
+def analyze_chain(
+    chain: OptionChain,
+    strike_window: Optional[float] = 0.1,
+    rate: float = RISK_FREE_RATE,
+    dividend_yield: float = 0.0,
+    now: Optional[datetime] = None
+) -> dict:
+    """
+    The analytics are computed over every contract of the chain, only the Greeks and the surface returned are limited
+    to strikes within `strike_window` of the underlying's price to keep the result small.
+    """
+    if not chain.underlying_price or chain.contracts.empty:
+        raise ValueError(f"No options data for {chain.ticker}")
+    summary = expiration_summary(chain, now)
+    greeks = chain_greeks(chain, rate, dividend_yield, now)
+    if strike_window is not None:
+        strikes = greeks["strike"].to_numpy(dtype=np.float64)
+        greeks = greeks[np.abs(strikes - chain.underlying_price) <= strike_window * chain.underlying_price]
+    surface = iv_surface(chain, strike_window)
+    total_calls = summary["callOpenInterest"].sum()
+
+    return {
+        "ticker": chain.ticker,
+        "underlyingPrice": chain.underlying_price,
+        "riskFreeRate": rate,
+        "putCallOpenInterestRatio": round(float(summary["putOpenInterest"].sum() / total_calls), 4) if total_calls else None,
+        "expirations": {name: json_values(summary[name]) for name in summary.columns},
+        "impliedVolatilitySurface": {
+            "strikes": json_values(surface.index.to_series()),
+            "expirations": list(surface.columns),
+            # One row per strike, one value per expiration
+            "impliedVolatility": [json_values(surface.loc[strike]) for strike in surface.index],
+        },
+        "greeks": {name: json_values(greeks[name]) for name in GREEK_COLUMNS},
+    }
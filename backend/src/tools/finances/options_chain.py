@@ -0,0 +1,126 @@
+"""
+Options chain engine: fetches the requested expirations concurrently, filters every contract of every expiration with
+one set of vectorized masks and returns the result column by column, so field names are not repeated per contract.
+"""
+import math
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+from .market_data import QUOTE_SESSION_TTL, HISTORY_SESSION_TTL, market_data_cache, market_ttl
+from .yahoo_session import get_yahoo_session
+
+OPTIONS_FETCH_WORKERS = int(os.getenv("OPTIONS_FETCH_WORKERS", 8))
+DEFAULT_MAX_EXPIRATIONS = 4
+# Columns of the result, in order.  contractSize and currency are the same for every listed US contract
+OPTION_COLUMNS = [
+    "contractSymbol", "type", "expiration", "strike", "lastPrice", "bid", "ask", "change", "percentChange",
+    "volume", "openInterest", "impliedVolatility", "inTheMoney", "lastTradeDate",
+]
+# Prices are quoted in cents, ratios don't need more than 4 decimals either
+DECIMALS = 4
+
+fetch_pool = ThreadPoolExecutor(max_workers=OPTIONS_FETCH_WORKERS, thread_name_prefix="options")
+
+
+class OptionChain:
+    """Every contract of the fetched expirations in one frame (OPTION_COLUMNS) and the underlying's price"""
+    def __init__(self, ticker: str, contracts: pd.DataFrame, underlying_price: Optional[float]):
+        self.ticker = ticker
+        self.contracts = contracts
+        self.underlying_price = underlying_price
+
+def get_option_expirations(ticker: str) -> tuple:
+    ticker = ticker.upper()
+    return market_data_cache.get_or_load(
+        ("option_expirations", ticker),
+        lambda: tuple(yf.Ticker(ticker, session=get_yahoo_session()).options),
+        ttl=lambda expirations: market_ttl(HISTORY_SESSION_TTL) if expirations else 0
+    )
+
+def _load_expiration(yf_ticker: yf.Ticker, lock: threading.Lock, expiration: str) -> tuple:
+    # yfinance needs the list of expirations before it can fetch one, load it once for every thread
+    with lock:
+        yf_ticker.options
+    chain = yf_ticker.option_chain(expiration)
+    frames = []
+    for contract_type, frame in (("call", chain.calls), ("put", chain.puts)):
+        if frame is not None and not frame.empty:
+            frames.append(frame.assign(type=contract_type, expiration=expiration))
+    contracts = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=OPTION_COLUMNS)
+    underlying_price = (chain.underlying or {}).get("regularMarketPrice")
+    return contracts, underlying_price
+
+def fetch_option_chain(ticker: str, expirations: Sequence[str]) -> OptionChain:
+    """Fetches the expirations concurrently, every expiration is cached on its own"""
+    ticker = ticker.upper()
+    yf_ticker = yf.Ticker(ticker, session=get_yahoo_session())
+    lock = threading.Lock()
+
+    def load(expiration: str) -> tuple:
+        return market_data_cache.get_or_load(
+            ("option_chain", ticker, expiration),
+            lambda: _load_expiration(yf_ticker, lock, expiration),
+            ttl=lambda _: market_ttl(QUOTE_SESSION_TTL)
+        )
+
+    results = list(fetch_pool.map(load, expirations))
+    frames = [contracts for contracts, _ in results if not contracts.empty]
+    contracts = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=OPTION_COLUMNS)
+    prices = [price for _, price in results if price is not None]
+    return OptionChain(ticker, contracts, prices[0] if prices else None)
+
+def select_expirations(available: Sequence[str], expiration: Optional[str] = None, max_expirations: Optional[int] = DEFAULT_MAX_EXPIRATIONS) -> List[str]:
+    """The given expiration, or the first `max_expirations` upcoming ones (all of them when None)"""
+    if expiration is not None:
+        if expiration not in available:
+            raise ValueError(f"Expiration {expiration} is not listed, available expirations are: {', '.join(available[:12])}")
+        return [expiration]
+    return list(available if max_expirations is None else available[:max(1, max_expirations)])
+
+def filter_contracts(
+    chain: OptionChain,
+    strike_price: Optional[float] = None,
+    contract_type: Optional[str] = None,
+    strike_window: Optional[float] = None,
+    include_in_the_money: bool = False
+) -> pd.DataFrame:
+    """All the filters are combined into a single mask over the contracts of every expiration"""
+    contracts = chain.contracts
+    mask = np.ones(len(contracts), dtype=bool)
+    if not include_in_the_money:
+        mask &= ~contracts["inTheMoney"].to_numpy(dtype=bool)
+    if contract_type is not None:
+        if contract_type not in ("call", "put"):
+            raise ValueError(f"Invalid contract_type: {contract_type}")
+        mask &= contracts["type"].to_numpy() == contract_type
+    strikes = contracts["strike"].to_numpy(dtype=np.float64)
+    if strike_price is not None:
+        mask &= strikes >= strike_price
+    if strike_window is not None and chain.underlying_price:
+        mask &= np.abs(strikes - chain.underlying_price) <= strike_window * chain.underlying_price
+    return contracts.loc[mask, OPTION_COLUMNS]
+
+def json_values(values: pd.Series) -> list:
+    """A column as a JSON-ready list: NaN and NaT become null, floats are rounded to DECIMALS"""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return [None if pd.isna(value) else value.isoformat() for value in values]
+    if pd.api.types.is_float_dtype(values):
+        return [None if math.isnan(value) else value for value in np.round(values.to_numpy(dtype=np.float64), DECIMALS).tolist()]
+    if pd.api.types.is_integer_dtype(values) or pd.api.types.is_bool_dtype(values):
+        return values.tolist()
+    return [None if pd.isna(value) else value for value in values.tolist()]
+
+def to_columnar(chain: OptionChain, contracts: pd.DataFrame) -> Dict:
+    """The filtered contracts as {column: [values]}, the form the tool returns"""
+    return {
+        "ticker": chain.ticker,
+        "underlyingPrice": chain.underlying_price,
+        "count": len(contracts),
+        "columns": {name: json_values(contracts[name]) for name in OPTION_COLUMNS},
+    }
@@ -0,0 +1,116 @@
+"""
+Shared async client for the Polygon.io REST API.
+
+One httpx.AsyncClient per event loop keeps TLS connections alive between tool calls, a semaphore bounds the number
+of requests in flight, failed requests (connection errors, timeouts, 429 and 5xx) are retried with exponential
+backoff and full jitter, and list endpoints are streamed page by page by following `next_url`.
+"""
+import asyncio
+import os
+import random
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+import httpx
+
+POLYGON_BASE_URL = os.getenv("POLYGON_API_ENDPOINT")
+POLYGON_MAX_CONNECTIONS = int(os.getenv("POLYGON_MAX_CONNECTIONS", 10))
+POLYGON_MAX_CONCURRENCY = int(os.getenv("POLYGON_MAX_CONCURRENCY", 8))
+POLYGON_TIMEOUT_SECONDS = float(os.getenv("POLYGON_TIMEOUT_SECONDS", 10))
+POLYGON_MAX_RETRIES = int(os.getenv("POLYGON_MAX_RETRIES", 3))
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class PolygonClient:
+    def __init__(
+        self,
+        base_url: Optional[str] = POLYGON_BASE_URL,
+        api_key: Optional[str] = None,
+        max_connections: int = POLYGON_MAX_CONNECTIONS,
+        max_concurrency: int = POLYGON_MAX_CONCURRENCY,
+        timeout: float = POLYGON_TIMEOUT_SECONDS,
+        max_retries: int = POLYGON_MAX_RETRIES,
+        backoff: float = 0.5,
+        max_backoff: float = 8.0
+    ):
+        self.base_url = base_url
+        self.api_key = api_key
+        self.max_connections = max_connections
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        # httpx clients and asyncio semaphores belong to the loop they were created on
+        self._loops: Dict[asyncio.AbstractEventLoop, Tuple[httpx.AsyncClient, asyncio.Semaphore]] = {}
+
+    def _session(self) -> Tuple[httpx.AsyncClient, asyncio.Semaphore]:
+        loop = asyncio.get_running_loop()
+        for stale in [other for other in self._loops if other.is_closed()]:
+            del self._loops[stale]
+        if loop not in self._loops:
+            api_key = self.api_key or os.getenv("POLYGON_API_KEY")
+            if not api_key:
+                raise ValueError("No API key found for Polygon.io")
+            client = httpx.AsyncClient(
+                base_url=self.base_url or "https://api.polygon.io/",
+                # The key goes in a header so it never ends up in logged URLs
+                headers={"Authorization": f"Bearer {api_key}"},
+                timeout=httpx.Timeout(self.timeout),
+                limits=httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections)
+            )
+            self._loops[loop] = (client, asyncio.Semaphore(self.max_concurrency))
+        return self._loops[loop]
+
+    def _delay(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after is not None:
+            try:
+                return min(float(retry_after), self.max_backoff)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    async def get(self, path: str, params: Optional[dict] = None) -> dict:
+        """GET a path (or an absolute next_url) and return the JSON body, retrying transient failures"""
+        client, semaphore = self._session()
+        for attempt in range(self.max_retries + 1):
+            response = None
+            try:
+                async with semaphore:
+                    response = await client.get(path, params=params)
+                if response.status_code not in RETRY_STATUS_CODES:
+                    response.raise_for_status()
+                    return response.json()
+            except (httpx.TransportError, httpx.TimeoutException):
+                if attempt == self.max_retries:
+                    raise
+            if attempt == self.max_retries:
+                response.raise_for_status()
+            await asyncio.sleep(self._delay(attempt, response))
+
+    async def paginate(self, path: str, params: Optional[dict] = None, max_results: Optional[int] = None) -> AsyncIterator[dict]:
+        """Yields the results of a list endpoint one by one, fetching the next page only when it is needed"""
+        count = 0
+        url, page_params = path, params
+        while url:
+            page = await self.get(url, page_params)
+            if page.get("status") not in ("OK", "DELAYED"):
+                raise ValueError(f"Polygon.io API Error: {page}")
+            for result in page.get("results") or []:
+                yield result
+                count += 1
+                if max_results is not None and count >= max_results:
+                    return
+            # next_url already carries the query and the cursor
+            url, page_params = page.get("next_url"), None
+
+    async def list(self, path: str, params: Optional[dict] = None, max_results: Optional[int] = None) -> list:
+        return [result async for result in self.paginate(path, params, max_results)]
+
+    async def aclose(self):
+        for client, _ in self._loops.values():
+            await client.aclose()
+        self._loops.clear()
+
+polygon_client = PolygonClient()
@@ -0,0 +1,183 @@
+"""
+Risk of a portfolio of stocks from the aligned daily returns of all of its holdings, read in one batch from the price
+store: the covariance matrix, each holding's volatility, beta and contribution to the portfolio's volatility, the
+most correlated pairs, and historical and parametric value at risk, checked against the risk band of the user's
+investment profile score.
+"""
+from dataclasses import dataclass
+from statistics import NormalDist
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from .backtest import TRADING_DAYS
+from .price_store import get_price_store
+from .screener import json_floats
+from .universe import load_universe, universe_tickers
+
+DEFAULT_BENCHMARK = "^GSPC"
+DEFAULT_LOOKBACK_DAYS = 252
+MIN_OBSERVATIONS = 30
+CONFIDENCE_LEVELS = [0.95, 0.99]
+CORRELATED_PAIRS = 10
+
+
+@dataclass
+class RiskBand:
+    name: str
+    min_score: int
+    max_score: int
+    max_volatility: float  # annualized
+    max_beta: float
+
+# The bands of the investment profile questionnaire's total score (INVESTMENT_RISK_PROFILE_PROMPT)
+RISK_BANDS = [
+    RiskBand("Conservative", 0, 9, max_volatility=0.10, max_beta=0.6),
+    RiskBand("Moderate", 10, 18, max_volatility=0.18, max_beta=1.0),
+    RiskBand("Aggressive", 19, 27, max_volatility=0.30, max_beta=1.5),
+]
+
+
+def risk_band(score: int) -> RiskBand:
+    for band in RISK_BANDS:
+        if band.min_score <= score <= band.max_score:
+            return band
+    raise ValueError(f"The investment profile total score must be between {RISK_BANDS[0].min_score} and {RISK_BANDS[-1].max_score}")
+
+def last_valid(values: np.ndarray) -> np.ndarray:
+    """The last non-NaN value of every column"""
+    present = ~np.isnan(values)
+    rows = len(values) - 1 - np.argmax(present[::-1], axis=0)
+    return values[rows, np.arange(values.shape[1])]
+
+def value_at_risk(returns: np.ndarray, mean: float, volatility: float, horizon_days: int) -> dict:
+    """
+    Losses (positive fractions of the portfolio's value) not exceeded at each confidence level over the horizon:
+    historical from the overlapping horizon returns, parametric from a normal distribution, and the historical
+    expected shortfall, the average loss beyond the historical VaR
+    """
+    log_returns = np.cumsum(np.concatenate([[0.0], np.log1p(returns)]))
+    horizon_returns = np.expm1(log_returns[horizon_days:] - log_returns[:-horizon_days])
+    var = {}
+    for level in CONFIDENCE_LEVELS:
+        historical = -np.quantile(horizon_returns, 1 - level)
+        tail = horizon_returns[horizon_returns <= -historical]
+        suffix = round(level * 100)
+        var[f"historical_{suffix}"] = historical
+        var[f"parametric_{suffix}"] = -(mean * horizon_days + NormalDist().inv_cdf(1 - level) * volatility * np.sqrt(horizon_days))
+        var[f"expected_shortfall_{suffix}"] = -tail.mean() if len(tail) else historical
+    return var
+
+def portfolio_risk(
+    tickers: Sequence[str],
+    shares: Optional[Sequence[float]] = None,
+    weights: Optional[Sequence[float]] = None,
+    benchmark: str = DEFAULT_BENCHMARK,
+    lookback_days: int = DEFAULT_LOOKBACK_DAYS,
+    horizon_days: int = 1,
+    investment_profile_total_score: Optional[int] = None
+) -> dict:
+    """
+    The risk of holding `shares` of the tickers (valued at their last close) or the given `weights`, equal weights
+    without either, over the last `lookback_days` trading days on which every holding and the benchmark traded.
+    """
+    tickers = [ticker.upper() for ticker in tickers]
+    if not tickers or len(set(tickers)) != len(tickers):
+        raise ValueError("Give each holding's ticker once")
+    for name, values in (("shares", shares), ("weights", weights)):
+        if values is not None and len(values) != len(tickers):
+            raise ValueError(f"Give as many {name} as tickers")
+    band = risk_band(investment_profile_total_score) if investment_profile_total_score is not None else None
+    benchmark = benchmark.upper()
+    horizon_days = max(1, horizon_days)
+
+    store = get_price_store()
+    universe = load_universe(universe_tickers(tickers + [benchmark], store), rows=max(MIN_OBSERVATIONS, lookback_days) + 1, store=store)
+    missing = [ticker for ticker in tickers + [benchmark] if ticker not in universe.tickers]
+    if missing:
+        raise ValueError(f"No price history found for {', '.join(missing)}")
+    columns = [universe.tickers.index(ticker) for ticker in tickers + [benchmark]]
+    close = universe.column("close")[:, columns]
+    returns = close[1:] / close[:-1] - 1
+    # Only the days every holding and the benchmark traded
+    returns = returns[~np.isnan(returns).any(axis=1)]
+    if len(returns) < max(MIN_OBSERVATIONS, horizon_days + 1):
+        raise ValueError(f"The holdings only have {len(returns)} days of returns in common")
+    returns, benchmark_returns = returns[:, :-1], returns[:, -1]
+
+    prices = last_valid(close[:, :-1])
+    if shares is not None:
+        values = np.asarray(shares, dtype=np.float64) * prices
+    elif weights is not None:
+        values = np.asarray(weights, dtype=np.float64)
+    else:
+        values = np.ones(len(tickers))
+    if not np.isfinite(values).all() or values.sum() <= 0:
+        raise ValueError("The holdings must have a positive total value")
+    w = values / values.sum()
+
+    demeaned = returns - returns.mean(axis=0)
+    covariance = demeaned.T @ demeaned / (len(returns) - 1) * TRADING_DAYS
+    volatilities = np.sqrt(np.diag(covariance))
+    portfolio_volatility = float(np.sqrt(w @ covariance @ w))
+    # Euler decomposition: the contributions add up to the portfolio's volatility
+    marginal = covariance @ w / portfolio_volatility if portfolio_volatility else np.zeros(len(w))
+    contributions = w * marginal
+    benchmark_demeaned = benchmark_returns - benchmark_returns.mean()
+    betas = demeaned.T @ benchmark_demeaned / (benchmark_demeaned @ benchmark_demeaned)
+    portfolio_returns = returns @ w
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        correlation = covariance / np.outer(volatilities, volatilities)
+    first, second = np.triu_indices(len(tickers), k=1)
+    pair_order = np.argsort(-correlation[first, second], kind="stable")[:CORRELATED_PAIRS]
+
+    portfolio_beta = float(w @ betas)
+    var = value_at_risk(portfolio_returns, portfolio_returns.mean(), portfolio_volatility / np.sqrt(TRADING_DAYS), horizon_days)
+    total_value = float(values.sum()) if shares is not None else None
+    result = {
+        "as_of": universe.as_of,
+        "observations": len(returns),
+        "benchmark": benchmark,
+        "horizon_days": horizon_days,
+        "portfolio": dict(zip(
+            ["value", "volatility", "beta", "average_correlation", "diversification_ratio"],
+            json_floats(np.array([
+                np.nan if total_value is None else total_value,
+                portfolio_volatility,
+                portfolio_beta,
+                correlation[first, second].mean() if len(first) else np.nan,
+                w @ volatilities / portfolio_volatility if portfolio_volatility else np.nan,
+            ]))
+        )),
+        "value_at_risk": dict(zip(var, json_floats(np.array(list(var.values()))))),
+        "holdings": {
+            "ticker": tickers,
+            "weight": json_floats(w),
+            "price": json_floats(prices),
+            "volatility": json_floats(volatilities),
+            "beta": json_floats(betas),
+            "risk_contribution": json_floats(contributions / portfolio_volatility if portfolio_volatility else contributions),
+        },
+        "most_correlated": {
+            "pair": [f"{tickers[first[index]]}/{tickers[second[index]]}" for index in pair_order],
+            "correlation": json_floats(correlation[first[pair_order], second[pair_order]]),
+        },
+    }
+    if total_value is not None:
+        result["value_at_risk_amount"] = dict(zip(var, json_floats(np.array(list(var.values())) * total_value)))
+    if band is not None:
+        exceeds: List[str] = []
+        if portfolio_volatility > band.max_volatility:
+            exceeds.append(f"volatility {portfolio_volatility:.1%} is above the {band.max_volatility:.0%} of a {band.name.lower()} profile")
+        if portfolio_beta > band.max_beta:
+            exceeds.append(f"beta {portfolio_beta:.2f} is above the {band.max_beta} of a {band.name.lower()} profile")
+        result["risk_profile"] = {
+            "investment_profile_total_score": investment_profile_total_score,
+            "band": band.name,
+            "max_volatility": band.max_volatility,
+            "max_beta": band.max_beta,
+            "within_band": not exceeds,
+            "exceeds": exceeds,
+        }
+    return result
@@ -0,0 +1,94 @@
+"""
+Quotes for many tickers in one request.
+
+Yahoo's v7 quote endpoint takes a comma separated list of symbols and answers with the quote fields of every one of
+them, where `.info` makes two requests per ticker (quoteSummary and quote) and returns 150+ fields.  Records are
+cached per ticker, so a batch only asks for the tickers that are not cached yet, and identical batches requested at
+the same time share one request.
+"""
+import os
+from typing import Dict, List, Optional, Sequence
+
+from yfinance.data import YfData
+
+from .market_data import QUOTE_SESSION_TTL, market_data_cache, market_ttl
+from .yahoo_session import get_yahoo_session
+
+YAHOO_QUOTE_URL = "https://query1.finance.yahoo.com/v7/finance/quote"
+# Symbols per request, Yahoo rejects very long lists
+QUOTE_BATCH_SIZE = int(os.getenv("QUOTE_BATCH_SIZE", 50))
+
+# What the model needs to talk about a quote, in the order it reads best
+QUOTE_FIELDS = [
+    "symbol",
+    "shortName",
+    "quoteType",
+    "currency",
+    "marketState",
+    "regularMarketPrice",
+    "regularMarketChange",
+    "regularMarketChangePercent",
+    "regularMarketOpen",
+    "regularMarketDayHigh",
+    "regularMarketDayLow",
+    "regularMarketPreviousClose",
+    "regularMarketVolume",
+    "averageDailyVolume3Month",
+    "regularMarketTime",
+    "preMarketPrice",
+    "postMarketPrice",
+    "bid",
+    "ask",
+    "fiftyTwoWeekLow",
+    "fiftyTwoWeekHigh",
+    "fiftyDayAverage",
+    "twoHundredDayAverage",
+    "marketCap",
+    "trailingPE",
+    "forwardPE",
+    "epsTrailingTwelveMonths",
+    "trailingAnnualDividendYield",
+]
+
+
+def fetch_quotes(tickers: Sequence[str]) -> Dict[str, dict]:
+    """Full quote records by symbol, one request per QUOTE_BATCH_SIZE tickers.  Unknown tickers are left out."""
+    data = YfData(session=get_yahoo_session())
+    quotes = {}
+    for start in range(0, len(tickers), QUOTE_BATCH_SIZE):
+        symbols = ",".join(tickers[start:start + QUOTE_BATCH_SIZE])
+        response = data.get_raw_json(
+            YAHOO_QUOTE_URL,
+            user_agent_headers=data.user_agent_headers,
+            params={"symbols": symbols, "formatted": "false"}
+        )
+        for quote in (response.get("quoteResponse") or {}).get("result") or []:
+            quotes[quote["symbol"].upper()] = quote
+    return quotes
+
+def trim_quote(quote: dict) -> dict:
+    return {field: quote[field] for field in QUOTE_FIELDS if quote.get(field) is not None}
+
+def get_quotes(tickers: Sequence[str], full: bool = False) -> List[Optional[dict]]:
+    """
+    Quote records in the order of `tickers` (trimmed to QUOTE_FIELDS unless `full`), None for an unknown ticker.
+    The records are shared with the cache, the trimmed ones are copies.
+    """
+    tickers = [ticker.upper() for ticker in tickers]
+    quotes = {ticker: market_data_cache.get(("quote", ticker)) for ticker in dict.fromkeys(tickers)}
+    missing = [ticker for ticker, quote in quotes.items() if quote is None]
+    if missing:
+        def load() -> Dict[str, dict]:
+            fetched = fetch_quotes(missing)
+            ttl = market_ttl(QUOTE_SESSION_TTL)
+            for ticker, quote in fetched.items():
+                market_data_cache.put(("quote", ticker), quote, ttl)
+            return fetched
+
+        # Concurrent requests for the same missing tickers share one fetch, the records are cached per ticker
+        # above so the batch itself is not (ttl 0)
+        quotes.update(market_data_cache.get_or_load(("quotes", tuple(sorted(missing))), load, 0))
+    return [
+        None if quotes.get(ticker) is None else quotes[ticker] if full else trim_quote(quotes[ticker])
+        for ticker in tickers
+    ]
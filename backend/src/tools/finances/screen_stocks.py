@@ -0,0 +1,26 @@
+from pydantic import Field, BaseModel
+from langchain_core.tools import tool
+from typing import List, Optional
+from .expressions import FUNCTIONS
+from .indicators import FRAME_COLUMNS
+from .screener import DEFAULT_LIMIT, screen
+
+class ScreenStocksInput(BaseModel):
+    expression: str = Field(description=(
+        "The filter, a python-like expression evaluated for every stock on the last trading day, "
+        "e.g. 'golden_cross == 1 and rsi < 40' or 'within(crossed_above(macd, macd_signal), 3) and K < 20'.  "
+        f"Names: {', '.join(FRAME_COLUMNS)} (golden_cross and death_cross are 1 on the day of the cross).  "
+        f"Functions: {'; '.join(FUNCTIONS.values())}.  Operators: + - * / < <= > >= == != and or not"
+    ))
+    tickers: Optional[List[str]] = Field(None, description="The stocks to screen, the whole stock universe of the screener by default")
+    sort_by: Optional[str] = Field(None, description="An expression to sort the matches by, e.g. 'rsi' or 'change(close, 20)'")
+    descending: bool = Field(True, description="Sort the matches from the highest sort_by value down")
+    limit: int = Field(DEFAULT_LIMIT, description="The maximum number of matches to return")
+
+@tool("screen_stocks", args_schema=ScreenStocksInput)
+def screen_stocks(expression: str, tickers: Optional[List[str]] = None, sort_by: Optional[str] = None, descending: bool = True, limit: int = DEFAULT_LIMIT) -> dict:
+    """
+    Used for finding the stocks that match technical conditions (cross signals, RSI, stochastics, MACD, ADR, moving
+    averages, prices) across a whole universe of stocks in one call.
+    """
+    return screen(expression, tickers, sort_by, descending, limit)
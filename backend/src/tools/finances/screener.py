@@ -0,0 +1,63 @@
+"""
+Screener: one filter expression evaluated over every ticker of a universe at once, on the last date of the universe.
+"""
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from .expressions import Expression
+from .options_chain import DECIMALS
+from .price_store import get_price_store
+from .universe import load_universe, universe_tickers
+
+DEFAULT_LIMIT = 25
+MAX_LIMIT = 500
+
+
+def json_floats(values: np.ndarray) -> List[Optional[float]]:
+    return [None if np.isnan(value) else float(value) for value in np.round(values, DECIMALS)]
+
+def screen(
+    expression: str,
+    tickers: Optional[Sequence[str]] = None,
+    sort_by: Optional[str] = None,
+    descending: bool = True,
+    limit: int = DEFAULT_LIMIT
+) -> dict:
+    """
+    The tickers for which `expression` holds on the universe's last date, with the values of the columns the
+    expressions use, sorted by the `sort_by` expression.  Without `tickers` the default universe is screened, tickers
+    that are given and not in the price store yet are fetched first.
+    """
+    condition = Expression(expression)
+    ranking = Expression(sort_by) if sort_by else None
+    store = get_price_store()
+    universe = load_universe(universe_tickers(tickers, store), store=store)
+    if not universe.tickers:
+        raise ValueError("There are no tickers with prices to screen")
+
+    shape = (len(universe.dates), len(universe.tickers))
+    matches = np.flatnonzero(np.broadcast_to(condition.mask(universe.column), shape)[-1])
+    scores = None
+    if ranking is not None:
+        scores = np.broadcast_to(ranking.evaluate(universe.column), shape)[-1][matches].astype(np.float64)
+        # NaN scores go last whatever the direction
+        order = np.argsort(np.where(np.isnan(scores), np.inf, -scores if descending else scores), kind="stable")
+        matches, scores = matches[order], scores[order]
+    shown = matches[:max(1, min(limit, MAX_LIMIT))]
+
+    names = condition.names + [name for name in (ranking.names if ranking else []) if name not in condition.names]
+    columns = {"ticker": [universe.tickers[index] for index in shown]}
+    for name in ["close"] + [name for name in names if name != "close"]:
+        columns[name] = json_floats(universe.column(name)[-1, shown])
+    if scores is not None:
+        columns[sort_by] = json_floats(scores[:len(shown)])
+    return {
+        "expression": expression,
+        "as_of": universe.as_of,
+        "universe": len(universe.tickers),
+        # Tickers without a bar on the last date can't match
+        "stale": int(universe.stale().sum()),
+        "count": int(len(matches)),
+        "columns": columns,
+    }
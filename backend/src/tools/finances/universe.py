@@ -0,0 +1,137 @@
+"""
+A universe of tickers as (dates, tickers) matrices, read from the local price store and aligned on the union of
+their dates, with every indicator computed for all tickers in one pass.  The screener and the backtester work on
+these matrices instead of calling the indicators tool ticker by ticker.
+
+Universes are cached by their tickers and the generation of every ticker in the store, so a universe is only read
+and computed again when one of its tickers got new bars.  Keep the store fresh with a scheduled job:
+    python -m src.tools.finances.universe [TICKER ...]
+"""
+import hashlib
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from ..cache import TTLCache
+from .indicators import FRAME_COLUMNS, INDICATOR_COLUMNS, PRICE_COLUMNS, compute_indicators
+from .market_data import HISTORY_SESSION_TTL, MARKET_TZ, market_ttl
+from .price_store import PriceStore, get_price_store
+
+# A comma separated list of tickers, or the path of a file with one ticker per line.  All stored tickers by default
+SCREENER_UNIVERSE = os.getenv("SCREENER_UNIVERSE")
+# Trading days of history in a screening universe, enough for the 200 day moving average to be defined
+UNIVERSE_ROWS = 260
+UNIVERSE_SYNC_WORKERS = int(os.getenv("UNIVERSE_SYNC_WORKERS", 8))
+
+universe_cache = TTLCache(
+    "universe",
+    max_bytes=int(os.getenv("UNIVERSE_CACHE_MAX_BYTES", 512 * 1024 * 1024)),
+    sizer=lambda universe: universe.nbytes
+)
+
+
+@dataclass
+class Universe:
+    tickers: List[str]
+    dates: np.ndarray                 # int64 nanoseconds since the epoch (UTC), the union of the tickers' dates
+    columns: Dict[str, np.ndarray]    # FRAME_COLUMNS -> (dates, tickers), NaN where a ticker has no bar
+    tz: str
+
+    @property
+    def nbytes(self) -> int:
+        return self.dates.nbytes + sum(values.nbytes for values in self.columns.values())
+
+    @property
+    def as_of(self) -> str:
+        return pd.Timestamp(self.dates[-1], tz="UTC").tz_convert(self.tz).strftime("%Y-%m-%d") if len(self.dates) else None
+
+    def column(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def stale(self) -> np.ndarray:
+        """Tickers without a bar on the universe's last date"""
+        return np.isnan(self.columns["close"][-1]) if len(self.dates) else np.ones(len(self.tickers), dtype=bool)
+
+def default_universe(store: Optional[PriceStore] = None) -> List[str]:
+    if SCREENER_UNIVERSE:
+        if os.path.exists(SCREENER_UNIVERSE):
+            with open(SCREENER_UNIVERSE) as file:
+                return [line.strip().upper() for line in file if line.strip() and not line.startswith("#")]
+        return [ticker.strip().upper() for ticker in SCREENER_UNIVERSE.split(",") if ticker.strip()]
+    return (store or get_price_store()).tickers()
+
+def sync_universe(tickers: Sequence[str], store: Optional[PriceStore] = None) -> List[str]:
+    """Brings the tickers up to date in the store, returns the ones that have prices"""
+    store = store or get_price_store()
+    with ThreadPoolExecutor(max_workers=UNIVERSE_SYNC_WORKERS, thread_name_prefix="universe") as pool:
+        synced = list(pool.map(store.sync, tickers))
+    return [ticker for ticker, ok in zip(tickers, synced) if ok]
+
+def universe_tickers(tickers: Optional[Sequence[str]] = None, store: Optional[PriceStore] = None) -> List[str]:
+    """The given tickers, fetching the ones that are not in the store yet, or the default universe"""
+    store = store or get_price_store()
+    if not tickers:
+        return default_universe(store)
+    tickers = [ticker.upper() for ticker in tickers]
+    stored = set(store.tickers())
+    sync_universe([ticker for ticker in tickers if ticker not in stored], store)
+    return tickers
+
+def _version(tickers: Sequence[str], store: PriceStore) -> str:
+    digest = hashlib.blake2b(digest_size=8)
+    for ticker in tickers:
+        meta = store.meta(ticker) or {}
+        digest.update(f"{ticker}:{meta.get('generation')}:{meta.get('rows')};".encode())
+    return digest.hexdigest()
+
+def read_universe(tickers: Sequence[str], rows: Optional[int] = UNIVERSE_ROWS, start: Optional[pd.Timestamp] = None, store: Optional[PriceStore] = None) -> Universe:
+    """
+    Aligns the stored bars of the tickers on the union of their dates, keeping the last `rows` dates (all of them
+    when None) from `start` on.  Tickers that are not in the store are left out.
+    """
+    store = store or get_price_store()
+    slices = {}
+    for ticker in tickers:
+        prices = store.read(ticker, start=start)
+        if prices is not None and len(prices):
+            slices[ticker] = prices
+    tickers = list(slices)
+    tz = next(iter(slices.values())).tz if slices else str(MARKET_TZ)
+    if not slices:
+        return Universe(tickers=[], dates=np.empty(0, dtype=np.int64), columns={name: np.empty((0, 0)) for name in FRAME_COLUMNS}, tz=tz)
+
+    dates = np.unique(np.concatenate([np.asarray(prices.dates[-rows:] if rows else prices.dates) for prices in slices.values()]))
+    if rows:
+        dates = dates[-rows:]
+    prices_by_column = {name: np.full((len(dates), len(tickers)), np.nan) for name in PRICE_COLUMNS}
+    for column, ticker in enumerate(tickers):
+        prices = slices[ticker]
+        ticker_dates = np.asarray(prices.dates)
+        keep = ticker_dates >= dates[0]
+        positions = np.searchsorted(dates, ticker_dates[keep])
+        for name in PRICE_COLUMNS:
+            prices_by_column[name][positions, column] = np.asarray(getattr(prices, name))[keep]
+
+    indicators = compute_indicators(*(prices_by_column[name] for name in PRICE_COLUMNS))
+    columns = {**prices_by_column, **{name: indicators[name] for name in INDICATOR_COLUMNS}}
+    return Universe(tickers=tickers, dates=dates, columns=columns, tz=tz)
+
+def load_universe(tickers: Sequence[str], rows: Optional[int] = UNIVERSE_ROWS, store: Optional[PriceStore] = None) -> Universe:
+    """read_universe, cached until one of the tickers is rewritten in the store"""
+    store = store or get_price_store()
+    tickers = list(dict.fromkeys(ticker.upper() for ticker in tickers))
+    return universe_cache.get_or_load(
+        (tuple(tickers), rows, _version(tickers, store)),
+        lambda: read_universe(tickers, rows, store=store),
+        ttl=market_ttl(HISTORY_SESSION_TTL)
+    )
+
+if __name__ == "__main__":
+    tickers = [ticker.upper() for ticker in sys.argv[1:]] or default_universe()
+    synced = sync_universe(tickers)
+    print(f"{len(synced)} of {len(tickers)} tickers synced to {get_price_store().directory}")
@@ -0,0 +1,115 @@
+"""
+OpenWeather behind one pooled session and a cache.
+
+A location is normalized and geocoded once, the coordinates are kept for a long time and current conditions and the
+forecast are then cached per coordinates with their own TTLs, so "Seattle, WA, US" and "seattle,wa,us" share every
+entry.  Several locations are fetched concurrently.
+"""
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from ..cache import TTLCache
+
+OPENWEATHER_BASE_URL = os.getenv("OPENWEATHER_API_ENDPOINT", "https://api.openweathermap.org/")
+# Current conditions are refreshed about every 10 minutes by OpenWeather, daily forecasts a few times a day
+WEATHER_CURRENT_TTL = float(os.getenv("WEATHER_CURRENT_TTL_SECONDS", 600))
+WEATHER_FORECAST_TTL = float(os.getenv("WEATHER_FORECAST_TTL_SECONDS", 3600))
+# Cities don't move
+WEATHER_GEOCODE_TTL = float(os.getenv("WEATHER_GEOCODE_TTL_SECONDS", 30 * 24 * 60 * 60))
+WEATHER_TIMEOUT_SECONDS = float(os.getenv("WEATHER_TIMEOUT_SECONDS", 10))
+WEATHER_MAX_CONNECTIONS = int(os.getenv("WEATHER_MAX_CONNECTIONS", 8))
+FORECAST_DAYS = 10
+
+weather_cache = TTLCache("weather", max_bytes=int(os.getenv("WEATHER_CACHE_MAX_BYTES", 16 * 1024 * 1024)))
+fetch_pool = ThreadPoolExecutor(max_workers=WEATHER_MAX_CONNECTIONS, thread_name_prefix="weather")
+
+
+@dataclass(frozen=True)
+class Location:
+    name: str
+    state: Optional[str]
+    country: str
+    lat: float
+    lon: float
+
+def normalize_location(location: str) -> str:
+    """'  Seattle ,WA, us' -> 'seattle,wa,us', the form OpenWeather's geocoder expects"""
+    return ",".join(re.sub(r"\s+", " ", part).strip() for part in location.lower().split(",") if part.strip())
+
+class WeatherService:
+    def __init__(self, base_url: str = OPENWEATHER_BASE_URL, api_key: Optional[str] = None, timeout: float = WEATHER_TIMEOUT_SECONDS):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=WEATHER_MAX_CONNECTIONS, pool_maxsize=WEATHER_MAX_CONNECTIONS)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _get(self, path: str, params: dict) -> object:
+        api_key = self.api_key or os.getenv("OPENWEATHER_API_KEY")
+        if api_key is None:
+            raise ValueError("Please provide an API key for OpenWeather in the environment variable OPENWEATHER_API_KEY")
+        response = self.session.get(f"{self.base_url}/{path}", params={**params, "appid": api_key}, timeout=self.timeout)
+        if response.status_code != 200:
+            raise ValueError(f"OpenWeather returned {response.status_code} for {path}")
+        return response.json()
+
+    def geocode(self, location: str) -> Location:
+        normalized = normalize_location(location)
+        if not normalized:
+            raise ValueError("No location given")
+
+        def load() -> Optional[Location]:
+            results = self._get("geo/1.0/direct", {"q": normalized, "limit": 1})
+            if not results:
+                return None
+            result = results[0]
+            return Location(result["name"], result.get("state"), result["country"], result["lat"], result["lon"])
+
+        # Unknown locations are not cached, a typo fixed by the model should not stay unknown
+        resolved = weather_cache.get_or_load(("geocode", normalized), load, ttl=lambda found: WEATHER_GEOCODE_TTL if found else 0)
+        if resolved is None:
+            raise ValueError(f"Unknown location {location}")
+        return resolved
+
+    def _at(self, kind: str, path: str, location: Location, ttl: float, **params) -> dict:
+        # Rounded to ~100m, two spellings of the same city land on the same entry
+        lat, lon = round(location.lat, 3), round(location.lon, 3)
+        return weather_cache.get_or_load(
+            (kind, lat, lon, *params.values()),
+            lambda: self._get(path, {"lat": lat, "lon": lon, "units": "imperial", **params}),
+            ttl=ttl
+        )
+
+    def current(self, location: str) -> dict:
+        return self._at("current", "data/2.5/weather", self.geocode(location), WEATHER_CURRENT_TTL)
+
+    def forecast(self, location: str, days: int = FORECAST_DAYS) -> dict:
+        return self._at("forecast", "data/2.5/forecast/daily", self.geocode(location), WEATHER_FORECAST_TTL, cnt=days)
+
+    def for_locations(self, fetch, locations: List[str]) -> List[dict]:
+        """`fetch` (current or forecast) for every location at once, a failed location does not fail the others"""
+        def one(location: str) -> dict:
+            try:
+                return {"location": location, "weather": fetch(location)}
+            except ValueError as e:
+                return {"location": location, "error": str(e)}
+            except requests.RequestException:
+                # The message of a connection error has the URL in it, and the URL has the API key
+                return {"location": location, "error": f"Failed to get weather for {location}"}
+        return list(fetch_pool.map(one, locations))
+
+_service: Optional[WeatherService] = None
+
+def get_weather_service() -> WeatherService:
+    global _service
+    if _service is None:
+        _service = WeatherService()
+    return _service
@@ -1,9 +1,18 @@
+import asyncio
+import numpy as np
+import pandas as pd
 import yfinance as yf
 from langchain_core.tools import tool
 from typing import List, Optional
 from datetime import datetime
 from pydantic import BaseModel, Field
 import json
+from realtime.functions.yahoo_session import get_yahoo_session
+
+OPTION_COLUMNS = [
+    "contractSymbol", "type", "expiration", "strike", "lastPrice", "bid", "ask", "change", "percentChange",
+    "volume", "openInterest", "impliedVolatility", "inTheMoney", "lastTradeDate",
+]
 
 
 get_options_chain_def = {
@@ -23,6 +32,18 @@ get_options_chain_def = {
         "contract_type": {
             "type": "string",
             "description": "The type of option contract to get.  The options are 'call' or 'put'"
+        },
+        "expiration": {
+            "type": "string",
+            "description": "Only return contracts expiring on this date (YYYY-MM-DD)"
+        },
+        "max_expirations": {
+            "type": "integer",
+            "description": "Number of upcoming expiration dates to return when no expiration is given"
+        },
+        "strike_window": {
+            "type": "number",
+            "description": "Only return strikes within this fraction of the current stock price, e.g. 0.1 for +/- 10%"
         }
       },
       "required": ["ticker"],
@@ -34,8 +55,11 @@ get_options_chain_def = {
 
 class OptionsChainInput(BaseModel):
     ticker: str = Field(description="The stock ticker symbol to return the quote for")
-    strike_price: Optional[float] = Field("The strike price of the Option")
-    contract_type: Optional[str] = Field("The type of option contract to get.  The options are 'call' or 'put'")
+    strike_price: Optional[float] = Field(None, description="Only return contracts with a strike price at or above this one")
+    contract_type: Optional[str] = Field(None, description="The type of option contract to get.  The options are 'call' or 'put'")
+    expiration: Optional[str] = Field(None, description="Only return contracts expiring on this date (YYYY-MM-DD)")
+    max_expirations: int = Field(4, description="Number of upcoming expiration dates to return when no expiration is given")
+    strike_window: Optional[float] = Field(None, description="Only return strikes within this fraction of the current stock price, e.g. 0.1 for +/- 10%")
 
 class OptionContract(BaseModel):
     contractSymbol: str = Field("The symbol for the option contract in the format: SYMBOLYYMMDDCXXXXX or SYMBOLYYMMDDPXXXXX where C is a Call and P is a put and XXXXX is the strike price ")
@@ -49,6 +73,7 @@ class OptionContract(BaseModel):
     openInterest: int = Field("The open interest of the option contract") 
     impliedVolatility: float = Field("The implied volatility of the option contract")
     inTheMoney: bool = Field("Whether the option contract is in the money")
+    type: str = Field("Whether the option contract is a 'call' or a 'put'")
     expiration: str = Field("The expiration date of the option contract")
     lastTradeDate: datetime = Field("The last trade date of the option contract")
 
@@ -58,37 +83,50 @@ class OptionContract(BaseModel):
 async def get_options_chain(
     ticker: str,
     strike_price: Optional[float] = None,
-    contract_type: Optional[str] = None
-) -> List[OptionContract]:
+    contract_type: Optional[str] = None,
+    expiration: Optional[str] = None,
+    max_expirations: int = 4,
+    strike_window: Optional[float] = None
+) -> dict:
     """
-    Used for getting the options chain/contracts for a specific stock
+    Used for getting the options chain/contracts for a specific stock.  The contracts are returned column by column:
+    result["columns"][field][i] is the field of the i-th contract.
     """
-    ticker = yf.Ticker(ticker)
-    options = ticker.options[:4]
-    option_contracts: []
-
-    for option in options:
-        option_chain = ticker.option_chain(option)
-        calls = option_chain.calls
-        puts = option_chain.puts
+    if contract_type not in (None, "call", "put"):
+        raise ValueError(f"Invalid contract_type: {contract_type}")
+    yf_ticker = yf.Ticker(ticker, session=get_yahoo_session())
+    available = await asyncio.to_thread(lambda: yf_ticker.options)
+    if expiration is not None and expiration not in available:
+        raise ValueError(f"Expiration {expiration} is not listed, available expirations are: {', '.join(available[:12])}")
+    expirations = [expiration] if expiration is not None else list(available[:max(1, max_expirations)])
 
-        def filter_options(df, contract_type):
-            if strike_price is not None:
-                df = df[df['strike'] >=  strike_price]
-            return [OptionContract(**row) for _, row in df[df['inTheMoney'] == False].iterrows()]
+    # Every expiration is fetched at the same time
+    chains = await asyncio.gather(*(asyncio.to_thread(yf_ticker.option_chain, option) for option in expirations))
+    frames = []
+    underlying_price = None
+    for option, option_chain in zip(expirations, chains):
+        underlying_price = underlying_price or (option_chain.underlying or {}).get("regularMarketPrice")
+        for side, frame in (("call", option_chain.calls), ("put", option_chain.puts)):
+            if frame is not None and not frame.empty:
+                frames.append(frame.assign(type=side, expiration=option))
+    contracts = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=OPTION_COLUMNS)
 
-        try:
-            if contract_type is None:
-                option_contracts.append(filter_options(calls, 'call'))
-                option_contracts.append(filter_options(puts, 'put'))
-            elif contract_type == 'call':
-                option_contracts.append(filter_options(calls, 'call'))
-            elif contract_type == 'put':
-                option_contracts.append(filter_options(puts, 'put'))
-            else:
-                raise ValueError(f"Invalid contract_type: {contract_type}")
-        except Exception as e:
-            print(f"Error: {e}")
+    # One mask over the contracts of every expiration
+    strikes = contracts["strike"].to_numpy(dtype=np.float64)
+    mask = ~contracts["inTheMoney"].to_numpy(dtype=bool)
+    if contract_type is not None:
+        mask &= contracts["type"].to_numpy() == contract_type
+    if strike_price is not None:
+        mask &= strikes >= strike_price
+    if strike_window is not None and underlying_price:
+        mask &= np.abs(strikes - underlying_price) <= strike_window * underlying_price
+    contracts = contracts.loc[mask, OPTION_COLUMNS]
+    contracts["lastTradeDate"] = contracts["lastTradeDate"].astype(str)
 
-
-    return option_contracts.to
\ No newline at end of file
+    # json.dumps does not accept NaN, return it as null
+    return {
+        "ticker": ticker.upper(),
+        "underlyingPrice": underlying_price,
+        "count": len(contracts),
+        "columns": {name: contracts[name].astype(object).where(contracts[name].notna(), None).tolist() for name in OPTION_COLUMNS},
+    }
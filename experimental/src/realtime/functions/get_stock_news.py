@@ -1,8 +1,4 @@
-import os
-import requests
-from typing import Dict, Union
-
-POLYGON_BASE_URL = os.getenv("POLYGON_API_ENDPOINT")
+from realtime.functions.polygon_client import polygon_client
 
 get_stock_news_def = {
     "name": "get_stock_news",
@@ -14,30 +10,21 @@ get_stock_news_def = {
           "type": "string",
           "description": "The stock ticker symbol to return the news for"
         },
+        "limit": {
+          "type": "integer",
+          "description": "The maximum number of news articles to return"
+        }
       },
       "required": ["ticker"]
     }
 }
 
-async def get_stock_news(ticker: str) -> str:
+async def get_stock_news(ticker: str, limit: int = 10) -> list:
     """
     Used for getting news for a given stock symbol
     """
-    api_key = os.getenv("POLYGON_API_KEY")
-
-    if not api_key:
-        raise ValueError("No API key found for Polygon.io")
-    
-    url = f"{POLYGON_BASE_URL}v2/reference/news?ticker={ticker}&apiKey={api_key}"
-
-    response = requests.get(url).json()
-    status = response.get("status", None)
-
-    if status != "OK":
-        raise ValueError(f"Failed to get news for stock {ticker}.  API Error: {response}")
-    
-    return response.get("results", None)
-
-
-
-
+    # Awaited on the shared client, a slow response no longer blocks the realtime event loop
+    try:
+        return await polygon_client.list("v2/reference/news", {"ticker": ticker, "limit": min(limit, 1000)}, max_results=limit)
+    except ValueError as e:
+        raise ValueError(f"Failed to get news for stock {ticker}.  {e}")
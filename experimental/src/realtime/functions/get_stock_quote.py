@@ -1,23 +1,56 @@
-import yfinance as yf
+import asyncio
+
+from yfinance.data import YfData
+
+from realtime.functions.yahoo_session import get_yahoo_session
+
+YAHOO_QUOTE_URL = "https://query1.finance.yahoo.com/v7/finance/quote"
+QUOTE_FIELDS = [
+    "symbol", "shortName", "quoteType", "currency", "marketState", "regularMarketPrice", "regularMarketChange",
+    "regularMarketChangePercent", "regularMarketOpen", "regularMarketDayHigh", "regularMarketDayLow",
+    "regularMarketPreviousClose", "regularMarketVolume", "averageDailyVolume3Month", "regularMarketTime",
+    "preMarketPrice", "postMarketPrice", "bid", "ask", "fiftyTwoWeekLow", "fiftyTwoWeekHigh", "fiftyDayAverage",
+    "twoHundredDayAverage", "marketCap", "trailingPE", "forwardPE", "epsTrailingTwelveMonths", "trailingAnnualDividendYield",
+]
 
 get_stock_quote_def = {
     "name": "get_stock_quote",
-    "description": "Used for getting the price and information about the stock for today.",
+    "description": "Used for getting the price and information about one or more stocks for today.",
     "parameters": {
       "type": "object",
       "properties": {
-        "ticker": {
-          "type": "string",
-          "description": "The stock ticker symbol to return the quote for"
+        "tickers": {
+          "type": "array",
+          "items": {"type": "string"},
+          "description": "The stock ticker symbols to return the quotes for, all of them in one call"
+        },
+        "full": {
+          "type": "boolean",
+          "description": "Return every field Yahoo Finance has for the quotes, only when the usual fields are not enough"
         }
       },
-      "required": ["ticker"]
+      "required": ["tickers"]
     }
 }
 
-async def get_stock_quote(ticker: str) -> dict:
-    prices = yf.Ticker(ticker)
+def fetch_quotes(tickers: list) -> dict:
+    # The v7 endpoint answers for every symbol in one request
+    data = YfData(session=get_yahoo_session())
+    response = data.get_raw_json(
+        YAHOO_QUOTE_URL,
+        user_agent_headers=data.user_agent_headers,
+        params={"symbols": ",".join(tickers), "formatted": "false"}
+    )
+    return {quote["symbol"].upper(): quote for quote in (response.get("quoteResponse") or {}).get("result") or []}
 
-    return {
-        "information": prices.info   
-    }
\ No newline at end of file
+async def get_stock_quote(tickers: list, full: bool = False) -> dict:
+    tickers = [ticker.upper() for ticker in tickers]
+    quotes = await asyncio.to_thread(fetch_quotes, list(dict.fromkeys(tickers)))
+    results = []
+    for ticker in tickers:
+        quote = quotes.get(ticker)
+        if quote is None:
+            results.append({"symbol": ticker, "error": "Unknown ticker"})
+        else:
+            results.append(quote if full else {field: quote[field] for field in QUOTE_FIELDS if quote.get(field) is not None})
+    return {"quotes": results}
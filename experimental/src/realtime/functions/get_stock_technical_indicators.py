@@ -1,3 +1,4 @@
+import asyncio
 import numpy as np 
 import pandas as pd
 import pandas_ta as ta
@@ -7,6 +8,7 @@ from langchain_core.tools import tool
 from typing import List
 from datetime import datetime, timedelta
 import pytz
+from realtime.functions.price_store import get_price_store
 
 K_PERIOD=14
 D_PERIOD=3
@@ -98,7 +100,6 @@ def calculate_obv(prices):
 
 def format_prices(prices):
     prices.index = prices.index.strftime("%Y-%m-%d")
-    prices.drop(columns=["Dividends", "Stock Splits"], axis=1, inplace=True)
     prices.rename(columns={"Date": "date", "Open": "open", "High": "high", "Low": "low", "Close": "close", "Volume": "volume"}, inplace=True)
     prices.rename_axis("date", inplace=True)
 
@@ -107,7 +108,11 @@ async def get_stock_technical_indicators(ticker: str) -> List[StockTechnicalIndi
     Used for getting the technical indicators and historical data for a stock symbol.
     """
     try:
-        prices = yf.Ticker(ticker).history(period="1y")
+        # Only the bars missing from the local store are fetched, in a thread so the event loop keeps serving the session
+        store = get_price_store()
+        if not await asyncio.to_thread(store.sync, ticker):
+            return []
+        prices = store.read(ticker, start=datetime.now(pytz.timezone('America/New_York')) - timedelta(days=365)).to_frame()
         calculate_macd(prices)
         calculate_stochastics(prices)
         calculate_moving_averages(prices)
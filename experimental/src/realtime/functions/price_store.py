@@ -0,0 +1,212 @@
+"""
+Local columnar store of daily OHLCV bars, the same layout as the backend's so both can share a volume.
+
+Every ticker has a directory with one .npy file per column (dates as int64 nanoseconds UTC, prices and volume as
+float64).  Reads memory-map the files, so a slice of the history is a view of the page cache and not a copy.  A write
+never changes files in place: it creates a new generation directory and then atomically points CURRENT at it, so
+readers always see a consistent set of columns, and readers that still map an older generation keep working.
+
+Only the bars that are missing are fetched from the provider: after the last settled bar on disk, and only once a new
+session could have produced one.  With PRICE_STORE_OFFLINE=true the store never fetches and serves what was seeded.
+"""
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from datetime import time as time_of_day
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+import pytz
+import yfinance as yf
+
+from realtime.functions.yahoo_session import get_yahoo_session
+
+PRICE_STORE_DIR = os.getenv("PRICE_STORE_DIR", os.path.join(tempfile.gettempdir(), "price_store"))
+PRICE_STORE_OFFLINE = os.getenv("PRICE_STORE_OFFLINE", "false").lower() == "true"
+HISTORY_SESSION_TTL = float(os.getenv("HISTORY_SESSION_TTL_SECONDS", 300))
+
+PRICE_COLUMNS = ["open", "high", "low", "close", "volume"]
+MARKET_TZ = pytz.timezone("America/New_York")
+MARKET_OPEN = time_of_day(9, 30)
+MARKET_CLOSE = time_of_day(16, 0)
+
+
+@dataclass
+class PriceSlice:
+    """A range of a ticker's daily bars, every column is a read-only view of the memory-mapped store"""
+    dates: np.ndarray  # int64 nanoseconds since the epoch (UTC)
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+    tz: str
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    @property
+    def columns(self) -> List[np.ndarray]:
+        return [getattr(self, name) for name in PRICE_COLUMNS]
+
+    @property
+    def index(self) -> pd.DatetimeIndex:
+        return pd.DatetimeIndex(np.asarray(self.dates), tz="UTC").tz_convert(self.tz).rename("Date")
+
+    def to_frame(self) -> pd.DataFrame:
+        """Copies the slice to a frame shaped like yfinance's history"""
+        frame = pd.DataFrame({name.capitalize(): np.array(getattr(self, name)) for name in PRICE_COLUMNS}, index=self.index)
+        # Volumes are stored as float64 like the other columns, yfinance returns them as integers
+        frame["Volume"] = frame["Volume"].astype(np.int64)
+        return frame
+
+def is_market_open(now: datetime) -> bool:
+    now = now.astimezone(MARKET_TZ)
+    return now.weekday() < 5 and MARKET_OPEN <= now.time() < MARKET_CLOSE
+
+def get_price_history(ticker: str, period: str = "1y") -> pd.DataFrame:
+    return yf.Ticker(ticker, session=get_yahoo_session()).history(period=period)
+
+def get_price_history_since(ticker: str, start: date) -> pd.DataFrame:
+    return yf.Ticker(ticker, session=get_yahoo_session()).history(start=start.isoformat())
+
+def last_session_close(now: datetime) -> datetime:
+    """The most recent regular session close at or before `now` (exchange holidays count as sessions)"""
+    now = now.astimezone(MARKET_TZ)
+    day = now.date() if now.time() >= MARKET_CLOSE else now.date() - timedelta(days=1)
+    while day.weekday() >= 5:
+        day -= timedelta(days=1)
+    return MARKET_TZ.localize(datetime.combine(day, MARKET_CLOSE))
+
+def settled_rows(dates: np.ndarray, now: datetime) -> int:
+    """Number of leading bars whose session has closed, the bar of a session in progress still changes"""
+    close = last_session_close(now)
+    session_dates = pd.DatetimeIndex(np.asarray(dates), tz="UTC").tz_convert(MARKET_TZ).date
+    return int(np.count_nonzero(session_dates <= close.date()))
+
+class PriceStore:
+    def __init__(self, directory: str = PRICE_STORE_DIR, offline: bool = PRICE_STORE_OFFLINE):
+        self.directory = directory
+        self.offline = offline
+        self.locks: Dict[str, threading.Lock] = defaultdict(threading.Lock)
+        os.makedirs(directory, exist_ok=True)
+
+    def _ticker_dir(self, ticker: str) -> str:
+        return os.path.join(self.directory, ticker.upper())
+
+    def meta(self, ticker: str) -> Optional[dict]:
+        try:
+            with open(os.path.join(self._ticker_dir(ticker), "CURRENT")) as file:
+                return json.load(file)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def read(self, ticker: str, start: Optional[pd.Timestamp] = None, end: Optional[pd.Timestamp] = None) -> Optional[PriceSlice]:
+        """Bars with start <= date <= end, None when the ticker is not in the store"""
+        meta = self.meta(ticker)
+        if meta is None:
+            return None
+        generation = os.path.join(self._ticker_dir(ticker), meta["generation"])
+        columns = {
+            name: np.load(os.path.join(generation, f"{name}.npy"), mmap_mode="r") if meta["rows"] else np.empty(0)
+            for name in ["dates"] + PRICE_COLUMNS
+        }
+        dates = columns["dates"]
+        first = 0 if start is None else int(np.searchsorted(dates, pd.Timestamp(start).as_unit("ns").value, side="left"))
+        last = len(dates) if end is None else int(np.searchsorted(dates, pd.Timestamp(end).as_unit("ns").value, side="right"))
+        return PriceSlice(**{name: values[first:last] for name, values in columns.items()}, tz=meta["tz"])
+
+    def write(self, ticker: str, prices: pd.DataFrame, synced_at: Optional[float] = None):
+        """Replaces the stored history of a ticker with a frame shaped like yfinance's history"""
+        ticker_dir = self._ticker_dir(ticker)
+        os.makedirs(ticker_dir, exist_ok=True)
+        index = prices.index.tz_convert("UTC") if prices.index.tz is not None else prices.index
+        dates = index.as_unit("ns").asi8
+        generation = tempfile.mkdtemp(dir=ticker_dir, prefix="gen-")
+        np.save(os.path.join(generation, "dates.npy"), dates)
+        for name in PRICE_COLUMNS:
+            np.save(os.path.join(generation, f"{name}.npy"), prices[name.capitalize()].to_numpy(dtype=np.float64))
+
+        synced_at = time.time() if synced_at is None else synced_at
+        meta = {
+            "generation": os.path.basename(generation),
+            "tz": str(prices.index.tz or MARKET_TZ.zone),
+            "rows": len(dates),
+            "settled_rows": settled_rows(dates, datetime.fromtimestamp(synced_at, MARKET_TZ)),
+            "synced_at": synced_at,
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=ticker_dir, suffix=".tmp")
+        with os.fdopen(fd, "w") as file:
+            json.dump(meta, file)
+        os.replace(tmp_path, os.path.join(ticker_dir, "CURRENT"))
+
+        # Readers that mapped an older generation keep their open files after the directory is removed
+        for entry in os.listdir(ticker_dir):
+            if entry.startswith("gen-") and entry != meta["generation"]:
+                shutil.rmtree(os.path.join(ticker_dir, entry), ignore_errors=True)
+
+    def seed(self, ticker: str, prices: pd.DataFrame):
+        """Loads a fixture into the store, for running offline"""
+        self.write(ticker, prices)
+
+    def is_fresh(self, meta: dict, now: datetime) -> bool:
+        synced_at = datetime.fromtimestamp(meta["synced_at"], MARKET_TZ)
+        if is_market_open(now):
+            # Today's bar is still changing
+            return (now - synced_at).total_seconds() < HISTORY_SESSION_TTL
+        return synced_at >= last_session_close(now)
+
+    def sync(self, ticker: str, now: Optional[datetime] = None) -> bool:
+        """
+        Fetches the bars that are missing from the store.  Returns False when the ticker has no data, either unknown
+        to the provider or, offline, never seeded.
+        """
+        ticker = ticker.upper()
+        now = now or datetime.now(MARKET_TZ)
+        with self.locks[ticker]:
+            meta = self.meta(ticker)
+            if self.offline:
+                return meta is not None and meta["rows"] > 0
+            if meta is not None and meta["rows"] > 0 and self.is_fresh(meta, now):
+                return True
+
+            if meta is None or meta["settled_rows"] == 0:
+                prices = get_price_history(ticker, period="1y")
+                if prices.empty:
+                    return False
+                self.write(ticker, prices)
+                return True
+
+            stored = self.read(ticker).to_frame()
+            last_settled = stored.index[meta["settled_rows"] - 1]
+            fetched = get_price_history_since(ticker, last_settled.date())
+            overlap = fetched[fetched.index == last_settled]
+            columns = [name.capitalize() for name in PRICE_COLUMNS]
+            if overlap.empty or not np.allclose(overlap[columns].to_numpy(dtype=np.float64), stored.loc[[last_settled], columns].to_numpy(), rtol=1e-9, atol=0):
+                # yfinance back-adjusts the whole history after splits and dividends, start over
+                prices = get_price_history(ticker, period="1y")
+                if prices.empty:
+                    return False
+                self.write(ticker, prices)
+                return True
+
+            # Keep the settled bars, the ones after them are replaced by what was just fetched
+            kept = stored.iloc[:meta["settled_rows"]]
+            self.write(ticker, pd.concat([kept, fetched[fetched.index > last_settled][columns]]))
+            return True
+
+_store: Optional[PriceStore] = None
+
+def get_price_store() -> PriceStore:
+    global _store
+    if _store is None:
+        _store = PriceStore()
+    return _store
@@ -0,0 +1,147 @@
+"""
+The one HTTP session every Yahoo Finance request of the process goes through.
+
+yfinance keeps its cookie and crumb in a process-wide YfData that uses whichever session it was handed last, so
+giving every yf.Ticker the same session means the handshake happens once and connections are kept alive.  The
+session also paces requests: a token bucket bounds the request rate, callers wait for a token in FIFO order, and a
+429 pauses the whole bucket (for Retry-After, or a jittered backoff) before the request is retried, so concurrent
+tool calls slow down together instead of each one hammering Yahoo into a cascade of 429s.
+"""
+import os
+import random
+import threading
+import time
+from typing import Dict, Optional, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+YAHOO_MAX_CONNECTIONS = int(os.getenv("YAHOO_MAX_CONNECTIONS", 10))
+YAHOO_REQUESTS_PER_SECOND = float(os.getenv("YAHOO_REQUESTS_PER_SECOND", 5))
+YAHOO_BURST = int(os.getenv("YAHOO_BURST", 10))
+YAHOO_MAX_RETRIES = int(os.getenv("YAHOO_MAX_RETRIES", 3))
+
+THROTTLE_STATUS_CODES = {429, 503}
+
+
+class RateLimitedSession(requests.Session):
+    def __init__(
+        self,
+        rate: float = YAHOO_REQUESTS_PER_SECOND,
+        burst: int = YAHOO_BURST,
+        max_retries: int = YAHOO_MAX_RETRIES,
+        max_connections: int = YAHOO_MAX_CONNECTIONS,
+        backoff: float = 1.0,
+        max_backoff: float = 30.0
+    ):
+        super().__init__()
+        adapter = HTTPAdapter(pool_connections=max_connections, pool_maxsize=max_connections)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+        self.condition = threading.Condition()
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        # Tickets keep the queue FIFO: a caller only takes a token when every caller before it has one
+        self.next_ticket = 0
+        self.serving = 0
+
+        self.requests = 0
+        self.throttled = 0
+        self.retries = 0
+        self.max_queue_depth = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self) -> float:
+        """Blocks until it is this caller's turn and a token is available, returns the seconds waited"""
+        start = time.monotonic()
+        with self.condition:
+            ticket = self.next_ticket
+            self.next_ticket += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.next_ticket - self.serving)
+            while True:
+                if ticket != self.serving:
+                    self.condition.wait()
+                    continue
+                now = time.monotonic()
+                self._refill(now)
+                delay = max(self.paused_until - now, (1 - self.tokens) / self.rate if self.tokens < 1 else 0.0)
+                if delay <= 0:
+                    self.tokens -= 1
+                    self.serving += 1
+                    self.condition.notify_all()
+                    break
+                self.condition.wait(delay)
+            waited = time.monotonic() - start
+            self.requests += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+        return waited
+
+    def pause(self, seconds: float):
+        """Stops handing out tokens for `seconds`, to every caller"""
+        with self.condition:
+            now = time.monotonic()
+            self.paused_until = max(self.paused_until, now + seconds)
+            self.tokens = 0.0
+            self.updated = now
+            self.condition.notify_all()
+
+    def _delay(self, attempt: int, response: requests.Response) -> float:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after is not None:
+            try:
+                return min(float(retry_after), self.max_backoff)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def request(self, method, url, *args, **kwargs) -> requests.Response:
+        for attempt in range(self.max_retries + 1):
+            self.acquire()
+            response = super().request(method, url, *args, **kwargs)
+            if response.status_code not in THROTTLE_STATUS_CODES:
+                return response
+            with self.condition:
+                self.throttled += 1
+            if attempt == self.max_retries:
+                return response
+            with self.condition:
+                self.retries += 1
+            self.pause(self._delay(attempt, response))
+            response.close()
+        return response
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        with self.condition:
+            return {
+                "requests": self.requests,
+                "throttled": self.throttled,
+                "retries": self.retries,
+                "queue_depth": self.next_ticket - self.serving,
+                "max_queue_depth": self.max_queue_depth,
+                "average_wait_seconds": round(self.total_wait / self.requests, 4) if self.requests else 0.0,
+                "max_wait_seconds": round(self.max_wait, 4),
+                "paused_seconds": round(max(0.0, self.paused_until - time.monotonic()), 4),
+            }
+
+_session: Optional[RateLimitedSession] = None
+_session_lock = threading.Lock()
+
+def get_yahoo_session() -> RateLimitedSession:
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = RateLimitedSession()
+        return _session
@@ -1,12 +1,12 @@
 import os
 import base64
-import io
 from uuid import uuid4
 from typing import List, Union
+from urllib.parse import urljoin
 from logging import getLogger, INFO
 
+import httpx
 import streamlit as st
-from PIL import Image
 from dotenv import load_dotenv
 from pydantic import BaseModel
 from streamlit_oauth import OAuth2Component
@@ -39,6 +39,8 @@ REDIRECT_URI = os.getenv("REDIRECT_URI")
 API_CLIENT_ID = os.getenv("API_CLIENT_ID")
 ENVIRONMENT = os.getenv("ENVIRONMENT")
 APP_INSIGHTS_CONNECTION_STRING = os.getenv("APPLICATIONINSIGHTS_CONNECTION_STRING")
+# Artifacts kept in a session, the oldest is dropped beyond it
+ARTIFACT_CACHE_ENTRIES = int(os.getenv("ARTIFACT_CACHE_ENTRIES", 64))
 
 # Logger setup
 logger = getLogger(__name__)
@@ -109,10 +111,26 @@ def initialize_session_state():
         ]
         st.session_state["thread_id"] = str(uuid4())
 
+def fetch_artifact(url: str) -> bytes:
+    # Artifacts are addressed by their content, what was fetched once never changes.  They are cached in the user's
+    # session, fetched with their token, so one user's artifacts are never served to another
+    artifacts = st.session_state.setdefault("artifacts", {})
+    if url not in artifacts:
+        headers = {"Authorization": "Bearer " + st.session_state["token"]["access_token"]} if ENVIRONMENT != "DEVELOPMENT" else {}
+        response = httpx.get(urljoin(os.getenv("API_ENDPOINT"), url), headers=headers, timeout=30)
+        response.raise_for_status()
+        if len(artifacts) >= ARTIFACT_CACHE_ENTRIES:
+            artifacts.pop(next(iter(artifacts)))
+        artifacts[url] = response.content
+    return artifacts[url]
+
 @tracer.start_as_current_span(name="streamlit-chat-app-display_messages")
 def display_messages():
     for message in st.session_state["messages"]:
-        st.chat_message(message["role"]).write(message["content"])
+        if "image_url" in message:
+            st.chat_message(message["role"]).image(fetch_artifact(message["image_url"]), output_format="PNG")
+        else:
+            st.chat_message(message["role"]).write(message["content"])
 
 def handle_user_input(llm):
     if prompt := st.chat_input(placeholder="What is Microsoft's stock price today?"):
@@ -127,10 +145,13 @@ def handle_user_input(llm):
 def process_response(response):
     if isinstance(response['messages'][-2], ToolMessage):
         if response['messages'][-2].artifact is not None:
-            msg = base64.b64decode(response['messages'][-2].artifact['result']['base64_data'])
-            buf = io.BytesIO(msg)
-            img = Image.open(buf)
-            st.markdown(st.image(image=img, output_format="PNG", caption=None), unsafe_allow_html=True)
+            result = response['messages'][-2].artifact['result']
+            if "url" in result:
+                # The API only sends a reference, the image is fetched (and cached) separately
+                st.image(fetch_artifact(result["url"]), output_format="PNG")
+                st.session_state["messages"].append({"role": "assistant", "content": "", "image_url": result["url"]})
+            else:
+                st.image(base64.b64decode(result["base64_data"]), output_format="PNG")
         else:
             st.markdown(response["messages"][-1].content)
             st.session_state["messages"].append({"role": "assistant", "content": response["messages"][-1].content})
@@ -0,0 +1,192 @@
+"""
+Profile lookups from 200 concurrent clients (1000 lookups/s by default): synchronous pymongo calls made inside the async handlers (the previous
+data access, every round trip blocks the event loop) versus the asynchronous UserProfileStore, with pools of
+different sizes.  Then creates and patches from the same clients: a read before every write (the previous
+handlers) versus one write relying on the unique email_address index.
+
+By default MongoDB is an in-memory stand-in where every operation holds one of the pool's connections for
+--latency-ms, so the numbers only depend on how the requests wait.  With --mongo the same runs go to a real server.
+
+Run from the user-profile directory:
+    python -m benchmarks.bench_profile_store --clients 200 --latency-ms 5
+    python -m benchmarks.bench_profile_store --mongo mongodb://localhost:27017
+"""
+import argparse
+import asyncio
+import copy
+import threading
+import time
+from datetime import datetime, timezone
+
+from pymongo.errors import DuplicateKeyError
+
+from src.store import UserProfileStore, create_client
+
+PROFILES = 1000
+
+
+def profile(index: int) -> dict:
+    now = datetime.now(timezone.utc)
+    return {
+        "email_address": f"user{index}@example.com",
+        "investment_profile": {
+            "investment_profile_answers": [{"question": question, "answer": "B"} for question in range(1, 10)],
+            "investment_profile_total_score": 18,
+            "created_at": now,
+            "updated_at": now,
+        },
+        "created_at": now,
+        "updated_at": now,
+    }
+
+class InsertResult:
+    def __init__(self, inserted_id: str):
+        self.inserted_id = inserted_id
+
+class StandInCollection:
+    """
+    The subset of AsyncCollection the store uses, each operation holds a pooled connection for the latency.  Documents
+    are keyed by email address, as the unique index would have it.
+    """
+    def __init__(self, latency: float, pool_size: int):
+        self.latency = latency
+        self.pool = asyncio.Semaphore(pool_size)
+        self.documents = {}
+        self.round_trips = 0
+        # Inserts of an email address that already has a profile.  After a read that found none, it is a race that
+        # would have created a second profile without the index
+        self.duplicates = 0
+
+    async def _round_trip(self):
+        self.round_trips += 1
+        async with self.pool:
+            await asyncio.sleep(self.latency)
+
+    async def find_one(self, filter: dict, projection: dict = None):
+        await self._round_trip()
+        document = self.documents.get(filter["email_address"])
+        return copy.deepcopy(document) if document else None
+
+    async def insert_one(self, document: dict) -> InsertResult:
+        await self._round_trip()
+        if document["email_address"] in self.documents:
+            self.duplicates += 1
+            raise DuplicateKeyError("E11000 duplicate key error, index: email_address_unique")
+        self.documents[document["email_address"]] = document
+        return InsertResult(document["email_address"])
+
+    async def update_one(self, filter: dict, update: dict):
+        await self._round_trip()
+        self.documents[filter["email_address"]].update(update["$set"])
+
+    async def find_one_and_update(self, filter: dict, update: dict, projection: dict = None, return_document=None):
+        await self._round_trip()
+        document = self.documents.get(filter["email_address"])
+        if document is None:
+            return None
+        for field, value in update["$set"].items():
+            *path, name = field.split(".")
+            target = document
+            for key in path:
+                target = target[key]
+            target[name] = value
+        return {"investment_profile": copy.deepcopy(document["investment_profile"])}
+
+class BlockingStandInCollection:
+    """The subset of pymongo's Collection the handlers used, each operation blocks the calling thread"""
+    def __init__(self, latency: float, pool_size: int):
+        self.latency = latency
+        self.pool = threading.Semaphore(pool_size)
+        self.documents = {}
+
+    def find_one(self, filter: dict):
+        with self.pool:
+            time.sleep(self.latency)
+            document = self.documents.get(filter["email_address"])
+            return copy.deepcopy(document) if document else None
+
+async def run_clients(lookup, clients: int, requests: int, interval: float) -> tuple:
+    """
+    Every client sends a lookup every `interval` seconds (staggered between the clients), a lookup's latency is
+    counted from the time it was due, so the time spent waiting for a blocked event loop is included
+    """
+    latencies = []
+    start = time.perf_counter()
+
+    async def client(index: int):
+        for request in range(requests):
+            due = start + (request + index / clients) * interval
+            await asyncio.sleep(max(0.0, due - time.perf_counter()))
+            document = await lookup(f"user{(index * requests + request) % PROFILES}@example.com")
+            assert document is not None
+            latencies.append(time.perf_counter() - due)
+
+    await asyncio.gather(*(client(index) for index in range(clients)))
+    return sorted(latencies), time.perf_counter() - start
+
+async def previous_write(store: UserProfileStore, email_address: str):
+    # Read before insert, then read, map and update
+    collection = store.collection
+    if await collection.find_one({"email_address": email_address}) is None:
+        try:
+            await collection.insert_one(profile(int(email_address[4:].split("@")[0])))
+        except DuplicateKeyError:
+            pass
+    document = await collection.find_one({"email_address": email_address})
+    await collection.update_one({"email_address": email_address}, {"$set": {"investment_profile": document["investment_profile"], "updated_at": datetime.now(timezone.utc)}})
+    return document
+
+async def write(store: UserProfileStore, email_address: str):
+    await store.insert(profile(int(email_address[4:].split("@")[0])))
+    return await store.update(email_address, {"investment_profile.investment_profile_total_score": 20, "updated_at": datetime.now(timezone.utc)}, projection={"_id": 0, "investment_profile": 1})
+
+def report(name: str, latencies: list, seconds: float):
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"  {name:<28} p50={p50 * 1000:9.1f}ms  p99={p99 * 1000:9.1f}ms  {len(latencies) / seconds:9.0f} requests/s")
+
+async def main(args):
+    print(f"{args.clients} clients x {args.requests} lookups, one every {args.interval_ms}ms per client" + (f", {args.mongo}" if args.mongo else f", stand-in with {args.latency_ms}ms per operation"))
+    for pool_size in args.pool_sizes:
+        if args.mongo:
+            from pymongo import MongoClient
+            blocking = MongoClient(args.mongo, maxPoolSize=pool_size).bench_users.user_profile
+            client = create_client(args.mongo, max_pool_size=pool_size)
+            store = UserProfileStore(client.bench_users.user_profile, client)
+            if blocking.estimated_document_count() < PROFILES:
+                blocking.insert_many([profile(index) for index in range(PROFILES)])
+                blocking.create_index("email_address", unique=True)
+        else:
+            blocking = BlockingStandInCollection(args.latency_ms / 1000, pool_size)
+            store = UserProfileStore(StandInCollection(args.latency_ms / 1000, pool_size))
+            for index in range(PROFILES):
+                document = profile(index)
+                blocking.documents[document["email_address"]] = document
+                store.collection.documents[document["email_address"]] = document
+
+        async def blocking_lookup(email_address: str):
+            # What the handlers did: a synchronous call inside a coroutine
+            return blocking.find_one({"email_address": email_address})
+
+        print(f" pool of {pool_size} connections")
+        report("sync pymongo in handlers", *await run_clients(blocking_lookup, args.clients, args.requests, args.interval_ms / 1000))
+        report("async store", *await run_clients(store.find, args.clients, args.requests, args.interval_ms / 1000))
+        await store.close()
+
+    if not args.mongo:
+        print(f" creates and patches, pool of {args.pool_sizes[-1]} connections")
+        for name, operation in (("read before write", previous_write), ("single indexed write", write)):
+            store = UserProfileStore(StandInCollection(args.latency_ms / 1000, args.pool_sizes[-1]))
+            latencies, seconds = await run_clients(lambda email_address: operation(store, email_address), args.clients, args.requests, args.interval_ms / 1000)
+            report(name, latencies, seconds)
+            print(f"  {'':<28} {store.collection.round_trips / len(latencies):.1f} round trips for a create and a patch, {store.collection.duplicates} duplicate inserts rejected")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--interval-ms", type=float, default=200)
+    parser.add_argument("--latency-ms", type=float, default=5)
+    parser.add_argument("--pool-sizes", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--mongo", help="Connection string of a MongoDB server to run against instead of the stand-in")
+    asyncio.run(main(parser.parse_args()))
@@ -2,9 +2,8 @@ import os
 from datetime import datetime, timezone
 from fastapi import FastAPI, HTTPException, Security, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from pymongo import MongoClient
-from bson import ObjectId
 from .models.user_profile import UserProfile, UserProfileRequest, InvestmentProfile, InvestmentProfileRequest
+from .store import close_user_profile_store, get_user_profile_store
 from dotenv import load_dotenv
 from azure.monitor.opentelemetry import configure_azure_monitor
 from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
@@ -42,17 +41,21 @@ settings = Settings()
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """
-    Load OpenID config on startup
+    Load OpenID config, connect to MongoDB and create the indexes on startup, close the connection pool on shutdown
     """
-    await azure_scheme.openid_config.load_config()
+    if ENVIRONMENT != "DEVELOPMENT":
+        await azure_scheme.openid_config.load_config()
+    await get_user_profile_store().create_indexes()
     yield
+    await close_user_profile_store()
 
 app = FastAPI(
     title="User Profile API",
     version="1.0",
     description="API to manage a users profile along with their investment profile",
     swagger_ui_oauth2_redirect_url=swagger_ui_oauth2_redirect_url,
-    swagger_ui_init_oauth=swagger_ui_init_oauth
+    swagger_ui_init_oauth=swagger_ui_init_oauth,
+    lifespan=lifespan
 )
 
 FastAPIInstrumentor.instrument_app(app)
@@ -77,11 +80,6 @@ azure_scheme = MultiTenantAzureAuthorizationCodeBearer(
 
 dependencies = [Security(azure_scheme)] if ENVIRONMENT != "DEVELOPMENT" else []
 
-
-client = MongoClient(os.getenv("MONGO_CONNECTION_STRING"))
-db = client.users
-collection = db.user_profile
-
 def map_investment_profile_request_to_investment_profile(investment_profile_request: InvestmentProfileRequest) -> InvestmentProfile:
     return InvestmentProfile(
         investment_profile_answers=investment_profile_request.investment_profile_answers,
@@ -98,17 +96,13 @@ def map_user_profile_request_to_user_profile(user_profile_request: UserProfileRe
         updated_at=datetime.now(timezone.utc)
     )
 
-def map_document_to_user_profile(document: dict) -> UserProfile:
-    return UserProfile(
-        email_address=document.get("email_address"),
-        investment_profile=InvestmentProfile(
-            investment_profile_answers=document.get("investment_profile").get("investment_profile_answers"),
-            investment_profile_total_score=document.get("investment_profile").get("investment_profile_total_score"),
-            created_at=document.get("investment_profile").get("created_at"),
-            updated_at=document.get("investment_profile").get("updated_at")
-        ),
-        created_at=document.get("created_at"),
-        updated_at=document.get("updated_at")
+def map_document_to_investment_profile(document: dict) -> InvestmentProfile:
+    investment_profile = document.get("investment_profile")
+    return InvestmentProfile(
+        investment_profile_answers=investment_profile.get("investment_profile_answers"),
+        investment_profile_total_score=investment_profile.get("investment_profile_total_score"),
+        created_at=investment_profile.get("created_at"),
+        updated_at=investment_profile.get("updated_at")
     )
 
 
@@ -126,17 +120,15 @@ async def get_investment_profile(email_address: str):
     Returns:
         dict: A dictionary containing the investment profile of the user.
     """
-    # Retrieve the user profile from the database
-    response = collection.find_one({"email_address": email_address})
+    # Retrieve only the investment profile of the user from the database
+    response = await get_user_profile_store().find(email_address, projection={"_id": 0, "investment_profile": 1})
 
     # If the user profile does not exist, raise a 404 error
     if not response:
         raise HTTPException(status_code=404, detail="User profile not found")
-    
-    user_profile = map_document_to_user_profile(response)
 
     # Return the investment profile of the user
-    return user_profile.investment_profile.model_dump()
+    return map_document_to_investment_profile(response).model_dump()
 
 @app.post("/api/userprofile/", dependencies=dependencies)
 async def post_investment_profile(user_profile_request: UserProfileRequest):
@@ -144,7 +136,8 @@ async def post_investment_profile(user_profile_request: UserProfileRequest):
     Create a new user profile with an investment profile.
 
     This endpoint creates a new user profile with the provided investment profile data.
-    If a user profile with the same email address already exists, it raises a 400 error.
+    If a user profile with the same email address already exists (the unique index on
+    email_address rejects the insert), it raises a 400 error.
 
     Args:
         user_profile_request (UserProfileRequest): The user profile data including the investment profile.
@@ -154,63 +147,54 @@ async def post_investment_profile(user_profile_request: UserProfileRequest):
     """
     # Map the request data to a UserProfile instance
     user_profile = map_user_profile_request_to_user_profile(user_profile_request)
-    
-    # Check if a user profile with the same email address already exists
-    user_profile_exist = collection.find_one({"email_address": user_profile.email_address})
-    if user_profile_exist:
-        raise HTTPException(status_code=400, detail="User profile already exists")
-    
+
     # Convert the UserProfile instance to a dictionary
     user_profile_dict = user_profile.model_dump()
 
-    # Insert the new user profile into the database
-    result = collection.insert_one(user_profile_dict)
+    # Insert the new user profile into the database, unless one with the same email address already exists
+    inserted_id = await get_user_profile_store().insert(user_profile_dict)
+    if inserted_id is None:
+        raise HTTPException(status_code=400, detail="User profile already exists")
 
     # Return the ID of the newly created user profile
-    return {"id": str(result.inserted_id)}
+    return {"id": inserted_id}
 
-@app.patch("/api/userprofile/{email_address}/investmentprofile", dependencies=dependencies)
+@app.patch("/api/userprofile/{email_address}/investmentprofile", response_model=InvestmentProfile, dependencies=dependencies)
 async def patch_investment_profile(email_address: str, investment_profile_request: InvestmentProfileRequest):
     """
     Update the investment profile for a user identified by email_address.
 
     This endpoint allows partial updates to the investment profile of a user.
-    It retrieves the existing user profile, updates the investment profile answers,
-    total score, and the updated_at timestamp, and then saves the changes back to the database.
+    It sets the investment profile answers, total score, and the updated_at timestamps
+    in a single atomic update, keeping the investment profile's created_at.
+    If the user profile does not exist, it raises a 404 error.
 
     Args:
         email_address (str): The email address of the user whose investment profile is to be updated.
         investment_profile_request (InvestmentProfileRequest): The new investment profile data.
 
     Returns:
-        dict: A dictionary containing the number of modified documents.
+        dict: A dictionary containing the updated investment profile of the user.
     """
-    # Retrieve the existing user profile from the database
-    user_profile_document = collection.find_one({"email_address": email_address})
-    
+    # Update the investment profile with the new data, getting back only the updated investment profile
+    now = datetime.now(timezone.utc)
+    response = await get_user_profile_store().update(
+        email_address,
+        {
+            "investment_profile.investment_profile_answers": [answer.model_dump() for answer in investment_profile_request.investment_profile_answers],
+            "investment_profile.investment_profile_total_score": investment_profile_request.investment_profile_total_score,
+            "investment_profile.updated_at": now,
+            "updated_at": now
+        },
+        projection={"_id": 0, "investment_profile": 1}
+    )
+
     # If the user profile does not exist, raise a 404 error
-    if not user_profile_document:
+    if not response:
         raise HTTPException(status_code=404, detail="User profile not found")
-    
-    # Map the document to a UserProfile object
-    user_profile = map_document_to_user_profile(user_profile_document)
-
-    # Update the investment profile with the new data
-    user_profile.investment_profile.investment_profile_answers = investment_profile_request.investment_profile_answers
-    user_profile.investment_profile.investment_profile_total_score = investment_profile_request.investment_profile_total_score
-    user_profile.investment_profile.updated_at = datetime.now(timezone.utc)
-
-    # Convert the updated investment profile to a dictionary
-    investment_profile_dict = user_profile.investment_profile.model_dump()
-    
-    # Update the user profile in the database
-    result = collection.update_one(
-        {"email_address": email_address}, 
-        {"$set": {"investment_profile": investment_profile_dict, "updated_at": datetime.now(timezone.utc)}}
-    )
 
-    # Return the number of modified documents
-    return {"modified_count": result.modified_count}
+    # Return the updated investment profile of the user
+    return map_document_to_investment_profile(response).model_dump()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,105 @@
+"""
+Asynchronous access to the user profiles in MongoDB.
+
+The handlers are coroutines, so the database calls must not block the event loop: pymongo's AsyncMongoClient
+speaks to MongoDB over asyncio, and a slow round trip only suspends the request that is waiting for it.  One client
+(and its connection pool) is shared by every request of the process.
+
+email_address has a unique index, created at startup: every operation is one indexed round trip, and the index
+rather than a read before the insert keeps two profiles from sharing an email address.
+"""
+import os
+from logging import getLogger
+from typing import Optional
+
+from pymongo import AsyncMongoClient, ReturnDocument
+from pymongo.asynchronous.collection import AsyncCollection
+from pymongo.errors import DuplicateKeyError, OperationFailure
+
+MONGO_CONNECTION_STRING = os.getenv("MONGO_CONNECTION_STRING")
+# Connections per MongoDB server, requests beyond it wait for a connection to be returned to the pool
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", 100))
+# Kept open when idle, so a burst after a quiet period does not pay for new connections
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", 10))
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", 60000))
+# Limit of every operation, waiting for a connection and selecting a server included
+MONGO_TIMEOUT_MS = int(os.getenv("MONGO_TIMEOUT_MS", 5000))
+
+logger = getLogger(__name__)
+
+
+def create_client(connection_string: Optional[str] = MONGO_CONNECTION_STRING, max_pool_size: int = MONGO_MAX_POOL_SIZE) -> AsyncMongoClient:
+    return AsyncMongoClient(
+        connection_string,
+        maxPoolSize=max_pool_size,
+        minPoolSize=min(MONGO_MIN_POOL_SIZE, max_pool_size),
+        maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+        timeoutMS=MONGO_TIMEOUT_MS,
+        appname="user-profile"
+    )
+
+class UserProfileStore:
+    def __init__(self, collection: AsyncCollection, client: Optional[AsyncMongoClient] = None):
+        self.collection = collection
+        self.client = client
+
+    async def create_indexes(self) -> bool:
+        """
+        Creates the unique email_address index, False when it cannot be built because several profiles already share
+        an email address.  The service still starts, without the guarantee, until the duplicates are removed.
+        """
+        try:
+            await self.collection.create_index("email_address", unique=True, name="email_address_unique")
+        except OperationFailure as e:
+            if e.code != 11000:
+                raise
+            logger.error(
+                "The unique index on email_address was not created, several user profiles share an email address (%s).  "
+                "Keep one profile per email address (e.g. the most recently updated one), delete the others and restart "
+                "the service to create the index.  Until then two profiles can be created for the same email address.",
+                e.details.get("errmsg") if e.details else e
+            )
+            return False
+        return True
+
+    async def find(self, email_address: str, projection: Optional[dict] = None) -> Optional[dict]:
+        return await self.collection.find_one({"email_address": email_address}, projection)
+
+    async def insert(self, document: dict) -> Optional[str]:
+        """Inserts a user profile and returns its id, None when a profile with the same email address exists"""
+        try:
+            result = await self.collection.insert_one(document)
+        except DuplicateKeyError:
+            return None
+        return str(result.inserted_id)
+
+    async def update(self, email_address: str, fields: dict, projection: Optional[dict] = None) -> Optional[dict]:
+        """
+        Sets the fields of a user profile in one atomic round trip and returns the updated document (its projected
+        fields), None when there is no such profile
+        """
+        return await self.collection.find_one_and_update(
+            {"email_address": email_address},
+            {"$set": fields},
+            projection=projection,
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.close()
+
+_store: Optional[UserProfileStore] = None
+
+def get_user_profile_store() -> UserProfileStore:
+    global _store
+    if _store is None:
+        client = create_client()
+        _store = UserProfileStore(client.users.user_profile, client)
+    return _store
+
+async def close_user_profile_store():
+    global _store
+    if _store is not None:
+        await _store.close()
+        _store = None